@@ -0,0 +1,174 @@
+"""
+bench_api.py
+
+Benchmark de los endpoints principales de la API con datos sintéticos, usando el TestClient de FastAPI (en el mismo
+proceso, sin red). Para cada tamaño de dataset mide:
+- el primer request (carga del csv, parseo y scoring de todos los candidatos);
+- por escenario (listado, listado filtrado, candidato por ID, top k, reporte PDF cacheado y sin cachear): latencias
+  (p50, p90, p99, máximo), throughput y errores;
+- el pico de memoria (RSS) del proceso.
+Cada tamaño corre en un subproceso aparte (así el pico de memoria y las caches de uno no afectan al siguiente), y el
+csv sintético se genera en otro subproceso antes de medir. Los resultados se guardan en un JSON, para poder comparar
+corridas y detectar regresiones.
+
+Uso (desde `app/`): python -m benchmarks.bench_api --rows 1000 100000 1000000 --output benchmarks/results/api.json
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+SCENARIOS = ('list', 'list_filtered', 'by_id', 'top_k', 'report', 'report_uncached')
+
+
+def scenario_request(scenario: str, rng: np.random.Generator, rows: int, i: int):
+    """Devuelve (url, params) del i-ésimo request del escenario"""
+    if scenario == 'list':
+        return '/candidates/', {'page': int(rng.integers(1, max(rows // 10, 1) + 1)), 'per_page': 10}
+    if scenario == 'list_filtered':
+        return '/candidates/', {'college': 'univ', 'degree': 'science', 'min_score': 0.5, 'skill': 'Python'}
+    if scenario == 'by_id':
+        return f'/candidates/{int(rng.integers(0, rows))}', {}
+    if scenario == 'top_k':
+        return '/candidates/top', {'k': 10}
+    if scenario == 'report':
+        return '/reports/', {'k': 10}
+    if scenario == 'report_uncached':
+        # Un k distinto en cada request: nunca hay hit en el cache de reportes
+        return '/reports/', {'k': 11 + i}
+    raise ValueError(f'Unknown scenario: {scenario}')
+
+
+def run_case(csv_path: Path, rows: int, requests: int, concurrency: int, seed: int) -> dict:
+    from fastapi.testclient import TestClient
+
+    import src.api as api
+    from src.constants import HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE
+    from src.services import CandidateService
+    from src.storage import CSVStorage
+
+    storage = CSVStorage(csv_path, HEADER)
+    api.app.dependency_overrides[api.get_candidates_service] = lambda: CandidateService(
+        csv_path, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE, storage=storage
+    )
+    client = TestClient(api.app)
+    rng = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    client.get('/candidates/', params={'page': 1}).raise_for_status()
+    cold_start = time.perf_counter() - start
+
+    result = {'rows': rows, 'cold_start_s': cold_start, 'scenarios': {}}
+    for scenario in SCENARIOS:
+        request_args = [scenario_request(scenario, rng, rows, i) for i in range(requests)]
+
+        def timed_get(args):
+            url, params = args
+            request_start = time.perf_counter()
+            status = client.get(url, params=params).status_code
+            return time.perf_counter() - request_start, status
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            timings = list(pool.map(timed_get, request_args))
+        wall = time.perf_counter() - wall_start
+
+        latencies_ms = np.array([latency for latency, _ in timings]) * 1000
+        result['scenarios'][scenario] = {
+            'requests': requests,
+            'errors': sum(status >= 400 for _, status in timings),
+            'p50_ms': float(np.percentile(latencies_ms, 50)),
+            'p90_ms': float(np.percentile(latencies_ms, 90)),
+            'p99_ms': float(np.percentile(latencies_ms, 99)),
+            'max_ms': float(latencies_ms.max()),
+            'mean_ms': float(latencies_ms.mean()),
+            'throughput_rps': requests / wall,
+        }
+    # ru_maxrss está en KiB en Linux
+    result['peak_rss_mib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def ensure_dataset(data_dir: Path, rows: int, seed: int) -> Path:
+    """Genera (en un subproceso, para no inflar la memoria medida) el csv sintético, salvo que ya exista"""
+    csv_path = data_dir / f'candidates_{rows}_{seed}.csv'
+    if not csv_path.exists():
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.synthetic', '--rows', str(rows), '--seed', str(seed),
+             '--output', str(csv_path)],
+            check=True, stdout=subprocess.DEVNULL
+        )
+    return csv_path
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='Concurrent client threads')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', type=Path, help='Where to keep the synthetic csv files (default: temp dir)')
+    parser.add_argument('--output', type=Path, default=Path('benchmarks/results/api.json'))
+    parser.add_argument('--case', nargs=2, metavar=('CSV', 'ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        result = run_case(Path(args.case[0]), int(args.case[1]), args.requests, args.concurrency, args.seed)
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or Path(tmp_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        results = []
+        for rows in args.rows:
+            csv_path = ensure_dataset(data_dir, rows, args.seed)
+            # Copia de trabajo: los índices y scores que genere la API no quedan junto al dataset reutilizable
+            case_dir = Path(tempfile.mkdtemp(dir=tmp_dir))
+            case_csv = case_dir / 'candidates.csv'
+            case_csv.write_bytes(csv_path.read_bytes())
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_api', '--case', str(case_csv), str(rows),
+                 '--requests', str(args.requests), '--concurrency', str(args.concurrency), '--seed', str(args.seed)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print(f"rows={rows} cold start={result['cold_start_s']:.2f}s peak RSS={result['peak_rss_mib']:.0f} MiB")
+            print(f"  {'scenario':<16} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'req/s':>8} {'errors':>6}")
+            for scenario, stats in result['scenarios'].items():
+                print(f"  {scenario:<16} {stats['p50_ms']:>8.2f} {stats['p90_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+                      f"{stats['max_ms']:>8.2f} {stats['throughput_rps']:>8.1f} {stats['errors']:>6}")
+
+    report = {
+        'benchmark': 'api',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {'requests': args.requests, 'concurrency': args.concurrency, 'seed': args.seed},
+        'results': results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
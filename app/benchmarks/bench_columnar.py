@@ -0,0 +1,65 @@
+"""
+bench_columnar.py
+
+Compara el dataframe de candidatos (skills como listas, strings como objetos) contra su representación compacta
+(CompactCandidates): memoria ocupada, tiempo de scoring y de filtrado por skills. Verifica además que ambos den los
+mismos scores y los mismos candidatos filtrados, y que la conversión de vuelta a dataframe sea exacta.
+
+Uso (desde `app/`): python -m benchmarks.bench_columnar --rows 100000 1000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import make_candidates_df, best_of
+from src.columnar import CompactCandidates
+from src.constants import CANDIDATES_DATA_PATH, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE
+from src.services import CandidateService
+
+FILTER_SKILLS = ['Python', 'SQL']
+
+
+def filter_frame(df: pd.DataFrame) -> np.ndarray:
+    """Filtro por skills sobre el dataframe (listas de Python), con la misma semántica que has_skills"""
+    mask = np.ones(len(df), dtype=bool)
+    for skill in FILTER_SKILLS:
+        skill = skill.lower()
+        mask &= np.fromiter((any(s.lower() == skill for s in skills) for skills in df['skills']), bool, len(df))
+    return mask
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    service = CandidateService(CANDIDATES_DATA_PATH, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE)
+
+    print(f"{'rows':>9} {'frame (MiB)':>12} {'compact (MiB)':>14} {'ratio':>6} "
+          f"{'score df/compact (s)':>21} {'skill filter df/compact (s)':>28}")
+    for n in args.rows:
+        df = make_candidates_df(n)
+        compact = CompactCandidates.from_frame(df, HEADER)
+
+        pd.testing.assert_frame_equal(compact.to_frame(), df, check_dtype=False)
+        assert np.array_equal(service._calculate_scores(df).to_numpy(), service._calculate_scores(compact).to_numpy())
+        assert np.array_equal(filter_frame(df), compact.has_skills(FILTER_SKILLS))
+
+        frame_bytes = df.memory_usage(deep=True, index=False).sum()
+        # memory_usage no cuenta las listas de skills en sí, solo sus strings: se suma el objeto lista
+        frame_bytes += sum(skills.__sizeof__() for skills in df['skills'])
+        compact_bytes = compact.memory_usage()
+
+        t_score_df = best_of(lambda: service._calculate_scores(df), args.repeat)
+        t_score_compact = best_of(lambda: service._calculate_scores(compact), args.repeat)
+        t_filter_df = best_of(lambda: filter_frame(df), args.repeat)
+        t_filter_compact = best_of(lambda: compact.has_skills(FILTER_SKILLS), args.repeat)
+        print(f'{n:>9} {frame_bytes / 2**20:>12.1f} {compact_bytes / 2**20:>14.1f} '
+              f'{frame_bytes / compact_bytes:>5.1f}x {t_score_df:>10.3f}/{t_score_compact:<10.3f} '
+              f'{t_filter_df:>14.3f}/{t_filter_compact:<13.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+bench_load.py
+
+Benchmark de la carga del csv de candidatos (parseo, skills y representación compacta) en paralelo por shards, según
+la cantidad de workers. Para cada cantidad mide:
+- la primera carga (incluye levantar los procesos del pool);
+- las siguientes, con el pool ya levantado (mediana de --repeat cargas), y el speedup contra la carga serial;
+y verifica que el resultado (filas, categorías, vocabulario de skills y scores de todos los perfiles) sea idéntico al
+de la carga serial. También mide la carga desde el snapshot binario (src.snapshot): la primera, que lee el csv y
+escribe el snapshot, y las siguientes, que lo leen por memory map. Los resultados se guardan en un JSON, como los
+de bench_api.
+
+Uso (desde `app/`): python -m benchmarks.bench_load --rows 1000000 --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_api import ensure_dataset, git_revision
+from src.columnar import CompactCandidates
+from src.concurrency import shutdown_load_pool
+from src.constants import HEADER, SCORING_PROFILES
+from src.scoring import profiles_from_config, score_profiles
+from src.storage import CSVStorage
+
+
+def timed_load(storage: CSVStorage):
+    start = time.perf_counter()
+    candidates = storage.load_compact()
+    return time.perf_counter() - start, candidates
+
+
+def assert_identical(expected: CompactCandidates, actual: CompactCandidates) -> None:
+    pd.testing.assert_frame_equal(expected.to_frame(), actual.to_frame())
+    assert expected.skill_vocabulary == actual.skill_vocabulary, 'skill vocabulary differs'
+    profiles = profiles_from_config(SCORING_PROFILES)
+    expected_scores, actual_scores = score_profiles(expected, profiles), score_profiles(actual, profiles)
+    for fingerprint, scores in expected_scores.items():
+        assert np.array_equal(np.asarray(scores), np.asarray(actual_scores[fingerprint])), 'scores differ'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3, help='Loads per worker count, after the first one')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', type=Path, help='Where to keep the synthetic csv (default: temp dir)')
+    parser.add_argument('--no-verify', action='store_true', help='Skip the comparison against the serial load')
+    parser.add_argument('--output', type=Path, default=Path('benchmarks/results/load.json'))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or Path(tmp_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        csv_path = ensure_dataset(data_dir, args.rows, args.seed)
+        # El índice de offsets se construye una vez antes de medir (en uso normal ya existe)
+        CSVStorage(csv_path, HEADER).count()
+
+        serial_time, serial = timed_load(CSVStorage(csv_path, HEADER))
+        results = []
+        print(f"rows={args.rows} cpus={os.cpu_count()} serial load={serial_time:.2f}s")
+        print(f"  {'workers':>7} {'first s':>8} {'warm s':>8} {'speedup':>8} {'identical':>9}")
+        for workers in args.workers:
+            storage = CSVStorage(csv_path, HEADER, load_workers=workers)
+            first_time, candidates = timed_load(storage)
+            warm_times = [timed_load(storage)[0] for _ in range(args.repeat)]
+            warm_time = statistics.median(warm_times) if warm_times else first_time
+            identical = None
+            if not args.no_verify:
+                assert_identical(serial, candidates)
+                identical = True
+            results.append({
+                'workers': workers,
+                'first_load_s': first_time,
+                'warm_load_s': warm_time,
+                'speedup': serial_time / warm_time,
+                'identical': identical,
+            })
+            print(f"  {workers:>7} {first_time:>8.2f} {warm_time:>8.2f} {serial_time / warm_time:>8.2f} "
+                  f"{str(identical):>9}")
+        shutdown_load_pool()
+
+        # Snapshot sobre una copia del csv, así no queda junto al dataset reutilizable
+        snapshot_csv = Path(tempfile.mkdtemp(dir=tmp_dir)) / 'candidates.csv'
+        shutil.copyfile(csv_path, snapshot_csv)
+        storage = CSVStorage(snapshot_csv, HEADER, use_snapshot=True)
+        # La primera carga lee el csv; el snapshot lo escribe después el store (acá, en el mismo thread)
+        start = time.perf_counter()
+        storage.compact_snapshot(storage.load_compact(), storage.signature())
+        snapshot_first_time = time.perf_counter() - start
+        snapshot_times = [timed_load(storage)[0] for _ in range(max(args.repeat, 1))]
+        snapshot_time, candidates = statistics.median(snapshot_times), timed_load(storage)[1]
+        if not args.no_verify:
+            assert_identical(serial, candidates)
+        snapshot = {
+            'first_load_s': snapshot_first_time,
+            'load_s': snapshot_time,
+            'speedup': serial_time / snapshot_time,
+            'file_mib': storage.snapshot.snapshot_path.stat().st_size / 2 ** 20,
+            'identical': None if args.no_verify else True,
+        }
+        print(f"  snapshot: first (csv + write)={snapshot_first_time:.2f}s load={snapshot_time:.3f}s "
+              f"speedup={snapshot['speedup']:.0f}x size={snapshot['file_mib']:.0f} MiB")
+
+    report = {
+        'benchmark': 'load',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'parameters': {'rows': args.rows, 'repeat': args.repeat, 'seed': args.seed,
+                       'min_shard_rows': CSVStorage.MIN_SHARD_ROWS},
+        'serial_load_s': serial_time,
+        'results': results,
+        'snapshot': snapshot,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
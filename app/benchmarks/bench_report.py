@@ -0,0 +1,65 @@
+"""
+bench_report.py
+
+Mide tiempo y pico de memoria (RSS) de la generación del PDF report para distintos k y layouts.
+Cada caso corre en un subproceso aparte, así el pico de memoria de uno no contamina al siguiente.
+
+Uso (desde `app/`): python -m benchmarks.bench_report --k 10 1000 10000 --layouts detailed compact
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.common import make_candidates_df
+from src.constants import CANDIDATES_DATA_PATH, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE
+from src.pdf_report import PDFReportGenerator, REPORT_LAYOUTS
+from src.services import CandidateService
+
+
+def run_case(k: int, layout: str) -> dict:
+    df = make_candidates_df(k)
+    service = CandidateService(CANDIDATES_DATA_PATH, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE)
+    df['score'] = service._calculate_scores(df)
+    df = df.sort_values('score', ascending=False, kind='stable')
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    pdf_bytes = PDFReportGenerator().generate_bytes(df, layout)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss está en KiB en Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'k': k, 'layout': layout, 'seconds': elapsed, 'size_kib': len(pdf_bytes) / 1024,
+        'peak_rss_mib': peak_rss / 1024, 'rss_growth_mib': (peak_rss - baseline_rss) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--k', type=int, nargs='+', default=[10, 1_000, 10_000])
+    parser.add_argument('--layouts', nargs='+', choices=REPORT_LAYOUTS, default=list(REPORT_LAYOUTS))
+    parser.add_argument('--case', nargs=2, metavar=('K', 'LAYOUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(int(args.case[0]), args.case[1])))
+        return
+
+    print(f"{'k':>8} {'layout':>9} {'time (s)':>9} {'pdf (KiB)':>10} {'peak RSS (MiB)':>15} {'growth (MiB)':>13}")
+    for k in args.k:
+        for layout in args.layouts:
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_report', '--case', str(k), layout],
+                check=True, capture_output=True, text=True
+            ).stdout
+            r = json.loads(output)
+            print(f"{r['k']:>8} {r['layout']:>9} {r['seconds']:>9.3f} {r['size_kib']:>10.0f} "
+                  f"{r['peak_rss_mib']:>15.1f} {r['rss_growth_mib']:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+bench_scoring.py
+
+Compara el cálculo de score por fila (df.apply + _calculate_score) contra el vectorizado (score_candidates),
+verificando además que ambos den exactamente los mismos resultados.
+
+Uso (desde `app/`): python -m benchmarks.bench_scoring --rows 1000 10000 100000
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import make_candidates_df, best_of
+from src.constants import CANDIDATES_DATA_PATH, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE
+from src.services import CandidateService
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    service = CandidateService(CANDIDATES_DATA_PATH, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE)
+
+    print(f"{'rows':>10} {'per-row (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for n in args.rows:
+        df = make_candidates_df(n)
+        row_wise = df.apply(lambda row: service._calculate_score(row), axis=1).to_numpy()
+        vectorized = service._calculate_scores(df).to_numpy()
+        assert np.array_equal(row_wise, vectorized), 'vectorized scores differ from the per-row path'
+
+        t_row = best_of(lambda: df.apply(lambda row: service._calculate_score(row), axis=1), args.repeat)
+        t_vec = best_of(lambda: service._calculate_scores(df), args.repeat)
+        print(f'{n:>10} {t_row:>12.4f} {t_vec:>15.4f} {t_row / t_vec:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
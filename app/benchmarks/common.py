@@ -0,0 +1,25 @@
+"""
+common.py
+
+Helpers compartidos por los benchmarks. Se ejecutan desde `app/`, por ej: `python -m benchmarks.bench_scoring`
+"""
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_candidates_df
+
+
+def make_candidates_df(n: int, seed: int = 0) -> pd.DataFrame:
+    """Dataframe sintético de n candidatos, con el mismo formato que devuelve el store (skills como lista)"""
+    return generate_candidates_df(n, seed)
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    """Mejor tiempo (en segundos) de `repeat` ejecuciones de fn"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,130 @@
+"""
+synthetic.py
+
+Generador de candidatos sintéticos, reproducible (con semilla), para benchmarks y para cargar datos de prueba.
+
+Los candidatos respetan las restricciones de StudentCandidate (email válido, promedio entre 3 y 10, skills como lista
+de strings) y siguen distribuciones parecidas a las reales: una minoría de universidades de PRESTIGE_COLLEGES,
+promedios concentrados alrededor de 7 y entre 0 y 10 skills por candidato, con más chances para las de
+RELEVANT_SKILLS_FOR_TRAINEE_ROLE que para el resto.
+
+Uso (desde `app/`): python -m benchmarks.synthetic --rows 100000 --output data/candidates_100k.csv
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.constants import HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE
+from src.models import StudentCandidate
+
+FIRST_NAMES = [
+    'Sofia', 'Mateo', 'Valentina', 'Santiago', 'Martina', 'Benjamin', 'Lucia', 'Thiago', 'Emma', 'Joaquin',
+    'Olivia', 'Liam', 'Camila', 'Noah', 'Isabella', 'Lucas', 'Mia', 'Daniel', 'Julia', 'Tomas', 'Ana', 'David',
+]
+LAST_NAMES = [
+    'Garcia', 'Rodriguez', 'Gonzalez', 'Fernandez', 'Lopez', 'Martinez', 'Smith', 'Johnson', 'Brown', 'Perez',
+    'Gomez', 'Diaz', 'Williams', 'Jones', 'Miller', 'Davis', 'Sanchez', 'Romero', 'Alvarez', 'Torres', 'Ruiz',
+]
+EMAIL_DOMAINS = ['gmail.com', 'yahoo.com', 'outlook.com', 'example.com', 'university.edu']
+OTHER_COLLEGES = [
+    'University of Buenos Aires', 'National University of La Plata', 'University of Toronto', 'University of Alberta',
+    'University of New York', 'Harvard Extension School', 'University of Madrid', 'University of Sao Paulo',
+    'Technological Institute of Monterrey', 'University of Chile', 'University of Michigan', 'Georgia Tech',
+]
+DEGREES = ['Computer Science', 'Data Science', 'Software Engineering', 'Mathematics', 'Physics', 'Economics',
+           'Journalism', 'History']
+DEGREE_WEIGHTS = [0.3, 0.15, 0.15, 0.1, 0.08, 0.1, 0.06, 0.06]
+OTHER_SKILLS = ['Writing', 'Editing', 'Management', 'Finance', 'Leadership', 'Windows', 'ORMs', 'Excel',
+                'Public Speaking', 'Photoshop', 'Marketing', 'Sales']
+COMPANIES = ['Globant', 'Mercado Libre', 'Microsoft', 'Google', 'Accenture', 'Daily Bugle', 'Startup']
+
+# Proporción de candidatos de universidades de prestigio y con experiencia laboral
+PRESTIGE_SHARE = 0.15
+WORK_EXPERIENCE_SHARE = 0.4
+# Peso relativo de una skill relevante frente a una no relevante al elegir las skills de un candidato
+RELEVANT_SKILL_WEIGHT = 2.0
+MAX_SKILLS = 10
+CHUNK_SIZE = 100_000
+
+
+def generate_candidates_df(n: int, seed: int = 0) -> pd.DataFrame:
+    """Dataframe de n candidatos sintéticos (mismas columnas que HEADER, skills como lista de str).
+    Mismo n y semilla dan siempre los mismos candidatos"""
+    rng = np.random.default_rng(seed)
+    chunks = [_generate_chunk(rng, start, min(CHUNK_SIZE, n - start)) for start in range(0, n, CHUNK_SIZE)]
+    if not chunks:
+        return pd.DataFrame(columns=HEADER)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_candidates_csv(df: pd.DataFrame, path) -> None:
+    """Escribe los candidatos con el formato de candidates.csv (skills separadas por coma)"""
+    df = df.assign(skills=df['skills'].map(','.join))
+    df.to_csv(path, index=False, columns=HEADER)
+
+
+def validate_sample(df: pd.DataFrame, size: int = 1000) -> None:
+    """Valida una muestra de los candidatos contra StudentCandidate (lanza pydantic.ValidationError si alguno falla)"""
+    for record in df.head(size).to_dict(orient='records'):
+        StudentCandidate(**record)
+
+# --------------------- Helper methods ---------------------
+
+def _generate_chunk(rng: np.random.Generator, start: int, n: int) -> pd.DataFrame:
+    first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), n)]
+    last = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), n)]
+    domains = np.array(EMAIL_DOMAINS, dtype=object)[rng.integers(0, len(EMAIL_DOMAINS), n)]
+    ids = np.arange(start, start + n).astype(str).astype(object)
+
+    prestige = rng.random(n) < PRESTIGE_SHARE
+    colleges = np.where(
+        prestige,
+        np.array(PRESTIGE_COLLEGES, dtype=object)[rng.integers(0, len(PRESTIGE_COLLEGES), n)],
+        np.array(OTHER_COLLEGES, dtype=object)[rng.integers(0, len(OTHER_COLLEGES), n)],
+    )
+    averages = np.round(np.clip(rng.normal(7.0, 1.3, n), 3, 10), 1)
+
+    has_experience = rng.random(n) < WORK_EXPERIENCE_SHARE
+    companies = np.array(COMPANIES, dtype=object)[rng.integers(0, len(COMPANIES), n)]
+    years = rng.integers(2015, 2025, n).astype(str).astype(object)
+    work_experience = np.where(has_experience, companies + ': ' + years + ' - Present', '-')
+
+    return pd.DataFrame({
+        'full_name': first + ' ' + last,
+        'email': pd.Series(first + '.' + last + ids + '@' + domains).str.lower().to_numpy(),
+        'college': colleges,
+        'degree': rng.choice(np.array(DEGREES, dtype=object), size=n, p=DEGREE_WEIGHTS),
+        'academic_average': averages,
+        'skills': _generate_skills(rng, n),
+        'work_experience': work_experience,
+    }, columns=HEADER)
+
+
+def _generate_skills(rng: np.random.Generator, n: int):
+    pool = RELEVANT_SKILLS_FOR_TRAINEE_ROLE + OTHER_SKILLS
+    weights = np.array([RELEVANT_SKILL_WEIGHT] * len(RELEVANT_SKILLS_FOR_TRAINEE_ROLE) + [1.0] * len(OTHER_SKILLS))
+    counts = np.minimum(rng.poisson(4, n), MAX_SKILLS)
+    # Muestreo ponderado sin reemplazo de todas las filas a la vez (Gumbel top-k): se ordena por clave y cada
+    # candidato se queda con sus primeras `count` skills
+    keys = np.log(weights) + rng.gumbel(size=(n, len(pool)))
+    order = np.argsort(-keys, axis=1)[:, :MAX_SKILLS].tolist()
+    return [[pool[i] for i in row[:count]] for row, count in zip(order, counts.tolist())]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, required=True)
+    args = parser.parse_args()
+
+    df = generate_candidates_df(args.rows, args.seed)
+    validate_sample(df)
+    write_candidates_csv(df, args.output)
+    print(f'{len(df)} candidates written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,37 +1,141 @@
+import json
+import time
+from contextlib import asynccontextmanager
 from math import ceil
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException, Query, Depends
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Query, Depends, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import ValidationError
 
+from src.bulk_import import parse_candidates
+from src.concurrency import (
+    BlockingExecutor, ExecutorOverloaded, get_blocking_executor, shutdown_blocking_executor, shutdown_load_pool
+)
+from src.export import EXPORT_FORMATS, export_candidates, export_media_type
+from src.metrics import BLOCKING_TASKS_PENDING, REQUEST_DURATION, render_metrics, stage, start_request
 from src.models import StudentCandidate
 from src.services import CandidateService
-from src.pdf_report import PDFReportGenerator
+from src.storage import create_storage
+from src.pdf_report import PDFReportGenerator, REPORT_LAYOUTS
+from src.report_cache import ReportCache, etag_matches, get_report_cache, make_etag
+from src.report_jobs import ReportJobManager, get_report_job_manager, shutdown_report_job_manager
+from src.scoring import profiles_from_config
 from src.constants import *
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Al iniciar se recuperan los jobs de reportes que quedaron pendientes
+    get_report_jobs()
+    yield
+    shutdown_report_job_manager()
+    shutdown_blocking_executor()
+    shutdown_load_pool()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.exception_handler(ExecutorOverloaded)
+async def executor_overloaded_handler(_request: Request, _exc: ExecutorOverloaded):
+    return JSONResponse(
+        status_code=503,
+        content={'detail': 'Server overloaded, try again later'},
+        headers={'Retry-After': str(OVERLOAD_RETRY_AFTER_SECONDS)}
+    )
+
+if INSTRUMENTATION_ENABLED:
+    @app.middleware('http')
+    async def instrument_request(request: Request, call_next):
+        """Mide el request: duración total (histograma por ruta) y de cada etapa, devueltas en Server-Timing.
+        Con PROFILING_ENABLED, un request con el header X-Profile además corre su trabajo bloqueante bajo cProfile
+        y deja el .prof en PROFILES_DIR (el nombre del archivo vuelve en ese mismo header)"""
+        timings, profile = start_request(profile=PROFILING_ENABLED and PROFILE_HEADER in request.headers)
+        start = time.perf_counter()
+        response = await call_next(request)
+        duration = time.perf_counter() - start
+        route = getattr(request.scope.get('route'), 'path', 'unmatched')
+        REQUEST_DURATION.observe(duration, request.method, route, str(response.status_code))
+        # Las etapas de una respuesta en streaming que corren después de empezar a enviarla no llegan al header
+        response.headers['Server-Timing'] = timings.server_timing(total=duration)
+        if profile is not None:
+            # Opt-in y de diagnóstico: se escribe el .prof (chico) directamente, sin pasar por el executor
+            dump_path = profile.dump(PROFILES_DIR, f'{request.method} {route}')
+            if dump_path is not None:
+                response.headers[PROFILE_HEADER] = dump_path.name
+        return response
+
+# Tamaño de los bloques en que se envía el PDF al cliente
+REPORT_CHUNK_SIZE = 64 * 1024
+
+# Perfiles de scoring de los otros roles, además del default
+SCORING_PROFILE_LIST = profiles_from_config(SCORING_PROFILES)
 
 def get_candidates_service():
-    return CandidateService(CANDIDATES_DATA_PATH, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE)
+    storage = create_storage(
+        STORAGE_BACKEND, CANDIDATES_DATA_PATH, CANDIDATES_DB_PATH, HEADER, load_workers=CSV_LOAD_WORKERS,
+        use_snapshot=CSV_SNAPSHOT_ENABLED
+    )
+    return CandidateService(
+        CANDIDATES_DATA_PATH, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE, storage=storage,
+        profiles=SCORING_PROFILE_LIST
+    )
 
 def get_report_generator():
     return PDFReportGenerator()
 
+def get_reports_cache():
+    return get_report_cache(REPORT_CACHE_MAX_BYTES)
+
+def get_executor():
+    return get_blocking_executor(API_EXECUTOR_WORKERS, API_EXECUTOR_MAX_QUEUE)
+
+def get_report_jobs():
+    return get_report_job_manager(
+        REPORT_JOBS_DIR, REPORT_JOB_WORKERS, REPORT_JOB_MAX_PENDING, REPORT_JOB_RETENTION_SECONDS
+    )
+
 @app.post('/candidates/')
-def create_candidate(
+async def create_candidate(
         candidate: StudentCandidate,
-        candidates_service: CandidateService = Depends(get_candidates_service)
+        candidates_service: CandidateService = Depends(get_candidates_service),
+        executor: BlockingExecutor = Depends(get_executor)
 ):
     """Crea nuevo candidato"""
     try:
-        candidates_service.save_candidate(candidate)
-        return {'message': 'success', 'candidate': candidate}
+        candidate_id = await executor.run(candidates_service.save_candidate, candidate)
+        return {'message': 'success', 'id': candidate_id, 'candidate': candidate}
+    except ExecutorOverloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post('/candidates/bulk')
+async def create_candidates_bulk(
+        request: Request,
+        candidates_service: CandidateService = Depends(get_candidates_service),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    """Crea varios candidatos en una única escritura. El body puede ser un array JSON (application/json),
+    NDJSON (application/x-ndjson) o csv (text/csv). Devuelve los IDs asignados, en el mismo orden"""
+    body = await request.body()
+    try:
+        candidates = await executor.run(parse_candidates, body, request.headers.get('content-type', ''))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        candidate_ids = await executor.run(candidates_service.save_candidates, candidates)
+    except ExecutorOverloaded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {'message': 'success', 'count': len(candidate_ids), 'ids': candidate_ids}
+
 @app.get('/candidates/')
-def get_candidates(
-        with_score = True,
+async def get_candidates(
+        request: Request,
+        response: Response,
+        with_score: bool = True,
         name: Optional[str] = Query(None, description="Filter by name"),
         college: Optional[str] = Query(None, description="Filter by college"),
         degree: Optional[str] = Query(None, description="Filter by degree"),
@@ -39,32 +143,40 @@ def get_candidates(
         max_score: Optional[float] = Query(None, ge=0, le=1, description="Filter by maximum score"),
         page: int = Query(1, ge=1, description="Page number"),
         per_page: int = Query(10, ge=1, le=100, description="Items per page"),
-        candidates_service: CandidateService = Depends(get_candidates_service)
+        skill: Optional[List[str]] = Query(None, description="Filter by skill (repeatable: all must match)"),
+        profile: Optional[str] = Query(None, description="Scoring profile (default: trainee)"),
+        candidates_service: CandidateService = Depends(get_candidates_service),
+        executor: BlockingExecutor = Depends(get_executor)
 ):
-    """Obtiene lista de candidatos con filtros (opcionales)"""
-    candidates_df = candidates_service.get_all_candidates(with_score)
-    candidates = candidates_df.to_dict(orient="records")
-
-    # Al filtrar con 'in', nos permite queries más flexibles: por ej,
-    # si filtramos degree = 'science', entonces nos devuelve tanto Computer Science como Data Science
-    if name:
-        candidates = [c for c in candidates if name.lower() in c['full_name'].lower()]
-    if college:
-        candidates = [c for c in candidates if college.lower() in c['college'].lower()]
-    if degree:
-        candidates = [c for c in candidates if degree.lower() in c['degree'].lower()]
-    if min_score is not None:
-        candidates = [c for c in candidates if c['score'] >= min_score]
-    if max_score is not None:
-        candidates = [c for c in candidates if c['score'] <= max_score]
-
-    total_candidates = len(candidates)
+    """Obtiene lista de candidatos con filtros (opcionales). Los scores son los del perfil de scoring indicado.
+    Soporta If-None-Match: si los datos no cambiaron, responde 304 sin consultar nada"""
+    _check_profile(candidates_service, profile)
+    # El filtrado y la paginación se resuelven en CandidateService, sin convertir todos los candidatos a dict.
+    # Los requests idénticos concurrentes comparten una única consulta
+    query_key = (
+        'candidates', name, college, degree, min_score, max_score, page, per_page, with_score, tuple(skill or ()),
+        profile
+    )
+    etag = await _data_etag(candidates_service, executor, query_key)
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    response.headers['ETag'] = etag
+    total_candidates, paginated_candidates = await executor.run_shared(
+        query_key,
+        candidates_service.query_candidates,
+        name=name,
+        college=college,
+        degree=degree,
+        min_score=min_score,
+        max_score=max_score,
+        page=page,
+        per_page=per_page,
+        with_score=with_score,
+        skills=skill,
+        profile=profile
+    )
     total_pages = ceil(total_candidates / per_page)
 
-    start = (page - 1) * per_page
-    end = start + per_page
-    paginated_candidates = candidates[start:end]
-
     return {
         'total': total_candidates,
         'page': page,
@@ -73,31 +185,334 @@ def get_candidates(
         'candidates': paginated_candidates
     }
 
+@app.get('/candidates/export')
+async def export_all_candidates(
+        export_format: str = Query('ndjson', alias='format', description=f"One of: {', '.join(EXPORT_FORMATS)}"),
+        with_score: bool = True,
+        name: Optional[str] = Query(None, description="Filter by name"),
+        college: Optional[str] = Query(None, description="Filter by college"),
+        degree: Optional[str] = Query(None, description="Filter by degree"),
+        min_score: Optional[float] = Query(None, ge=0, le=1, description="Filter by minimum score"),
+        max_score: Optional[float] = Query(None, ge=0, le=1, description="Filter by maximum score"),
+        skill: Optional[List[str]] = Query(None, description="Filter by skill (repeatable: all must match)"),
+        profile: Optional[str] = Query(None, description="Scoring profile (default: trainee)"),
+        candidates_service: CandidateService = Depends(get_candidates_service),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    """Exporta (en streaming, sin paginar) todos los candidatos que cumplen los filtros, en NDJSON, csv o Parquet"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{export_format}'")
+    _check_profile(candidates_service, profile)
+    chunks = candidates_service.iter_candidates(
+        name=name,
+        college=college,
+        degree=degree,
+        min_score=min_score,
+        max_score=max_score,
+        with_score=with_score,
+        skills=skill,
+        profile=profile
+    )
+    media_type, filename = export_media_type(export_format)
+    return StreamingResponse(
+        executor.iterate(export_candidates(chunks, export_format)),
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+@app.get('/candidates/changes')
+async def get_candidate_changes(
+        since_id: Optional[int] = Query(None, ge=-1, description="Cursor: last candidate ID already seen"),
+        limit: int = Query(CHANGES_BATCH_SIZE, ge=1, le=1000, description="Max candidates to return"),
+        wait: float = Query(0, ge=0, le=CHANGES_MAX_WAIT_SECONDS, description="Seconds to wait for new ones"),
+        with_score: bool = True,
+        profile: Optional[str] = Query(None, description="Scoring profile (default: trainee)"),
+        candidates_service: CandidateService = Depends(get_candidates_service),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    """Change feed (long-poll): devuelve los candidatos dados de alta después de since_id (-1 para todos; sin
+    since_id, solo los que lleguen a partir de ahora) y el cursor para la próxima llamada (next_since_id).
+    Si no hay nuevos y wait > 0, espera hasta wait segundos a que llegue alguno"""
+    _check_profile(candidates_service, profile)
+    feed = candidates_service.get_change_feed()
+    deadline = time.monotonic() + wait
+    cursor = since_id
+    while True:
+        version = feed.version
+        cursor, candidates, has_more = await executor.run(
+            candidates_service.get_candidates_since, cursor, limit, with_score, profile
+        )
+        remaining = deadline - time.monotonic()
+        if candidates or remaining <= 0:
+            break
+        # Las altas de este proceso despiertan enseguida; las de otros se ven al revisar cada POLL_INTERVAL
+        await feed.wait(version, min(remaining, CHANGES_POLL_INTERVAL_SECONDS))
+    return {'since_id': since_id, 'next_since_id': cursor, 'has_more': has_more, 'candidates': candidates}
+
+@app.get('/candidates/stream')
+async def stream_candidate_changes(
+        request: Request,
+        since_id: Optional[int] = Query(None, ge=-1, description="Cursor: last candidate ID already seen"),
+        with_score: bool = True,
+        profile: Optional[str] = Query(None, description="Scoring profile (default: trainee)"),
+        candidates_service: CandidateService = Depends(get_candidates_service),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    """Change feed (Server-Sent Events): envía un evento 'candidate' por cada alta posterior a since_id (o al
+    header Last-Event-ID, al reconectar), con el ID del candidato como id del evento"""
+    _check_profile(candidates_service, profile)
+    last_event_id = request.headers.get('last-event-id')
+    if last_event_id is not None and last_event_id.lstrip('-').isdigit():
+        since_id = int(last_event_id)
+    # Se resuelve el cursor inicial antes de empezar la respuesta (si el servidor está saturado, es un 503)
+    cursor, _, _ = await executor.run(candidates_service.get_candidates_since, since_id, 0, False)
+
+    return StreamingResponse(
+        _candidate_events(request, candidates_service, executor, cursor, with_score, profile),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.api_route('/candidates/count', methods=['GET', 'HEAD'])
+async def count_candidates(
+        request: Request,
+        candidates_service: CandidateService = Depends(get_candidates_service),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    """Cantidad de candidatos (y el último ID), sin cargarlos. Con HEAD, solo los headers: X-Total-Count y un ETag
+    que cambia con cada alta, así un cliente puede saber si algo cambió sin volver a pedir nada"""
+    etag = await _data_etag(candidates_service, executor, 'count')
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    count = await executor.run(candidates_service.count_candidates)
+    headers = {'ETag': etag, 'X-Total-Count': str(count)}
+    if request.method == 'HEAD':
+        return Response(headers=headers)
+    return JSONResponse({'count': count, 'last_id': count - 1}, headers=headers)
+
+@app.get('/candidates/top')
+async def get_top_candidates(
+        request: Request,
+        response: Response,
+        k: int = Query(10, ge=1, description="Number of top candidates"),
+        with_score: bool = True,
+        profile: Optional[str] = Query(None, description="Scoring profile (default: trainee)"),
+        candidates_service: CandidateService = Depends(get_candidates_service),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    """Obtiene los top k candidatos según score de preselección del perfil (ordenados descendientemente).
+    Soporta If-None-Match"""
+    _check_profile(candidates_service, profile)
+    etag = await _data_etag(candidates_service, executor, ('top', k, with_score, profile))
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    response.headers['ETag'] = etag
+
+    def get_top_records():
+        top_df = candidates_service.get_preselected_candidates(k, with_score, profile)
+        with stage('to_dict', rows=len(top_df)):
+            return top_df.to_dict(orient="records")
+
+    return {
+        'k': k,
+        'candidates': await executor.run_shared(('top', k, with_score, profile), get_top_records)
+    }
+
+@app.get('/profiles/')
+async def get_scoring_profiles(candidates_service: CandidateService = Depends(get_candidates_service)):
+    """Lista los perfiles de scoring disponibles (el primero es el default)"""
+    return {
+        'profiles': [
+            {
+                'name': profile.name,
+                'weights': profile.weights,
+                'prestige_colleges': list(profile.prestige_colleges),
+                'relevant_skills': list(profile.relevant_skills),
+                'academic_average_threshold': profile.academic_average_threshold,
+            }
+            for profile in candidates_service.profiles.values()
+        ]
+    }
+
 @app.get('/candidates/{candidate_id}')
-def get_candidate(
+async def get_candidate(
+        request: Request,
+        response: Response,
         candidate_id: int,
-        candidates_service: CandidateService = Depends(get_candidates_service)
+        candidates_service: CandidateService = Depends(get_candidates_service),
+        executor: BlockingExecutor = Depends(get_executor)
 ):
-    """Obtiene un candidato especifico por su ID"""
-    candidate = candidates_service.get_candidate_by_id(candidate_id)
+    """Obtiene un candidato especifico por su ID. Soporta If-None-Match"""
+    etag = await _data_etag(candidates_service, executor, ('candidate', candidate_id))
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    candidate = await executor.run(candidates_service.get_candidate_by_id, candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
+    response.headers['ETag'] = etag
     return {'candidate': candidate}
 
 @app.get('/reports/')
-def generate_report(
+async def generate_report(
+        request: Request,
         k: int = Query(10, description="Top k candidates to include in report"),
+        layout: str = Query('detailed', description=f"One of: {', '.join(REPORT_LAYOUTS)}"),
+        profile: Optional[str] = Query(None, description="Scoring profile (default: trainee)"),
         candidates_service: CandidateService = Depends(get_candidates_service),
-        report_generator: PDFReportGenerator = Depends(get_report_generator)
+        report_generator: PDFReportGenerator = Depends(get_report_generator),
+        report_cache: ReportCache = Depends(get_reports_cache),
+        executor: BlockingExecutor = Depends(get_executor)
 ):
-    """Genera el PDF report de los top k candidatos según score de preselección"""
+    """Genera el PDF report de los top k candidatos según score de preselección.
+    El layout 'compact' (una fila por candidato) está pensado para k grandes.
+    Los reportes se cachean por (k, layout, versión de los datos, perfil de scoring) y soportan If-None-Match"""
+    if layout not in REPORT_LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"Unsupported layout '{layout}'")
+    _check_profile(candidates_service, profile)
+    # La versión se lee antes de generar: si entra un alta en el medio, el reporte cacheado es a lo sumo más nuevo
+    # que su clave, nunca más viejo
+    data_version = await executor.run(candidates_service.get_data_version)
+    cache_key = (k, layout, data_version, candidates_service.get_profile(profile).fingerprint)
+    etag = report_cache.etag(cache_key)
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers={'ETag': etag})
+
+    def render() -> bytes:
+        preselected_candidates = candidates_service.get_preselected_candidates(k, profile=profile)
+        # Se genera en memoria y se envía directamente: no hay un report.pdf compartido entre requests
+        return report_generator.generate_bytes(preselected_candidates, layout)
+
     try:
-        preselected_candidates = candidates_service.get_preselected_candidates(k)
-        pdf_path = report_generator.generate(preselected_candidates, 'report.pdf')
-        return FileResponse(
-            path=pdf_path,
-            media_type='application/pdf',
-            filename='report.pdf'
-        )
+        pdf_bytes = await executor.run_shared(('report', cache_key), report_cache.get_or_render, cache_key, render)
+    except ExecutorOverloaded:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f'Error generating report: {str(e)}')
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f'Error generating report: {str(e)}')
+    return StreamingResponse(
+        _aiter_bytes(pdf_bytes, REPORT_CHUNK_SIZE),
+        media_type='application/pdf',
+        headers={
+            'Content-Disposition': 'attachment; filename="report.pdf"',
+            'Content-Length': str(len(pdf_bytes)),
+            'ETag': etag,
+        }
+    )
+
+@app.post('/reports/jobs', status_code=202)
+async def create_report_job(
+        k: int = Query(10, ge=1, description="Top k candidates to include in report"),
+        layout: str = Query('detailed', description=f"One of: {', '.join(REPORT_LAYOUTS)}"),
+        profile: Optional[str] = Query(None, description="Scoring profile (default: trainee)"),
+        candidates_service: CandidateService = Depends(get_candidates_service),
+        report_jobs: ReportJobManager = Depends(get_report_jobs),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    """Encola la generación del PDF report de los top k candidatos (los del momento del request).
+    Devuelve el job, cuyo estado se consulta en /reports/jobs/{job_id}"""
+    if layout not in REPORT_LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"Unsupported layout '{layout}'")
+    _check_profile(candidates_service, profile)
+
+    def submit():
+        return report_jobs.submit(candidates_service.get_preselected_candidates(k, profile=profile), k, layout)
+
+    try:
+        return await executor.run(submit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.get('/reports/jobs/{job_id}')
+async def get_report_job(
+        job_id: str,
+        report_jobs: ReportJobManager = Depends(get_report_jobs),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    """Estado y progreso de un job de reporte"""
+    job = await executor.run(report_jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+@app.get('/reports/jobs/{job_id}/download')
+async def download_report_job(
+        job_id: str,
+        report_jobs: ReportJobManager = Depends(get_report_jobs),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    """Descarga el PDF de un job terminado"""
+    job = await executor.run(report_jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    report_path = await executor.run(report_jobs.report_path, job_id)
+    if report_path is None:
+        raise HTTPException(status_code=409, detail=f"Report job is {job['status']}")
+    return FileResponse(path=report_path, media_type='application/pdf', filename='report.pdf')
+
+@app.delete('/reports/jobs/{job_id}')
+async def cancel_report_job(
+        job_id: str,
+        report_jobs: ReportJobManager = Depends(get_report_jobs),
+        executor: BlockingExecutor = Depends(get_executor)
+):
+    """Cancela un job de reporte que todavía no terminó"""
+    job = await executor.run(report_jobs.cancel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+@app.get('/metrics', response_class=PlainTextResponse)
+async def get_metrics(executor: BlockingExecutor = Depends(get_executor)):
+    """Métricas del proceso en formato de texto de Prometheus: duración y filas por etapa, duración de los
+    requests por ruta, aciertos de los caches, candidatos en memoria y tareas bloqueantes pendientes"""
+    BLOCKING_TASKS_PENDING.set(executor.pending)
+    return PlainTextResponse(render_metrics(), media_type='text/plain; version=0.0.4')
+
+# --------------------- Helper methods ---------------------
+
+async def _candidate_events(
+        request: Request,
+        candidates_service: CandidateService,
+        executor: BlockingExecutor,
+        cursor: int,
+        with_score: bool,
+        profile: Optional[str]
+):
+    feed = candidates_service.get_change_feed()
+    # Indica al cliente cada cuánto reintentar si se corta la conexión
+    yield f'retry: {int(CHANGES_POLL_INTERVAL_SECONDS * 1000)}\n\n'
+    idle = 0.0
+    while not await request.is_disconnected():
+        version = feed.version
+        try:
+            cursor, candidates, has_more = await executor.run(
+                candidates_service.get_candidates_since, cursor, CHANGES_BATCH_SIZE, with_score, profile
+            )
+        except ExecutorOverloaded:
+            # La respuesta ya empezó: no se corta, se reintenta más tarde
+            candidates, has_more = [], False
+        for candidate in candidates:
+            yield f"id: {candidate['id']}\nevent: candidate\ndata: {json.dumps(candidate, ensure_ascii=False)}\n\n"
+        if candidates:
+            idle = 0.0
+        if has_more:
+            continue
+        if not await feed.wait(version, CHANGES_POLL_INTERVAL_SECONDS):
+            idle += CHANGES_POLL_INTERVAL_SECONDS
+            if idle >= CHANGES_HEARTBEAT_SECONDS:
+                # Comentario SSE: mantiene viva la conexión (y detecta si el cliente se fue)
+                yield ': keep-alive\n\n'
+                idle = 0.0
+
+async def _data_etag(candidates_service: CandidateService, executor: BlockingExecutor, key) -> str:
+    # La versión se lee antes de consultar: si entra un alta en el medio, la respuesta es a lo sumo más nueva que su
+    # ETag, nunca más vieja
+    data_version = await executor.run(candidates_service.get_data_version)
+    return make_etag((key, data_version))
+
+def _check_profile(candidates_service: CandidateService, profile: Optional[str]):
+    if profile is not None and profile not in candidates_service.profiles:
+        raise HTTPException(status_code=400, detail=f"Unknown scoring profile '{profile}'")
+
+async def _aiter_bytes(data: bytes, chunk_size: int):
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
@@ -0,0 +1,58 @@
+"""
+bulk_import.py
+
+Parseo y validación en lote de candidatos para el alta masiva (POST /candidates/bulk).
+
+Acepta un array JSON, NDJSON (un candidato JSON por línea) o un csv con el mismo header que `candidates.csv`
+(skills separadas por coma). Todos los candidatos se validan juntos contra StudentCandidate.
+"""
+import io
+import json
+from typing import List
+
+import pandas as pd
+from pydantic import TypeAdapter
+
+from src.models import StudentCandidate
+
+JSON_CONTENT_TYPE = 'application/json'
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+CSV_CONTENT_TYPES = ('text/csv', 'application/csv')
+
+_candidates_adapter = TypeAdapter(List[StudentCandidate])
+
+
+def parse_candidates(body: bytes, content_type: str) -> List[StudentCandidate]:
+    """Devuelve los candidatos validados. Lanza ValueError si el formato es inválido y
+    pydantic.ValidationError (con el índice de cada candidato inválido) si alguno no cumple el modelo"""
+    media_type = content_type.split(';')[0].strip().lower()
+    if media_type in CSV_CONTENT_TYPES:
+        records = _parse_csv(body)
+    elif media_type in NDJSON_CONTENT_TYPES:
+        records = [_parse_json(line) for line in body.splitlines() if line.strip()]
+    elif media_type == JSON_CONTENT_TYPE or not media_type:
+        records = _parse_json(body)
+        if not isinstance(records, list):
+            raise ValueError('Expected a JSON array of candidates')
+    else:
+        raise ValueError(f'Unsupported content type: {content_type}')
+    return _candidates_adapter.validate_python(records)
+
+
+def _parse_json(data: bytes):
+    try:
+        return json.loads(data)
+    except json.JSONDecodeError as e:
+        raise ValueError(f'Invalid JSON: {e}') from e
+
+
+def _parse_csv(body: bytes) -> List[dict]:
+    try:
+        df = pd.read_csv(io.BytesIO(body), dtype=str, keep_default_na=False)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f'Invalid csv: {e}') from e
+    records = df.to_dict(orient='records')
+    for record in records:
+        if 'skills' in record:
+            record['skills'] = [skill for skill in record['skills'].split(',') if skill]
+    return records
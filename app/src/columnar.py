@@ -0,0 +1,330 @@
+"""
+columnar.py
+
+Representación compacta, por columnas, de los candidatos en memoria.
+
+Provee la clase CompactCandidates, que guarda lo mismo que el dataframe de `CandidateStorage.load` pero:
+- full_name, email y work_experience como strings de Arrow (un buffer contiguo en lugar de un objeto por valor);
+- college y degree como Categorical (cada valor distinto se guarda una vez);
+- academic_average como float64 (el mismo valor que en el dataframe: el score depende de comparaciones exactas);
+- skills como matriz dispersa en formato CSR contra un vocabulario global: `skill_codes` tiene el código de cada
+  skill de cada candidato, y las del candidato i están en `skill_codes[skill_indptr[i]:skill_indptr[i + 1]]`.
+Así, contar o filtrar por skills es aritmética sobre arrays de enteros en lugar de recorrer listas de Python.
+Se puede volver a un dataframe como el original (to_frame) o a StudentCandidate (to_candidate) para las filas
+que se necesiten, y pasar a una tabla de Arrow y volver (to_arrow / from_arrow) sin convertir valor por valor: las
+skills quedan como columna de listas (con la skill codificada contra el vocabulario), las categóricas como
+diccionarios.
+"""
+import copy
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.models import StudentCandidate
+from src.text_index import TrigramIndex
+
+CATEGORICAL_COLUMNS = ('college', 'degree')
+# Columnas de texto libre con índice de trigramas para contains (en las categóricas se buscan las categorías)
+TEXT_INDEX_COLUMNS = ('full_name',)
+STRING_DTYPE = pd.StringDtype('pyarrow')
+AVERAGE_DTYPE = np.float64
+SKILL_CODE_DTYPE = np.int32
+
+
+class CompactCandidates:
+    def __init__(self, header: List[str]):
+        self.header = list(header)
+        # Sin candidatos, cada columna está vacía pero con su tipo (to_frame devuelve un dataframe vacío válido)
+        self._columns: Dict[str, pd.Series] = {
+            column: self._compact_column(column, pd.Series([], dtype=object)) for column in self.header
+            if column != 'skills'
+        }
+        self._skill_vocabulary: List[str] = []
+        self._skill_index = pd.Index([], dtype=object)
+        self._skill_indptr = np.zeros(1, dtype=np.int64)
+        self._skill_codes = np.empty(0, dtype=SKILL_CODE_DTYPE)
+        self._text_indexes = {column: TrigramIndex() for column in TEXT_INDEX_COLUMNS if column in self.header}
+        self._length = 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, header: Optional[List[str]] = None) -> 'CompactCandidates':
+        """Construye la representación compacta a partir de un dataframe con las skills como lista"""
+        candidates = cls(header if header is not None else list(df.columns))
+        candidates.extend(df)
+        return candidates
+
+    @classmethod
+    def concat(cls, parts: Sequence['CompactCandidates'], header: List[str]) -> 'CompactCandidates':
+        """Une representaciones compactas (por ej, de shards de un mismo archivo) en el orden dado. El resultado es
+        igual al de from_frame sobre todas las filas juntas: categorías ordenadas y el vocabulario de skills en
+        orden de aparición"""
+        candidates = cls(header)
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return candidates
+        for column in header:
+            if column == 'skills':
+                continue
+            values = [part._columns[column] for part in parts]
+            if column in CATEGORICAL_COLUMNS:
+                candidates._columns[column] = pd.Series(
+                    pd.api.types.union_categoricals(values, sort_categories=True)
+                )
+            else:
+                candidates._columns[column] = pd.concat(values, ignore_index=True)
+
+        # Cada shard tiene su propio vocabulario: se unen en orden de aparición y se recodifican sus skills
+        vocabulary = list(parts[0]._skill_vocabulary)
+        for part in parts[1:]:
+            known = pd.Index(vocabulary, dtype=object)
+            unknown = known.get_indexer(part._skill_vocabulary) < 0
+            vocabulary += [skill for skill, is_unknown in zip(part._skill_vocabulary, unknown) if is_unknown]
+        skill_index = pd.Index(vocabulary, dtype=object)
+        codes, indptrs, offset = [], [np.zeros(1, dtype=np.int64)], 0
+        for part in parts:
+            mapping = skill_index.get_indexer(part._skill_vocabulary).astype(SKILL_CODE_DTYPE)
+            codes.append(mapping[part._skill_codes])
+            indptrs.append(part._skill_indptr[1:] + offset)
+            offset += int(part._skill_indptr[-1])
+        candidates._skill_vocabulary, candidates._skill_index = vocabulary, skill_index
+        candidates._skill_codes = np.concatenate(codes)
+        candidates._skill_indptr = np.concatenate(indptrs)
+        candidates._length = sum(len(part) for part in parts)
+        return candidates
+
+    @classmethod
+    def from_arrow(cls, table: pa.Table, header: List[str]) -> 'CompactCandidates':
+        """Inversa de to_arrow. No copia los strings ni los códigos: si la tabla está mapeada en memoria (por ej, un
+        archivo de Arrow abierto con memory_map), las columnas apuntan al archivo"""
+        candidates = cls(header)
+        table = table.combine_chunks()
+        for column in header:
+            values = table.column(column)
+            if column == 'skills':
+                skills = values.chunk(0) if values.num_chunks else pa.array([], values.type)
+                candidates._skill_vocabulary = skills.values.dictionary.to_pylist()
+                candidates._skill_index = pd.Index(candidates._skill_vocabulary, dtype=object)
+                candidates._skill_indptr = skills.offsets.to_numpy()
+                candidates._skill_codes = skills.values.indices.to_numpy()
+            elif column == 'academic_average':
+                candidates._columns[column] = pd.Series(values.to_numpy(), dtype=AVERAGE_DTYPE)
+            elif column in CATEGORICAL_COLUMNS:
+                candidates._columns[column] = values.to_pandas()
+            else:
+                candidates._columns[column] = pd.Series(pd.arrays.ArrowStringArray(values))
+        candidates._length = table.num_rows
+        return candidates
+
+    def to_arrow(self) -> pa.Table:
+        """Tabla de Arrow con todas las columnas (skills como lista), para guardarla en un archivo"""
+        columns = {}
+        for column in self.header:
+            if column == 'skills':
+                skills = pa.DictionaryArray.from_arrays(
+                    pa.array(self._skill_codes, pa.int32()), pa.array(self._skill_vocabulary, pa.string())
+                )
+                columns[column] = pa.LargeListArray.from_arrays(pa.array(self._skill_indptr, pa.int64()), skills)
+            elif column == 'academic_average':
+                # Sin from_pandas: los NaN se guardan como NaN (no como nulos) y vuelven igual
+                columns[column] = pa.array(self._columns[column].to_numpy(), pa.float64())
+            elif column in CATEGORICAL_COLUMNS:
+                columns[column] = pa.array(self._columns[column])
+            else:
+                columns[column] = pa.array(self._columns[column], pa.large_string())
+        return pa.table(columns)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def skill_vocabulary(self) -> List[str]:
+        return self._skill_vocabulary
+
+    def extend(self, df: pd.DataFrame) -> None:
+        """Agrega candidatos (dataframe con skills como lista) a continuación de los existentes"""
+        # Primero se arma todo y al final se reemplaza, así un error no deja columnas de distinto largo
+        columns = {}
+        for column in self.header:
+            if column == 'skills':
+                continue
+            new_values = self._compact_column(column, df[column])
+            current = self._columns[column]
+            if not self._length:
+                columns[column] = new_values
+            elif column in CATEGORICAL_COLUMNS:
+                columns[column] = pd.Series(pd.api.types.union_categoricals([current, new_values]))
+            else:
+                columns[column] = pd.concat([current, new_values], ignore_index=True)
+        vocabulary, skill_index, skill_indptr, skill_codes = self._extended_skills(df['skills'])
+        # Las versiones que extended arma a partir de esta comparten sus índices, que solo se siguen usando si esta
+        # es la última versión (si no, las filas nuevas serían otras que las ya agregadas a partir de esta)
+        text_indexes = {
+            column: index if index.claim(self._length, self._length + len(df)) else TrigramIndex()
+            for column, index in self._text_indexes.items()
+        }
+
+        self._columns = columns
+        self._text_indexes = text_indexes
+        self._skill_vocabulary, self._skill_index = vocabulary, skill_index
+        self._skill_indptr, self._skill_codes = skill_indptr, skill_codes
+        self._length += len(df)
+
+    def extended(self, df: pd.DataFrame) -> 'CompactCandidates':
+        """Como extend, pero devuelve una nueva instancia y deja esta sin cambios (comparten los arrays, que extend
+        nunca modifica: siempre arma nuevos, y los índices de texto, que se extienden con las filas nuevas)"""
+        candidates = copy.copy(self)
+        candidates.extend(df)
+        return candidates
+
+    def column(self, column: str) -> np.ndarray:
+        """Valores de una columna (no skills) como array de objetos, con NaN para los faltantes"""
+        return self._columns[column].to_numpy(dtype=object, na_value=np.nan)
+
+    def to_frame(self, ids: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Dataframe con el mismo formato que `CandidateStorage.load` (skills como lista), con las filas ids
+        (todas si es None) y los IDs como índice"""
+        if ids is None:
+            ids, index = np.arange(self._length), pd.RangeIndex(self._length)
+        else:
+            ids = np.asarray(ids, dtype=np.int64)
+            index = pd.Index(ids)
+        data = {}
+        for column in self.header:
+            if column == 'skills':
+                # Una lista vacía daría una columna float: sin filas, se mantiene object como el resto
+                data[column] = self._skills_of(ids) if len(ids) else np.empty(0, dtype=object)
+            elif column == 'academic_average':
+                data[column] = self._columns[column].to_numpy()[ids]
+            else:
+                data[column] = self._columns[column].iloc[ids].to_numpy(dtype=object, na_value=np.nan)
+        return pd.DataFrame(data, index=index, columns=self.header)
+
+    def to_candidate(self, candidate_id: int) -> StudentCandidate:
+        return StudentCandidate(**self.to_frame([candidate_id]).iloc[0].to_dict())
+
+    def academic_average_above(self, threshold: float) -> np.ndarray:
+        """Máscara de los candidatos con promedio mayor a threshold"""
+        if not self._length:
+            return np.zeros(0, dtype=bool)
+        return self._columns['academic_average'].to_numpy() > threshold
+
+    def category_mask(self, column: str, values: Iterable[str]) -> np.ndarray:
+        """Máscara de los candidatos cuyo valor de la columna categórica está en values"""
+        return self.category_masks(column, [values])[:, 0]
+
+    def category_masks(self, column: str, value_sets: Sequence[Iterable[str]]) -> np.ndarray:
+        """Como category_mask, para varios conjuntos de valores a la vez: matriz (candidatos x conjuntos)"""
+        if not self._length:
+            return np.zeros((0, len(value_sets)), dtype=bool)
+        categorical = self._columns[column].cat
+        # Una fila por categoría más una final en False, que es la que toma el código -1 (faltante)
+        matches = np.zeros((len(categorical.categories) + 1, len(value_sets)), dtype=bool)
+        for position, values in enumerate(value_sets):
+            matches[:-1, position] = categorical.categories.isin(list(values))
+        return matches[categorical.codes.to_numpy()]
+
+    def contains(self, column: str, query: str) -> np.ndarray:
+        """Máscara de los candidatos cuyo valor de la columna contiene query, case-insensitive (como
+        `query.lower() in value.lower()`; los faltantes nunca). En las categóricas se busca entre las categorías
+        (pocas) y se pasa a las filas por los códigos; en las de TEXT_INDEX_COLUMNS, con el índice de trigramas (que
+        se actualiza acá, fuera del lock del store); en el resto, es un scan vectorizado de Arrow sobre los strings"""
+        if not self._length:
+            return np.zeros(0, dtype=bool)
+        query = query.lower()
+        values = self._columns[column]
+        if column in CATEGORICAL_COLUMNS:
+            categories = values.cat.categories
+            # Una fila por categoría más una final en False, que es la que toma el código -1 (faltante)
+            matches = np.zeros(len(categories) + 1, dtype=bool)
+            matches[:-1] = [isinstance(category, str) and query in category.lower() for category in categories]
+            return matches[values.cat.codes.to_numpy()]
+        if column in self._text_indexes:
+            mask = np.zeros(self._length, dtype=bool)
+            mask[self._text_indexes[column].search(pa.array(values), query)] = True
+            return mask
+        found = pc.match_substring(pc.utf8_lower(pa.array(values)), query)
+        return pc.fill_null(found, False).to_numpy(zero_copy_only=False)
+
+    def count_skills(self, skills: Iterable[str]) -> np.ndarray:
+        """Cuenta, para cada candidato, cuántas de sus skills están entre las dadas (las repetidas cuentan cada vez)"""
+        return self.count_skills_by_set([skills])[:, 0]
+
+    def count_skills_by_set(self, skill_sets: Sequence[Iterable[str]]) -> np.ndarray:
+        """Como count_skills, para varios conjuntos de skills a la vez (una sola pasada sobre los códigos): matriz
+        (candidatos x conjuntos)"""
+        counts = np.empty((self._length, len(skill_sets)), dtype=np.int64)
+        if not len(skill_sets):
+            return counts
+        # Ningún conteo supera la cantidad de skills del candidato que más tiene: con esa base, los conteos de
+        # todos los conjuntos entran como dígitos de un mismo entero, y alcanza con una sola suma acumulada
+        base = int(np.diff(self._skill_indptr).max(initial=0)) + 1
+        groups = max(1, int(np.log(2 ** 62) // np.log(base))) if base > 1 else len(skill_sets)
+        for start in range(0, len(skill_sets), groups):
+            group = skill_sets[start:start + groups]
+            digits = np.zeros(len(self._skill_index), dtype=np.int64)
+            for position, skills in enumerate(group):
+                digits += self._skill_index.isin(list(skills)).astype(np.int64) * base ** position
+            cumulative = np.concatenate([[0], np.cumsum(digits[self._skill_codes])])
+            packed = cumulative[self._skill_indptr[1:]] - cumulative[self._skill_indptr[:-1]]
+            for position in range(len(group)):
+                counts[:, start + position] = packed // base ** position % base
+        return counts
+
+    def has_skills(self, skills: Iterable[str]) -> np.ndarray:
+        """Máscara de los candidatos que tienen todas las skills dadas (comparación case-insensitive)"""
+        mask = np.ones(self._length, dtype=bool)
+        lowercase_vocabulary = self._skill_index.str.lower() if len(self._skill_index) else self._skill_index
+        for skill in skills:
+            matches = np.asarray(lowercase_vocabulary == skill.lower())[self._skill_codes]
+            cumulative = np.concatenate([[0], np.cumsum(matches, dtype=np.int64)])
+            mask &= cumulative[self._skill_indptr[1:]] > cumulative[self._skill_indptr[:-1]]
+        return mask
+
+    def memory_usage(self) -> int:
+        """Bytes ocupados (incluyendo los strings)"""
+        total = sum(int(series.memory_usage(deep=True, index=False)) for series in self._columns.values())
+        total += self._skill_indptr.nbytes + self._skill_codes.nbytes
+        return total + sum(len(skill) + 49 for skill in self._skill_vocabulary)
+
+    # --------------------- Helper methods ---------------------
+
+    @staticmethod
+    def _compact_column(column: str, values: pd.Series) -> pd.Series:
+        values = values.reset_index(drop=True)
+        if column in CATEGORICAL_COLUMNS:
+            # Pasando por object, las categorías son siempre object (una columna toda vacía se parsea como float), y
+            # se pueden unir con las de otro bloque
+            return values.astype(object).astype('category')
+        if column == 'academic_average':
+            return pd.to_numeric(values, errors='coerce').astype(AVERAGE_DTYPE)
+        # El resto (full_name, email, work_experience) son strings de texto libre
+        return values.astype(STRING_DTYPE)
+
+    def _extended_skills(self, skills: pd.Series):
+        lengths = np.fromiter(map(len, skills), dtype=np.int64, count=len(skills))
+        flat = list(chain.from_iterable(skills))
+        vocabulary, skill_index = self._skill_vocabulary, self._skill_index
+        codes = skill_index.get_indexer(flat) if flat else np.empty(0, dtype=np.int64)
+        if (codes < 0).any():
+            unknown = pd.unique(np.asarray(flat, dtype=object)[codes < 0])
+            vocabulary = vocabulary + list(unknown)
+            skill_index = pd.Index(vocabulary, dtype=object)
+            codes = skill_index.get_indexer(flat)
+        skill_codes = np.concatenate([self._skill_codes, codes.astype(SKILL_CODE_DTYPE)])
+        skill_indptr = np.concatenate([self._skill_indptr, self._skill_indptr[-1] + np.cumsum(lengths)])
+        return vocabulary, skill_index, skill_indptr, skill_codes
+
+    def _skills_of(self, ids: np.ndarray) -> List[List[str]]:
+        starts = self._skill_indptr[ids]
+        lengths = self._skill_indptr[ids + 1] - starts
+        # Posiciones en skill_codes de las skills de los ids pedidos, concatenadas (solo se convierten esas)
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.arange(int(lengths.sum())) + np.repeat(starts - offsets, lengths)
+        vocabulary = self._skill_vocabulary
+        skills = [vocabulary[code] for code in self._skill_codes[positions].tolist()]
+        bounds = np.cumsum(lengths).tolist()
+        return [skills[end - length:end] for end, length in zip(bounds, lengths.tolist())]
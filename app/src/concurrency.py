@@ -0,0 +1,210 @@
+"""
+concurrency.py
+
+Helpers de concurrencia para la API y los servicios.
+
+- SingleFlight: las llamadas concurrentes (entre threads) con la misma clave comparten una única ejecución.
+- BlockingExecutor: pool de threads de tamaño fijo para el trabajo bloqueante de la API (pandas, csv, PDF), con un
+  tope de tareas en cola. Si se supera, `run` lanza ExecutorOverloaded en vez de encolar (la API responde 503).
+  `run_shared` además agrupa las llamadas concurrentes (entre corrutinas) con la misma clave en una sola tarea.
+  Las tareas corren dentro del request que las encoló (timings y profiling de src.metrics).
+- ChangeFeed: aviso de cambios de un thread (por ej, el que escribe candidatos) a corrutinas que esperan, sin ocupar
+  un thread por cada una (long-poll y Server-Sent Events).
+- get_load_pool: pool de procesos del proceso, para la carga en paralelo (por shards) del csv de candidatos.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, TypeVar
+
+from src.metrics import bind_request_context
+
+T = TypeVar('T')
+
+
+class ExecutorOverloaded(Exception):
+    pass
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Ejecuta fn, salvo que ya haya otra ejecución en curso con la misma clave: en ese caso espera y devuelve
+        su resultado (o lanza su excepción)"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+        future.set_result(result)
+        return result
+
+
+class ChangeFeed:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def version(self) -> int:
+        """Cantidad de cambios notificados. Se lee antes de consultar los datos y se pasa a wait, así un cambio
+        que ocurra en el medio no se pierde"""
+        return self._version
+
+    def notify(self) -> None:
+        """Avisa de un cambio a todos los que esperan (se puede llamar desde cualquier thread)"""
+        with self._lock:
+            self._version += 1
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    async def wait(self, version: int, timeout: float) -> bool:
+        """Espera un cambio posterior a version, a lo sumo timeout segundos. Devuelve si hubo cambio"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (loop, future)
+        with self._lock:
+            if self._version != version:
+                return True
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+
+class BlockingExecutor:
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='api-blocking')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._shared: Dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def pending(self) -> int:
+        """Tareas en ejecución o en cola"""
+        return self._pending
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Ejecuta fn en el pool sin bloquear el event loop. Lanza ExecutorOverloaded si la cola está llena"""
+        return await self._submit(partial(fn, *args, **kwargs), admit=True)
+
+    async def run_shared(self, key: Hashable, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Como run, pero las llamadas concurrentes con la misma clave comparten una única tarea (y resultado,
+        que no debe modificarse). Solo las que crean la tarea cuentan contra el tope de la cola"""
+        shared = self._shared.get(key)
+        if shared is None:
+            shared = self._shared[key] = self._submit(partial(fn, *args, **kwargs), admit=True)
+            shared.add_done_callback(lambda _: self._shared.pop(key, None))
+        # shield: si el request que creó la tarea se cancela, los demás siguen esperándola
+        return await asyncio.shield(shared)
+
+    async def iterate(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        """Recorre un iterador bloqueante (por ej, el de un export) avanzándolo en el pool. Se chequea el tope de
+        la cola una sola vez, al empezar: una respuesta ya iniciada no se corta por sobrecarga"""
+        done = object()
+        admit = True
+        while True:
+            item = await self._submit(partial(next, iterator, done), admit)
+            admit = False
+            if item is done:
+                return
+            yield item
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # --------------------- Helper methods ---------------------
+
+    def _submit(self, fn: Callable[[], T], admit: bool) -> 'asyncio.Future[T]':
+        with self._lock:
+            if admit and self._pending >= self.max_workers + self.max_queue:
+                raise ExecutorOverloaded(f'{self._pending} blocking tasks pending')
+            self._pending += 1
+        future = self._executor.submit(bind_request_context(fn))
+        # Se descuenta cuando termina la tarea (no cuando termina de esperarla quien la encoló, que puede cancelarse)
+        future.add_done_callback(self._task_done)
+        return asyncio.wrap_future(future)
+
+    def _task_done(self, _future: Future):
+        with self._lock:
+            self._pending -= 1
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+_executor: Optional[BlockingExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_blocking_executor(max_workers: int, max_queue: int) -> BlockingExecutor:
+    """Devuelve el executor de trabajo bloqueante del proceso (lo crea si no existe)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = BlockingExecutor(max_workers, max_queue)
+        return _executor
+
+
+def shutdown_blocking_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+_load_pool: Optional[ProcessPoolExecutor] = None
+_load_pool_workers = 0
+_load_pool_lock = threading.Lock()
+
+
+def get_load_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Devuelve el pool de procesos para cargar datos (lo crea si no existe o si cambió la cantidad de workers).
+    Se mantiene entre cargas: el costo de levantar los procesos se paga una sola vez"""
+    global _load_pool, _load_pool_workers
+    with _load_pool_lock:
+        if _load_pool is None or _load_pool_workers != max_workers:
+            if _load_pool is not None:
+                _load_pool.shutdown(wait=False, cancel_futures=True)
+            # spawn: los workers no heredan los threads ni los locks del proceso del servidor
+            _load_pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+            _load_pool_workers = max_workers
+        return _load_pool
+
+
+def shutdown_load_pool() -> None:
+    global _load_pool, _load_pool_workers
+    with _load_pool_lock:
+        if _load_pool is not None:
+            _load_pool.shutdown(wait=False, cancel_futures=True)
+            _load_pool, _load_pool_workers = None, 0
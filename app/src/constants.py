@@ -1,9 +1,42 @@
 # Constantes para data
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent  # lleva hasta `app/`
 CANDIDATES_DATA_PATH = BASE_DIR / "data" / "candidates.csv"
+CANDIDATES_DB_PATH = BASE_DIR / "data" / "candidates.db"
+# Backend de almacenamiento de candidatos: 'csv' (default) o 'sqlite'
+STORAGE_BACKEND = os.environ.get("CANDIDATES_STORAGE_BACKEND", "csv")
 REPORT_DIR = BASE_DIR / "data"
+# Procesos para cargar el csv en paralelo, por shards (1 = carga serial). Conviene en archivos de millones de filas
+CSV_LOAD_WORKERS = int(os.environ.get("CSV_LOAD_WORKERS", 1))
+# Snapshot binario (Arrow) del csv junto a `candidates.csv`, para cargar sin parsear texto (se descarta si las filas
+# que cubre cambiaron en el csv)
+CSV_SNAPSHOT_ENABLED = os.environ.get("CSV_SNAPSHOT_ENABLED", "1") == "1"
+# Pool de threads para el trabajo bloqueante de la API (csv, pandas, PDF) y tope de tareas en cola: por encima, los
+# requests reciben 503
+API_EXECUTOR_WORKERS = int(os.environ.get("API_EXECUTOR_WORKERS", 8))
+API_EXECUTOR_MAX_QUEUE = int(os.environ.get("API_EXECUTOR_MAX_QUEUE", 64))
+OVERLOAD_RETRY_AFTER_SECONDS = 1
+# Tope (en bytes) del cache en memoria de PDF reports ya generados
+REPORT_CACHE_MAX_BYTES = int(os.environ.get("REPORT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Jobs de generación asíncrona de reportes: directorio, procesos, tope de jobs pendientes y retención de terminados
+REPORT_JOBS_DIR = REPORT_DIR / "report_jobs"
+REPORT_JOB_WORKERS = int(os.environ.get("REPORT_JOB_WORKERS", 2))
+REPORT_JOB_MAX_PENDING = int(os.environ.get("REPORT_JOB_MAX_PENDING", 32))
+REPORT_JOB_RETENTION_SECONDS = 24 * 60 * 60
+# Change feed de candidatos (long-poll y Server-Sent Events): espera máxima de un long-poll, cada cuánto se revisa el
+# almacenamiento (altas de otros procesos, que no se notifican), candidatos por evento/respuesta y keep-alive del SSE
+CHANGES_MAX_WAIT_SECONDS = 30
+CHANGES_POLL_INTERVAL_SECONDS = 1.0
+CHANGES_BATCH_SIZE = 100
+CHANGES_HEARTBEAT_SECONDS = 15
+# Instrumentación: timings por etapa (header Server-Timing y /metrics). El profiling por request (header X-Profile)
+# además tiene que habilitarse explícitamente, y deja los .prof en PROFILES_DIR
+INSTRUMENTATION_ENABLED = os.environ.get("INSTRUMENTATION_ENABLED", "1") == "1"
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+PROFILE_HEADER = "X-Profile"
+PROFILES_DIR = REPORT_DIR / "profiles"
 HEADER = ['full_name', 'email', 'college', 'degree', 'academic_average', 'skills', 'work_experience']
 
 # Universidades consideradas de alto prestigio
@@ -33,4 +66,30 @@ RELEVANT_SKILLS_FOR_TRAINEE_ROLE = [
     'APIs',
     'Docker',
     'Testing'
-]
\ No newline at end of file
+]
+# Perfil de scoring por default: el del puesto de trainee (pesos de CandidateService y las listas de arriba)
+DEFAULT_SCORING_PROFILE = 'trainee'
+
+# Perfiles de scoring de los demás roles que se buscan (ver ScoringProfile en scoring). Se puntúan todos juntos, en
+# una misma pasada sobre los datos
+SCORING_PROFILES = {
+    'data': {
+        'weights': {'academic_average': 0.4, 'college': 0.2, 'skills': 0.05},
+        'prestige_colleges': PRESTIGE_COLLEGES,
+        'relevant_skills': ['Python', 'SQL', 'Data Science', 'Machine Learning', 'Algorithms', 'Excel'],
+        'academic_average_threshold': 8.0,
+    },
+    'backend': {
+        'weights': {'academic_average': 0.3, 'college': 0.2, 'skills': 0.06},
+        'prestige_colleges': PRESTIGE_COLLEGES,
+        'relevant_skills': ['Programming', 'Python', 'SQL', 'Git', 'Linux', 'APIs', 'Docker', 'Data Structures',
+                            'Cloud Basics', 'ORMs'],
+        'academic_average_threshold': 7.0,
+    },
+    'qa': {
+        'weights': {'academic_average': 0.3, 'college': 0.1, 'skills': 0.08},
+        'prestige_colleges': PRESTIGE_COLLEGES,
+        'relevant_skills': ['Testing', 'Programming', 'Git', 'Linux', 'APIs', 'JavaScript', 'SQL'],
+        'academic_average_threshold': 7.0,
+    },
+}
@@ -0,0 +1,195 @@
+"""
+csv_index.py
+
+Índice persistente de offsets (ID de candidato -> posición en bytes de su fila) del csv de candidatos.
+
+Provee la clase CSVOffsetIndex, que guarda en un archivo binario junto al csv (`candidates.idx`) la posición de cada
+salto de línea que termina un registro (el primero es el del header). Así, la fila del candidato i está entre el fin
+del registro i y el fin del registro i + 1, y se puede leer sin parsear el resto del archivo.
+El índice se extiende escaneando solo los bytes agregados desde la última vez, teniendo en cuenta las comillas
+(un salto de línea dentro de un campo entre comillas no termina el registro).
+
+Formato del archivo: uint64 little-endian, [tamaño del csv escaneado, fin del header, fin de la fila 0, ...]
+"""
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+OFFSETS_DTYPE = np.dtype('<u8')
+SCAN_CHUNK_SIZE = 4 * 1024 * 1024
+NEWLINE = ord('\n')
+QUOTE = ord('"')
+
+
+class CSVOffsetIndex:
+    def __init__(self, data_path):
+        self.data_path = Path(data_path)
+        self.index_path = self.data_path.with_suffix('.idx')
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._scanned_size = 0
+        self._record_ends = np.empty(0, dtype=OFFSETS_DTYPE)
+
+    def row_count(self) -> int:
+        """Cantidad de filas (sin contar el header) del csv"""
+        with self._lock:
+            size = self._sync()
+            return self._row_count(size)
+
+    def read_row(self, row_id: int) -> Optional[Tuple[bytes, bytes]]:
+        """Devuelve (header, fila) en bytes del registro row_id, o None si no existe"""
+        with self._lock:
+            size = self._sync()
+            if row_id < 0 or row_id >= self._row_count(size):
+                return None
+            header_end = int(self._record_ends[0])
+            start = int(self._record_ends[row_id]) + 1
+            end = int(self._record_ends[row_id + 1]) if row_id + 1 < len(self._record_ends) else size
+            fd = os.open(self.data_path, os.O_RDONLY)
+            try:
+                return os.pread(fd, header_end + 1, 0), os.pread(fd, end - start, start)
+            finally:
+                os.close(fd)
+
+    def prefix_end(self, rows: int) -> Optional[int]:
+        """Posición (en bytes) donde terminan las primeras rows filas, con su salto de línea: donde empieza la fila
+        rows. Con rows = 0, el fin del header. None si el csv no tiene tantas filas completas"""
+        with self._lock:
+            self._sync()
+            if rows < 0 or rows >= len(self._record_ends):
+                return None
+            return int(self._record_ends[rows]) + 1
+
+    def shard_ranges(self, shards: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+        """Divide las filas en (hasta) shards rangos de bytes consecutivos con la misma cantidad de filas, cortados en
+        fines de registro (nunca en un salto de línea entre comillas). Devuelve el header (en bytes, con su salto de
+        línea) y los rangos [inicio, fin) en orden de ID"""
+        with self._lock:
+            size = self._sync()
+            rows = self._row_count(size)
+            if not rows:
+                return b'', []
+            header_end = int(self._record_ends[0])
+            # Inicio de cada fila, más el fin del archivo
+            starts = np.append(self._record_ends[:rows].astype(np.int64) + 1, size)
+            bounds = np.unique(np.linspace(0, rows, min(shards, rows) + 1).astype(np.int64))
+            ranges = [(int(starts[first]), int(starts[last])) for first, last in zip(bounds[:-1], bounds[1:])]
+            fd = os.open(self.data_path, os.O_RDONLY)
+            try:
+                return os.pread(fd, header_end + 1, 0), ranges
+            finally:
+                os.close(fd)
+
+    def reset(self) -> None:
+        """Descarta el índice (por ej, al eliminar el csv)"""
+        with self._lock:
+            self.index_path.unlink(missing_ok=True)
+            self._loaded = True
+            self._scanned_size = 0
+            self._record_ends = np.empty(0, dtype=OFFSETS_DTYPE)
+
+    def sync(self) -> None:
+        """Extiende el índice (en memoria y en disco) con las filas agregadas al csv"""
+        with self._lock:
+            self._sync()
+
+    # --------------------- Helper methods ---------------------
+
+    def _row_count(self, size: int) -> int:
+        if not len(self._record_ends):
+            return 0
+        # La última fila puede no terminar en salto de línea
+        open_row = int(self._record_ends[-1]) + 1 < size
+        return len(self._record_ends) - 1 + open_row
+
+    def _sync(self) -> int:
+        try:
+            size = self.data_path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if not self._loaded:
+            self._load()
+        if size < self._scanned_size or not self._is_consistent():
+            # El csv se editó o reescribió por fuera: se reconstruye el índice completo
+            self._scanned_size = 0
+            self._record_ends = np.empty(0, dtype=OFFSETS_DTYPE)
+            self.index_path.unlink(missing_ok=True)
+        if size > self._scanned_size:
+            previous_scanned_size = self._scanned_size
+            resume_at = int(self._record_ends[-1]) + 1 if len(self._record_ends) else 0
+            new_ends = self._scan(resume_at, size)
+            self._record_ends = np.concatenate([self._record_ends, new_ends])
+            self._scanned_size = size
+            self._persist(new_ends, previous_scanned_size)
+        return size
+
+    def _load(self):
+        self._loaded = True
+        try:
+            stored = np.fromfile(self.index_path, dtype=OFFSETS_DTYPE)
+        except FileNotFoundError:
+            return
+        if len(stored) and (len(stored) == 1 or np.all(np.diff(stored[1:].astype(np.int64)) > 0)):
+            self._scanned_size = int(stored[0])
+            self._record_ends = stored[1:].copy()
+
+    def _is_consistent(self) -> bool:
+        """Chequeo barato de que el último fin de registro conocido sigue siendo un salto de línea en el csv"""
+        if not len(self._record_ends):
+            return True
+        last_end = int(self._record_ends[-1])
+        try:
+            fd = os.open(self.data_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        try:
+            return os.pread(fd, 1, last_end) == b'\n'
+        finally:
+            os.close(fd)
+
+    def _scan(self, start: int, end: int) -> np.ndarray:
+        """Posiciones de los saltos de línea que terminan registros entre start (inicio de un registro) y end"""
+        found = []
+        parity = 0
+        fd = os.open(self.data_path, os.O_RDONLY)
+        try:
+            position = start
+            while position < end:
+                chunk = np.frombuffer(os.pread(fd, min(SCAN_CHUNK_SIZE, end - position), position), dtype=np.uint8)
+                if not len(chunk):
+                    break
+                # Paridad de comillas acumulada (uint8 desborda, pero la paridad se mantiene)
+                quotes = np.cumsum(chunk == QUOTE, dtype=np.uint8) + np.uint8(parity)
+                newlines = np.flatnonzero(chunk == NEWLINE)
+                found.append((newlines[quotes[newlines] % 2 == 0] + position).astype(OFFSETS_DTYPE))
+                parity = int(quotes[-1]) % 2
+                position += len(chunk)
+        finally:
+            os.close(fd)
+        return np.concatenate(found) if found else np.empty(0, dtype=OFFSETS_DTYPE)
+
+    def _persist(self, new_ends: np.ndarray, previous_scanned_size: int):
+        scanned_size = np.array([self._scanned_size], dtype=OFFSETS_DTYPE)
+        # Solo se agregan los nuevos offsets si el archivo en disco es el que se extendió (si no, por ejemplo porque
+        # otro proceso ya lo actualizó, se reescribe completo)
+        if self._stored_scanned_size() != previous_scanned_size:
+            tmp_path = self.index_path.with_suffix('.idx.tmp')
+            np.concatenate([scanned_size, self._record_ends]).tofile(tmp_path)
+            tmp_path.replace(self.index_path)
+            return
+        with open(self.index_path, 'rb+') as f:
+            f.seek(0, 2)
+            f.write(new_ends.tobytes())
+            f.seek(0)
+            f.write(scanned_size.tobytes())
+
+    def _stored_scanned_size(self) -> Optional[int]:
+        try:
+            with open(self.index_path, 'rb') as f:
+                stored = f.read(OFFSETS_DTYPE.itemsize)
+        except FileNotFoundError:
+            return None
+        return int(np.frombuffer(stored, dtype=OFFSETS_DTYPE)[0]) if len(stored) == OFFSETS_DTYPE.itemsize else None
@@ -0,0 +1,104 @@
+"""
+export.py
+
+Serialización en streaming de candidatos (GET /candidates/export) a NDJSON, csv o Parquet.
+
+Cada función recibe un iterador de dataframes (bloques de candidatos, ver CandidateService.iter_candidates) y
+devuelve un iterador de bytes, serializando un bloque a la vez: la memoria usada depende del tamaño del bloque y no
+de la cantidad total de candidatos. Las columnas (el header del csv, el schema de Parquet) salen del primer bloque,
+que puede estar vacío: así una exportación sin candidatos sigue siendo un archivo válido.
+"""
+import io
+import json
+from typing import Callable, Dict, Iterator, Tuple
+
+import pandas as pd
+
+EXPORT_FORMATS = ('ndjson', 'csv', 'parquet')
+
+
+def export_candidates(chunks: Iterator[pd.DataFrame], export_format: str) -> Iterator[bytes]:
+    """Serializa los bloques de candidatos en el formato pedido"""
+    serializer, _, _ = _SERIALIZERS[export_format]
+    return serializer(chunks)
+
+
+def export_media_type(export_format: str) -> Tuple[str, str]:
+    """Devuelve (media type, nombre de archivo sugerido) del formato"""
+    _, media_type, filename = _SERIALIZERS[export_format]
+    return media_type, filename
+
+
+def _to_ndjson(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    for chunk in chunks:
+        # NaN no es JSON válido: los valores faltantes se exportan como null
+        records = chunk.astype(object).where(chunk.notna(), None).to_dict(orient='records')
+        yield ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records).encode()
+
+
+def _to_csv(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    header = True
+    for chunk in chunks:
+        # Mismo formato que candidates.csv: skills separadas por coma
+        chunk = chunk.assign(skills=chunk['skills'].str.join(','))
+        yield chunk.to_csv(index=False, header=header).encode()
+        header = False
+
+
+def _to_parquet(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # El resto de las columnas son strings
+    column_types = {
+        'id': pa.int64(),
+        'academic_average': pa.float64(),
+        'skills': pa.list_(pa.string()),
+        'score': pa.float64(),
+    }
+    sink = _ChunkSink()
+    writer = None
+    for chunk in chunks:
+        if writer is None:
+            # Schema explícito: inferirlo de un solo bloque falla si, por ej, una columna viene toda en null
+            schema = pa.schema([(column, column_types.get(column, pa.string())) for column in chunk.columns])
+            writer = pq.ParquetWriter(sink, schema)
+        # Un row group por bloque, que se envía apenas se escribe (un bloque vacío solo aporta el schema)
+        if len(chunk):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+class _ChunkSink(io.RawIOBase):
+    """File-like de solo escritura que acumula lo escrito hasta que se lo vacía con drain"""
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+_SERIALIZERS: Dict[str, Tuple[Callable[[Iterator[pd.DataFrame]], Iterator[bytes]], str, str]] = {
+    'ndjson': (_to_ndjson, 'application/x-ndjson', 'candidates.ndjson'),
+    'csv': (_to_csv, 'text/csv', 'candidates.csv'),
+    'parquet': (_to_parquet, 'application/vnd.apache.parquet', 'candidates.parquet'),
+}
@@ -0,0 +1,273 @@
+"""
+metrics.py
+
+Instrumentación de la API y los servicios.
+
+- stage(name): context manager que mide una etapa del procesamiento (parseo del csv, split de skills, scoring,
+  filtrado, conversión a dict, render del PDF...). Cada medición va a un histograma del proceso y, si hay un request
+  en curso, a sus timings (que la API devuelve en el header Server-Timing).
+- cache_lookup(cache, hit): cuenta aciertos y fallos de los caches (candidatos, scores, reportes).
+- RequestTimings / RequestProfile: estado del request en curso (en un ContextVar). `bind_request_context` lo propaga
+  a los threads del executor, y RequestProfile corre ahí el trabajo bajo cProfile (opt-in, por header).
+- render_metrics(): todas las métricas en el formato de texto de Prometheus, para el endpoint /metrics.
+
+Con INSTRUMENTATION_ENABLED en False, stage devuelve siempre el mismo objeto que no hace nada y no hay request en
+curso que propagar, así el costo de la instrumentación es una llamada a función por etapa.
+"""
+import cProfile
+import contextvars
+import pstats
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from src.constants import INSTRUMENTATION_ENABLED
+
+T = TypeVar('T')
+
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+ROW_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Counter:
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = _metric_header(self.name, self.description, 'counter')
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in values:
+            lines.append(f'{self.name}{_labels(self.label_names, label_values)} {_number(value)}')
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f'# TYPE {self.name} gauge'
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets: Sequence[float], label_names: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        # Por combinación de labels: [cuentas por bucket (no acumuladas, la última es +Inf), suma]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = _metric_header(self.name, self.description, 'histogram')
+        with self._lock:
+            series = [(label_values, list(counts), total) for label_values, (counts, total) in self._series.items()]
+        for label_values, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _labels(self.label_names + ('le',), label_values + (_number(bound),))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _labels(self.label_names, label_values)
+            lines.append(f'{self.name}_sum{labels} {_number(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+STAGE_DURATION = Histogram(
+    'stage_duration_seconds', 'Duration of each processing stage', DURATION_BUCKETS, ['stage']
+)
+STAGE_ROWS = Histogram('stage_rows', 'Rows processed by each execution of a stage', ROW_BUCKETS, ['stage'])
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Duration of API requests (until the response starts)', DURATION_BUCKETS,
+    ['method', 'route', 'status']
+)
+CACHE_LOOKUPS = Counter(
+    'cache_lookups_total', 'Cache lookups by cache and result (hit rate = hit / total)', ['cache', 'result']
+)
+CACHED_ROWS = Gauge('candidates_cached_rows', 'Candidates held in the in-memory store')
+BLOCKING_TASKS_PENDING = Gauge('blocking_tasks_pending', 'Blocking tasks running or queued in the API executor')
+
+METRICS = [STAGE_DURATION, STAGE_ROWS, REQUEST_DURATION, CACHE_LOOKUPS, CACHED_ROWS, BLOCKING_TASKS_PENDING]
+
+
+def render_metrics() -> str:
+    """Todas las métricas del proceso en el formato de texto de Prometheus"""
+    return '\n'.join(line for metric in METRICS for line in metric.render()) + '\n'
+
+
+class RequestTimings:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Duración total por etapa (una etapa puede ejecutarse varias veces en un request)
+        self._stages: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._stages[name] = self._stages.get(name, 0.0) + seconds
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """Valor del header Server-Timing (duraciones en milisegundos)"""
+        with self._lock:
+            stages = list(self._stages.items())
+        if total is not None:
+            stages.append(('total', total))
+        return ', '.join(f'{name};dur={seconds * 1000:.3f}' for name, seconds in stages)
+
+
+class RequestProfile:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+
+    def run(self, fn: Callable[[], T]) -> T:
+        """Ejecuta fn bajo cProfile (un profiler por llamada: cada uno mide solo el thread que lo activa)"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Ya hay otro profiler activo (en Python >= 3.12 es uno por proceso): se ejecuta sin medir
+            return fn()
+        try:
+            return fn()
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    def dump(self, directory: Path, label: str) -> Optional[Path]:
+        """Guarda las estadísticas acumuladas (formato pstats) y devuelve el archivo, o None si no se midió nada"""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{time.monotonic_ns() % 10**6:06d}-{_slug(label)}.prof"
+        pstats.Stats(*profiles).dump_stats(path)
+        return path
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+_request_profile: ContextVar[Optional[RequestProfile]] = ContextVar('request_profile', default=None)
+
+
+def start_request(profile: bool = False) -> Tuple[RequestTimings, Optional[RequestProfile]]:
+    """Inicia la medición del request en curso (en el contexto actual)"""
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    request_profile = RequestProfile() if profile else None
+    _request_profile.set(request_profile)
+    return timings, request_profile
+
+
+def bind_request_context(fn: Callable[[], T]) -> Callable[[], T]:
+    """Ata fn al request en curso (timings y profiling), para ejecutarla en otro thread. Sin request en curso,
+    devuelve fn tal cual"""
+    if _request_timings.get() is None:
+        return fn
+    context = contextvars.copy_context()
+    profile = _request_profile.get()
+    if profile is not None:
+        return partial(context.run, profile.run, fn)
+    return partial(context.run, fn)
+
+
+class _Stage:
+    __slots__ = ('name', 'rows', '_start')
+
+    def __init__(self, name: str, rows: Optional[int]):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self) -> '_Stage':
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_exc) -> bool:
+        duration = time.perf_counter() - self._start
+        STAGE_DURATION.observe(duration, self.name)
+        if self.rows is not None:
+            STAGE_ROWS.observe(self.rows, self.name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.add(self.name, duration)
+        return False
+
+
+class _NoStage:
+    __slots__ = ('rows',)
+
+    def __enter__(self) -> '_NoStage':
+        return self
+
+    def __exit__(self, *_exc) -> bool:
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str, rows: Optional[int] = None):
+    """Mide la etapa name. Las filas procesadas se pasan acá o, si se conocen después, asignando `.rows` al objeto
+    que devuelve el with"""
+    if not INSTRUMENTATION_ENABLED:
+        return _NO_STAGE
+    return _Stage(name, rows)
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    if INSTRUMENTATION_ENABLED:
+        CACHE_LOOKUPS.inc(cache, 'hit' if hit else 'miss')
+
+# --------------------- Helper methods ---------------------
+
+def _metric_header(name: str, description: str, metric_type: str) -> List[str]:
+    return [f'# HELP {name} {description}', f'# TYPE {name} {metric_type}']
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ''
+    pairs = (f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return '{' + ','.join(pairs) + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _slug(label: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', label).strip('_') or 'request'
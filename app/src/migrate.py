@@ -0,0 +1,29 @@
+"""
+migrate.py
+
+Comando para importar un csv de candidatos existente a la base SQLite (backend 'sqlite').
+
+Uso (desde `app/`): python -m src.migrate [--csv data/candidates.csv] [--db data/candidates.db] [--replace]
+"""
+import argparse
+
+from src.constants import CANDIDATES_DATA_PATH, CANDIDATES_DB_PATH, HEADER
+from src.storage import CSVStorage, SQLiteStorage, migrate_csv_to_sqlite
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import candidates from a csv file into the SQLite database')
+    parser.add_argument('--csv', default=CANDIDATES_DATA_PATH, help='Source csv file')
+    parser.add_argument('--db', default=CANDIDATES_DB_PATH, help='Target SQLite database')
+    parser.add_argument('--replace', action='store_true', help='Overwrite the candidates already in the database')
+    args = parser.parse_args()
+
+    try:
+        imported = migrate_csv_to_sqlite(CSVStorage(args.csv, HEADER), SQLiteStorage(args.db, HEADER), args.replace)
+    except RuntimeError as e:
+        parser.exit(1, f'{e}\n')
+    print(f'Imported {imported} candidates from {args.csv} into {args.db}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,17 @@
 """
 pdf_report.py
 
-Provee la clase PDFReportGenerator (a modo de method object) para la generación del reporte correspondiente
+Provee la clase PDFReportGenerator (a modo de method object) para la generación del reporte correspondiente.
+
+Hay dos layouts: 'detailed' (un bloque por candidato, el original) y 'compact' (una tabla con una fila por
+candidato, pensada para reportes grandes: recorre el dataframe por columnas y setea la fuente una vez por página)
 """
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, Optional, Tuple
 import pandas as pd
+from bisect import bisect_right
+from itertools import accumulate
 from fpdf import FPDF
 
 @dataclass
@@ -14,66 +19,180 @@ class ReportStyle:
     title_font: Tuple[str, int, str] = ("Arial", 12, 'B')
     header_font: Tuple[str, int, str] = ("Arial", 11, 'B')
     body_font: Tuple[str, int] = ("Arial", 10)
+    table_header_font: Tuple[str, int, str] = ("Arial", 8, 'B')
+    table_font: Tuple[str, int] = ("Arial", 8)
     line_spacing: int = 6
+    table_row_height: int = 5
     page_margins: int = 10
 
 from src.constants import REPORT_DIR
+from src.metrics import stage
+
+REPORT_LAYOUTS = ('detailed', 'compact')
+
+# Cada cuántos candidatos se informa el progreso (si se pasó un callback)
+PROGRESS_INTERVAL = 500
+
+# Recibe la cantidad de candidatos ya agregados al reporte
+ProgressCallback = Callable[[int], None]
+
+# Columnas del layout compacto: (título, ancho en mm); suman el ancho útil de una página A4
+COMPACT_COLUMNS = [('#', 10), ('Name', 40), ('College', 50), ('Degree', 35), ('Avg.', 12), ('Score', 13), ('Skills', 30)]
 
 class PDFReportGenerator:
     def __init__(self, output_dir: str = REPORT_DIR, style: ReportStyle = None):
         self.output_dir = Path(output_dir)
         self.style = style or ReportStyle()
 
-    def generate(self, df: pd.DataFrame, filename: str = 'report.pdf') -> str:
+    def generate(
+            self,
+            df: pd.DataFrame,
+            filename: str = 'report.pdf',
+            layout: str = 'detailed',
+            progress: Optional[ProgressCallback] = None
+    ) -> str:
         """Método principal"""
         output_path = self.output_dir / filename
 
         try:
-            pdf = FPDF()
-            pdf.add_page()
-            self._add_title(pdf)
-            self._add_candidates(pdf, df)
-            pdf.output(output_path)
+            pdf = self._build(df, layout, progress)
+            with stage('pdf_output'):
+                pdf.output(output_path)
             return str(output_path.absolute())
 
         except Exception as e:
             raise RuntimeError(f"Report generation failed with Error: {str(e)}") from e
 
+    def generate_bytes(
+            self,
+            df: pd.DataFrame,
+            layout: str = 'detailed',
+            progress: Optional[ProgressCallback] = None
+    ) -> bytes:
+        """Genera el reporte en memoria (sin escribir a disco), para enviarlo directamente al cliente"""
+        try:
+            pdf = self._build(df, layout, progress)
+            # fpdf 1.7 devuelve el documento como str latin-1
+            with stage('pdf_output'):
+                return pdf.output(dest='S').encode('latin-1')
+
+        except Exception as e:
+            raise RuntimeError(f"Report generation failed with Error: {str(e)}") from e
+
+    def _build(self, df: pd.DataFrame, layout: str, progress: Optional[ProgressCallback] = None) -> FPDF:
+        if layout not in REPORT_LAYOUTS:
+            raise ValueError(f"Unknown report layout: {layout}")
+        with stage('pdf_render', rows=len(df)):
+            pdf = FPDF()
+            pdf.add_page()
+            self._add_title(pdf)
+            if layout == 'compact':
+                self._add_candidates_table(pdf, df, progress)
+            else:
+                self._add_candidates(pdf, df, progress)
+        if progress:
+            progress(len(df))
+        return pdf
+
     def _add_title(self, pdf: FPDF):
         font, size, style = self.style.title_font
         pdf.set_font(font, style=style, size=size)
         pdf.cell(0, 10, "Reporte de Candidatos Preseleccionados", ln=True, align='C')
         pdf.ln(self.style.line_spacing)
 
-    def _add_candidates(self, pdf: FPDF, df: pd.DataFrame):
-        for _, row in df.iterrows():
+    def _add_candidates(self, pdf: FPDF, df: pd.DataFrame, progress: Optional[ProgressCallback] = None):
+        # itertuples evita construir una Series por fila (iterrows)
+        for position, row in enumerate(df.itertuples(index=False), start=1):
             self._add_candidate_header(pdf, row)
             self._add_candidate_details(pdf, row)
             pdf.ln(self.style.line_spacing)
+            if progress and position % PROGRESS_INTERVAL == 0:
+                progress(position)
 
     def _add_candidate_header(self, pdf: FPDF, row):
         font, size, style = self.style.header_font
         pdf.set_font(font, style=style, size=size)
-        pdf.cell(0, 8, f"{row['full_name']} - {row['degree']} student", ln=True)
+        pdf.cell(0, 8, f"{row.full_name} - {row.degree} student", ln=True)
 
     def _add_candidate_details(self, pdf: FPDF, row):
         font, size = self.style.body_font
         pdf.set_font(font, size=size)
 
         details = [
-            f"{row['college']} - Academic average: ({row['academic_average']:.2f})",
-            f"Skills: {self._format_skills(row['skills'])}",
-            f"Preselection score: {row['score']:.1f}",
-            f"Email: {row['email']}",
+            f"{row.college} - Academic average: ({row.academic_average:.2f})",
+            f"Skills: {self._format_skills(row.skills)}",
+            f"Preselection score: {row.score:.1f}",
+            f"Email: {row.email}",
         ]
 
         for detail in details:
             pdf.cell(0, 6, detail, ln=True)
 
+    # -------- Compact layout --------
+
+    def _add_candidates_table(self, pdf: FPDF, df: pd.DataFrame, progress: Optional[ProgressCallback] = None):
+        row_height = self.style.table_row_height
+        widths = [width for _, width in COMPACT_COLUMNS]
+        self._add_table_header(pdf)
+        fitter = _CellTextFitter(pdf)
+        # Acceso por columnas: no se construye una Series por fila como con iterrows
+        columns = zip(df['full_name'], df['college'], df['degree'], df['academic_average'], df['score'], df['skills'])
+        for position, (name, college, degree, average, score, skills) in enumerate(columns, start=1):
+            if pdf.get_y() + row_height > pdf.page_break_trigger:
+                pdf.add_page()
+                self._add_table_header(pdf)
+            values = (
+                str(position), name, college, degree, f"{average:.2f}", f"{score:.2f}", self._format_skills(skills)
+            )
+            for value, width in zip(values, widths):
+                pdf.cell(width, row_height, fitter.fit(value, width), border=1)
+            pdf.ln(row_height)
+            if progress and position % PROGRESS_INTERVAL == 0:
+                progress(position)
+
+    def _add_table_header(self, pdf: FPDF):
+        font, size, style = self.style.table_header_font
+        pdf.set_font(font, style=style, size=size)
+        for title, width in COMPACT_COLUMNS:
+            pdf.cell(width, self.style.table_row_height, title, border=1)
+        pdf.ln(self.style.table_row_height)
+        # La fuente del cuerpo queda seteada hasta la próxima página
+        font, size = self.style.table_font
+        pdf.set_font(font, size=size)
+
     @staticmethod
     def _format_skills(skills):
         return ', '.join(skills)
         # fix debido al refactor de CandidateService!
         #if pd.notna(skills):
         #    return ', '.join(skills.split(','))
-        #return ''
\ No newline at end of file
+        #return ''
+
+class _CellTextFitter:
+    """Trunca textos para que entren en una celda de la tabla, con las métricas de la fuente actual del pdf.
+    Equivalente a medir con pdf.get_string_width, pero calcula el corte en una pasada y memoiza los resultados
+    (college, degree y skills se repiten mucho entre filas)"""
+    PADDING = 2
+    ELLIPSIS = '...'
+
+    def __init__(self, pdf: FPDF):
+        self._char_widths = pdf.current_font['cw']
+        self._scale = pdf.font_size / 1000
+        self._cache = {}
+
+    def fit(self, text, width: float) -> str:
+        key = (text, width)
+        fitted = self._cache.get(key)
+        if fitted is None:
+            fitted = self._cache[key] = self._fit(text, width)
+        return fitted
+
+    def _fit(self, text, width: float) -> str:
+        # Las fuentes core de fpdf solo soportan latin-1
+        text = str(text).encode('latin-1', 'replace').decode('latin-1')
+        available = (width - self.PADDING) / self._scale
+        widths = [self._char_widths.get(char, 0) for char in text]
+        if sum(widths) <= available:
+            return text
+        available -= sum(self._char_widths.get(char, 0) for char in self.ELLIPSIS)
+        return text[:bisect_right(list(accumulate(widths)), available)] + self.ELLIPSIS
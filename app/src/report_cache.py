@@ -0,0 +1,92 @@
+"""
+report_cache.py
+
+Cache en memoria de PDF reports ya generados.
+
+Provee la clase ReportCache: un LRU de bytes con tope de tamaño total. La clave identifica el contenido del reporte
+(k, layout, versión de los datos y fingerprint del scoring), por lo que una entrada nunca queda desactualizada: si
+cambian los datos o los pesos, cambia la clave. Los requests concurrentes con la misma clave comparten una única
+generación (single-flight). El ETag del reporte se deriva de la clave, así un If-None-Match se puede responder sin
+generar nada.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from src.concurrency import SingleFlight
+from src.metrics import cache_lookup
+
+
+class ReportCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, bytes]' = OrderedDict()
+        self._size = 0
+        self._renders = SingleFlight()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        """Devuelve el reporte de la clave; si no está, lo genera con render (una sola vez por clave aunque haya
+        varios requests esperándolo)"""
+        with self._lock:
+            pdf_bytes = self._entries.get(key)
+            cache_lookup('report', pdf_bytes is not None)
+            if pdf_bytes is not None:
+                self._entries.move_to_end(key)
+                return pdf_bytes
+        return self._renders.do(key, lambda: self._render(key, render))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @staticmethod
+    def etag(key: Hashable) -> str:
+        return make_etag(key)
+
+    # --------------------- Helper methods ---------------------
+
+    def _render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        pdf_bytes = render()
+        with self._lock:
+            self._put(key, pdf_bytes)
+        return pdf_bytes
+
+    def _put(self, key: Hashable, pdf_bytes: bytes):
+        # Un reporte más grande que todo el cache no se guarda (desalojaría todo lo demás)
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        self._entries[key] = pdf_bytes
+        self._size += len(pdf_bytes)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+
+def make_etag(key: Hashable) -> str:
+    """ETag derivado de una clave que identifica el contenido (por ej, parámetros y versión de los datos)"""
+    return '"' + hashlib.sha256(repr(key).encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evalúa un header If-None-Match (lista de ETags separados por coma, o '*') contra el ETag actual"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    # Comparación débil: se ignora el prefijo W/
+    return '*' in candidates or etag in (tag[2:] if tag.startswith('W/') else tag for tag in candidates)
+
+
+_report_cache: Optional[ReportCache] = None
+_report_cache_lock = threading.Lock()
+
+
+def get_report_cache(max_bytes: int) -> ReportCache:
+    """Devuelve el cache de reportes del proceso (lo crea si no existe)"""
+    global _report_cache
+    with _report_cache_lock:
+        if _report_cache is None:
+            _report_cache = ReportCache(max_bytes)
+        return _report_cache
@@ -0,0 +1,292 @@
+"""
+report_jobs.py
+
+Generación asíncrona de PDF reports (jobs).
+
+Provee la clase ReportJobManager: cada job se crea con los top k candidatos del momento y se genera en un
+ProcessPoolExecutor acotado, fuera del proceso que atiende los requests. Todo el estado de un job vive en su
+directorio (`REPORT_DIR/report_jobs/<job_id>/`):
+- `job.json`: estado, progreso, error, etc (se reescribe de forma atómica);
+- `input.pkl`: los candidatos a incluir, tal como estaban al crear el job;
+- `cancel`: marca de cancelación pedida;
+- `claim`: lock (flock) que toma el proceso que encoló el job mientras no termine;
+- `report.pdf`: el resultado.
+Así, al reiniciar el servidor los jobs terminados se pueden seguir descargando y los que quedaron a medias se vuelven
+a encolar. Como el lock se libera solo si el proceso muere, con varios procesos (por ej, workers de uvicorn) cada job
+lo genera uno solo: al arrancar, cada uno encola solo los jobs cuyo claim pudo tomar.
+"""
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import IO, Dict, Optional
+
+import pandas as pd
+
+from src.pdf_report import PDFReportGenerator, REPORT_LAYOUTS
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin locks entre procesos
+    fcntl = None
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED_STATUSES = (DONE, FAILED, CANCELLED)
+
+JOB_FILE = 'job.json'
+INPUT_FILE = 'input.pkl'
+CANCEL_FILE = 'cancel'
+CLAIM_FILE = 'claim'
+REPORT_FILE = 'report.pdf'
+
+_JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ReportJobCancelled(Exception):
+    pass
+
+
+class ReportJobManager:
+    def __init__(self, jobs_dir, max_workers: int, max_pending: int, retention_seconds: float):
+        self.jobs_dir = Path(jobs_dir)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self._executor = self._create_executor()
+        # Reentrante: cancelar un future ejecuta su callback (_on_done) en el mismo thread, con el lock tomado
+        self._lock = threading.RLock()
+        self._futures: Dict[str, Future] = {}
+        # Claims (archivos con el lock tomado) de los jobs encolados por este proceso
+        self._claims: Dict[str, IO] = {}
+        self._recover()
+
+    def submit(self, df: pd.DataFrame, k: int, layout: str) -> Dict:
+        """Crea un job que genera el reporte de los candidatos de df. Lanza ValueError si el layout no existe y
+        RuntimeError si ya hay demasiados jobs pendientes"""
+        if layout not in REPORT_LAYOUTS:
+            raise ValueError(f"Unknown report layout: {layout}")
+        with self._lock:
+            self._remove_expired()
+            if len(self._futures) >= self.max_pending:
+                raise RuntimeError('Too many pending report jobs')
+            job_id = uuid.uuid4().hex
+            job_dir = self.jobs_dir / job_id
+            job_dir.mkdir()
+            # Se toma el claim antes de escribir job.json: otro proceso que recupere jobs no llega a encolarlo
+            self._claims[job_id] = _claim_job(job_dir)
+            df.to_pickle(job_dir / INPUT_FILE)
+            job = {
+                'job_id': job_id, 'status': QUEUED, 'k': k, 'layout': layout, 'total_rows': len(df),
+                'rows_done': 0, 'progress': 0.0, 'error': None, 'created_at': time.time(), 'finished_at': None,
+            }
+            _write_job(job_dir, job)
+            self._enqueue(job_id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Estado del job, o None si no existe"""
+        job_dir = self._job_dir(job_id)
+        if job_dir is None:
+            return None
+        return _read_job(job_dir)
+
+    def report_path(self, job_id: str) -> Optional[Path]:
+        """Path del reporte si el job terminó bien, si no None"""
+        job = self.get(job_id)
+        if job is None or job['status'] != DONE:
+            return None
+        return self.jobs_dir / job_id / REPORT_FILE
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """Cancela el job (si todavía no terminó). Devuelve su estado, o None si no existe"""
+        job_dir = self._job_dir(job_id)
+        if job_dir is None:
+            return None
+        with self._lock:
+            job = _read_job(job_dir)
+            if job['status'] in FINISHED_STATUSES:
+                return job
+            # El worker revisa la marca mientras genera; si el job todavía no arrancó, ni siquiera llega a correr
+            (job_dir / CANCEL_FILE).touch()
+            future = self._futures.get(job_id)
+            if future is not None and future.cancel():
+                job = _finish_job(job_dir, job, CANCELLED)
+        return job
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # --------------------- Helper methods ---------------------
+
+    def _job_dir(self, job_id: str) -> Optional[Path]:
+        # El ID se valida antes de armar el path (evita path traversal)
+        if not _JOB_ID_PATTERN.match(job_id):
+            return None
+        job_dir = self.jobs_dir / job_id
+        return job_dir if (job_dir / JOB_FILE).exists() else None
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn: los workers no heredan los threads (writer, etc) ni los locks del proceso del servidor
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def _enqueue(self, job_id: str):
+        try:
+            future = self._executor.submit(render_report_job, str(self.jobs_dir / job_id))
+        except BrokenProcessPool:
+            # Si un worker murió abruptamente el pool queda inutilizable: se reemplaza por uno nuevo
+            self._executor.shutdown(wait=False)
+            self._executor = self._create_executor()
+            future = self._executor.submit(render_report_job, str(self.jobs_dir / job_id))
+        self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._on_done(job_id, f))
+
+    def _on_done(self, job_id: str, future: Future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+            claim = self._claims.pop(job_id, None)
+            if future.cancelled():
+                _release_claim(claim)
+                return
+            error = future.exception()
+            if error is not None:
+                # El worker murió sin llegar a registrar el error (por ej, el proceso fue terminado)
+                job_dir = self.jobs_dir / job_id
+                job = _read_job(job_dir)
+                if job['status'] not in FINISHED_STATUSES:
+                    _finish_job(job_dir, job, FAILED, error=str(error) or type(error).__name__)
+            _release_claim(claim)
+
+    def _recover(self):
+        """Vuelve a encolar los jobs que no terminaron antes de que se detuviera el servidor. Solo los que no
+        tienen dueño: si el claim de un job está tomado, otro proceso vivo lo encoló (o ya lo está generando)"""
+        with self._lock:
+            self._remove_expired()
+            for job_dir in sorted(self.jobs_dir.iterdir()):
+                if not (job_dir / JOB_FILE).exists():
+                    continue
+                claim = _claim_job(job_dir, blocking=False)
+                if claim is None:
+                    continue
+                # El estado se lee con el claim tomado: el dueño anterior pudo haberlo terminado recién
+                job = _read_job(job_dir)
+                if job['status'] in FINISHED_STATUSES:
+                    _release_claim(claim)
+                    continue
+                if (job_dir / CANCEL_FILE).exists():
+                    _finish_job(job_dir, job, CANCELLED)
+                    _release_claim(claim)
+                    continue
+                job.update(status=QUEUED, rows_done=0, progress=0.0)
+                _write_job(job_dir, job)
+                self._claims[job['job_id']] = claim
+                self._enqueue(job['job_id'])
+
+    def _remove_expired(self):
+        now = time.time()
+        for job_dir in self.jobs_dir.iterdir():
+            if not (job_dir / JOB_FILE).exists():
+                continue
+            job = _read_job(job_dir)
+            if job['finished_at'] is not None and now - job['finished_at'] > self.retention_seconds:
+                shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def render_report_job(job_dir: str) -> None:
+    """Genera el reporte de un job. Corre en un proceso del pool: solo recibe el directorio del job y registra ahí
+    el progreso y el resultado"""
+    job_dir = Path(job_dir)
+    job = _read_job(job_dir)
+    if (job_dir / CANCEL_FILE).exists():
+        _finish_job(job_dir, job, CANCELLED)
+        return
+    job.update(status=RUNNING, rows_done=0, progress=0.0)
+    _write_job(job_dir, job)
+
+    def progress(rows_done: int):
+        if (job_dir / CANCEL_FILE).exists():
+            raise ReportJobCancelled()
+        job.update(rows_done=rows_done, progress=rows_done / job['total_rows'] if job['total_rows'] else 1.0)
+        _write_job(job_dir, job)
+
+    tmp_file = REPORT_FILE + '.tmp'
+    try:
+        df = pd.read_pickle(job_dir / INPUT_FILE)
+        PDFReportGenerator(output_dir=job_dir).generate(df, tmp_file, job['layout'], progress)
+        (job_dir / tmp_file).replace(job_dir / REPORT_FILE)
+    except Exception as e:
+        (job_dir / tmp_file).unlink(missing_ok=True)
+        if (job_dir / CANCEL_FILE).exists():
+            _finish_job(job_dir, job, CANCELLED)
+        else:
+            _finish_job(job_dir, job, FAILED, error=str(e))
+        return
+    (job_dir / INPUT_FILE).unlink(missing_ok=True)
+    _finish_job(job_dir, job, DONE)
+
+
+def _finish_job(job_dir: Path, job: Dict, status: str, error: Optional[str] = None) -> Dict:
+    job.update(status=status, error=error, finished_at=time.time())
+    if status == DONE:
+        job.update(rows_done=job['total_rows'], progress=1.0)
+    _write_job(job_dir, job)
+    return job
+
+
+def _claim_job(job_dir: Path, blocking: bool = True) -> Optional[IO]:
+    """Toma el lock exclusivo del job, que queda tomado mientras el archivo devuelto siga abierto (o hasta que
+    muera el proceso). Sin blocking, devuelve None si otro proceso lo tiene"""
+    claim = open(job_dir / CLAIM_FILE, 'a')
+    if fcntl is not None:
+        try:
+            fcntl.flock(claim, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            claim.close()
+            return None
+    return claim
+
+
+def _release_claim(claim: Optional[IO]):
+    if claim is not None:
+        claim.close()
+
+
+def _read_job(job_dir: Path) -> Dict:
+    with open(job_dir / JOB_FILE) as f:
+        return json.load(f)
+
+
+def _write_job(job_dir: Path, job: Dict):
+    # Escritura atómica: quien lee el estado nunca ve un json a medio escribir
+    tmp_path = job_dir / f'{JOB_FILE}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(job, f)
+    tmp_path.replace(job_dir / JOB_FILE)
+
+
+_manager: Optional[ReportJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_report_job_manager(jobs_dir, max_workers: int, max_pending: int, retention_seconds: float) -> ReportJobManager:
+    """Devuelve el manager de jobs del proceso (lo crea, recuperando los jobs pendientes, si no existe)"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ReportJobManager(jobs_dir, max_workers, max_pending, retention_seconds)
+        return _manager
+
+
+def shutdown_report_job_manager() -> None:
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
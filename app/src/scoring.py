@@ -0,0 +1,169 @@
+"""
+scoring.py
+
+Cálculo vectorizado (por columnas, con numpy/pandas) del puntaje de preselección de los candidatos.
+
+Reemplaza al cálculo fila por fila (`df.apply(..., axis=1)`) de CandidateService._calculate_score, manteniendo
+exactamente los mismos resultados: las contribuciones se suman en el mismo orden que en la versión por fila
+(promedio académico, universidad y luego una skill relevante a la vez), de modo que los floats coinciden bit a bit.
+También acepta la representación compacta del store (CompactCandidates), donde college es categórica y las skills
+están codificadas, por lo que las pertenencias se resuelven sobre los valores distintos y no fila por fila.
+
+Provee también ScoringProfile (una configuración de scoring con nombre, por ej una por rol: pesos, universidades de
+prestigio, skills relevantes y umbral de promedio) y score_profiles, que calcula los scores de varios perfiles en una
+misma pasada: college y skills se codifican una vez y, para cada perfil, solo se resuelve qué códigos le suman.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.columnar import CompactCandidates
+
+ACADEMIC_AVERAGE_THRESHOLD = 7.5
+
+# Versión del algoritmo de scoring: incrementar si cambia la fórmula, para invalidar los scores persistidos
+SCORING_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ScoringProfile:
+    name: str
+    weights: Dict[str, float] = field(hash=False)
+    prestige_colleges: Tuple[str, ...]
+    relevant_skills: Tuple[str, ...]
+    academic_average_threshold: float = ACADEMIC_AVERAGE_THRESHOLD
+
+    def __post_init__(self):
+        # Se aceptan listas (como las de constants), pero se guardan como tuplas
+        object.__setattr__(self, 'prestige_colleges', tuple(self.prestige_colleges))
+        object.__setattr__(self, 'relevant_skills', tuple(self.relevant_skills))
+
+    @property
+    def fingerprint(self) -> str:
+        return scoring_fingerprint(
+            self.weights, self.prestige_colleges, self.relevant_skills, self.academic_average_threshold
+        )
+
+
+def profiles_from_config(config: Dict[str, Dict]) -> List[ScoringProfile]:
+    """Construye los perfiles a partir de su configuración por nombre (ver SCORING_PROFILES en constants)"""
+    return [ScoringProfile(name, **profile_config) for name, profile_config in config.items()]
+
+
+def scoring_fingerprint(
+        weights: Dict[str, float],
+        prestige_colleges: Iterable[str],
+        relevant_skills: Iterable[str],
+        academic_average_threshold: float = ACADEMIC_AVERAGE_THRESHOLD,
+) -> str:
+    """Identificador corto de una configuración de scoring (pesos, constantes y versión del algoritmo)"""
+    config = {
+        'version': SCORING_VERSION,
+        'academic_average_threshold': academic_average_threshold,
+        'weights': sorted(weights.items()),
+        'prestige_colleges': sorted(set(prestige_colleges)),
+        'relevant_skills': sorted(set(relevant_skills)),
+    }
+    return hashlib.sha256(json.dumps(config).encode()).hexdigest()[:16]
+
+
+def score_candidates(
+        df: Union[pd.DataFrame, CompactCandidates],
+        weights: Dict[str, float],
+        prestige_colleges: Iterable[str],
+        relevant_skills: Iterable[str],
+        academic_average_threshold: float = ACADEMIC_AVERAGE_THRESHOLD,
+) -> pd.Series:
+    """Devuelve una Series con el score de cada candidato del dataframe (mismo índice que df; para
+    CompactCandidates, índice posicional = ID)"""
+    profile = ScoringProfile('', weights, prestige_colleges, relevant_skills, academic_average_threshold)
+    return score_profiles(df, [profile])[profile.fingerprint]
+
+
+def score_profiles(
+        df: Union[pd.DataFrame, CompactCandidates],
+        profiles: Sequence[ScoringProfile],
+) -> Dict[str, pd.Series]:
+    """Calcula, en una pasada sobre los datos, los scores de cada perfil. Devuelve una Series (mismo índice que
+    score_candidates) por fingerprint de perfil"""
+    profiles = list(profiles)
+    thresholds = {profile.academic_average_threshold for profile in profiles}
+    if isinstance(df, CompactCandidates):
+        above_threshold = {threshold: df.academic_average_above(threshold) for threshold in thresholds}
+        is_prestige = df.category_masks('college', [profile.prestige_colleges for profile in profiles])
+        skill_counts = df.count_skills_by_set([profile.relevant_skills for profile in profiles])
+        index = pd.RangeIndex(len(df))
+    else:
+        academic_average = pd.to_numeric(df['academic_average'], errors='coerce').to_numpy(dtype=float)
+        above_threshold = {threshold: academic_average > threshold for threshold in thresholds}
+        is_prestige = _membership_masks(df['college'], [profile.prestige_colleges for profile in profiles])
+        skill_counts = count_relevant_skills_by_set(df['skills'], [profile.relevant_skills for profile in profiles])
+        index = df.index
+
+    scores = {}
+    for position, profile in enumerate(profiles):
+        score = _combine(
+            profile.weights,
+            above_threshold[profile.academic_average_threshold],
+            is_prestige[:, position],
+            skill_counts[:, position]
+        )
+        scores[profile.fingerprint] = pd.Series(score, index=index, name='score')
+    return scores
+
+
+def count_relevant_skills(skills: pd.Series, relevant_skills: Iterable[str]) -> np.ndarray:
+    """Cuenta, para cada candidato, cuántas de sus skills (lista) están entre las relevantes"""
+    return count_relevant_skills_by_set(skills, [relevant_skills])[:, 0]
+
+
+def count_relevant_skills_by_set(skills: pd.Series, skill_sets: Sequence[Iterable[str]]) -> np.ndarray:
+    """Como count_relevant_skills, para varios conjuntos de skills a la vez: matriz (candidatos x conjuntos)"""
+    n = len(skills)
+    # explode sobre un índice posicional, así el índice de cada skill es la fila del candidato
+    exploded = pd.Series(skills.to_numpy(), dtype=object).explode()
+    positions = exploded.index.to_numpy()
+    # Las skills se codifican una sola vez; para cada conjunto solo se mira qué códigos pertenecen
+    codes, vocabulary = pd.factorize(exploded)
+    hits = _vocabulary_hits(vocabulary, skill_sets)[codes]
+    counts = np.empty((n, len(skill_sets)), dtype=np.int64)
+    for position in range(len(skill_sets)):
+        counts[:, position] = np.bincount(positions[hits[:, position]], minlength=n)
+    return counts
+
+# --------------------- Helper methods ---------------------
+
+def _combine(weights: Dict[str, float], above_threshold: np.ndarray, is_prestige: np.ndarray,
+             skill_counts: np.ndarray) -> np.ndarray:
+    # El score solo depende de (supera el promedio, es de prestigio, cantidad de skills relevantes): se calcula una
+    # vez por combinación, sumando en el mismo orden que la versión por fila, y cada candidato toma el de la suya
+    max_count = int(skill_counts.max(initial=0))
+    table = np.empty((2, 2, max_count + 1))
+    for above in (0, 1):
+        for prestige in (0, 1):
+            score = (float(weights['academic_average']) if above else 0.0) + \
+                    (float(weights['college']) if prestige else 0.0)
+            # Se suma el peso de skills una vez por cada skill relevante, igual que el loop de la versión por fila
+            for count in range(max_count + 1):
+                table[above, prestige, count] = score
+                score += float(weights['skills'])
+    return table[above_threshold.astype(np.intp), is_prestige.astype(np.intp), skill_counts]
+
+
+def _membership_masks(values: pd.Series, value_sets: Sequence[Iterable[str]]) -> np.ndarray:
+    """Matriz (filas x conjuntos) que indica si cada valor está en cada conjunto (NaN nunca está)"""
+    codes, distinct = pd.factorize(values)
+    return _vocabulary_hits(distinct, value_sets)[codes]
+
+
+def _vocabulary_hits(vocabulary, value_sets: Sequence[Iterable[str]]) -> np.ndarray:
+    # Una fila por valor distinto más una final en False, que es la que toma el código -1 (faltante)
+    vocabulary = pd.Index(vocabulary)
+    hits = np.zeros((len(vocabulary) + 1, len(value_sets)), dtype=bool)
+    for position, value_set in enumerate(value_sets):
+        hits[:-1, position] = vocabulary.isin(list(value_set))
+    return hits
@@ -7,14 +7,26 @@ Se definen las principales acciones que dan función y comportamiento al sistema
 Provee clase CandidateService que encapsula los principales métodos para trabajar con la información de los candidatos.
 Provee una interfaz para la operación de los candidatos.
 """
-from typing import List, Optional, Dict
+from typing import Hashable, Iterable, Iterator, List, Optional, Dict, Tuple
 
 # Librerias para guardado y procesamiento de csv
+import numpy as np
 import pandas as pd
 
 # Constantes y models
 # from app.src.constants import CANDIDATES_DATA_PATH, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE
+from src.columnar import CompactCandidates
+from src.constants import DEFAULT_SCORING_PROFILE
+from src.concurrency import ChangeFeed, SingleFlight
+from src.metrics import stage
 from src.models import StudentCandidate
+from src.scoring import ScoringProfile, score_profiles, ACADEMIC_AVERAGE_THRESHOLD
+from src.storage import CandidateStorage, CSVStorage
+from src.store import get_candidate_store
+from src.writer import get_candidate_writer
+
+# Cargas de todos los candidatos en curso, compartidas entre los requests concurrentes del proceso
+_candidate_loads = SingleFlight()
 
 
 class CandidateService:
@@ -25,6 +37,9 @@ class CandidateService:
             prestige_colleges: List[str],
             relevant_skills: List[str],
             preselection_weights: Optional[Dict[str, float]] = None,
+            storage: Optional[CandidateStorage] = None,
+            profiles: Optional[Iterable[ScoringProfile]] = None,
+            academic_average_threshold: float = ACADEMIC_AVERAGE_THRESHOLD,
     ):
         self.data_path = data_path
         self.data_header = header
@@ -35,41 +50,226 @@ class CandidateService:
             'college': 0.3,
             'skills': 0.01
         }
+        self.academic_average_threshold = academic_average_threshold
+        # Perfil de scoring por default (el de los parámetros) y perfiles adicionales (por ej, uno por rol), por nombre
+        self.default_profile = ScoringProfile(
+            DEFAULT_SCORING_PROFILE, self.preselection_weights, prestige_colleges, relevant_skills,
+            academic_average_threshold
+        )
+        self.profiles: Dict[str, ScoringProfile] = {self.default_profile.name: self.default_profile}
+        self.profiles.update((profile.name, profile) for profile in profiles or ())
+        self.scoring_fingerprint = self.default_profile.fingerprint
+        # Una única función que puntúa todos los perfiles en una pasada: el store la llama una vez por alta o recálculo
+        self._scorer = self._calculate_profile_scores
+        # Por default, los candidatos se guardan en el csv de data_path
+        self._store = get_candidate_store(storage or CSVStorage(data_path, header))
+        self.storage = self._store.storage
 
-    def save_candidate(self, candidate: StudentCandidate) -> None:
-        """Guarda la data del candidato en el csv"""
-        df_new_candidate = self.get_candidate_df(candidate)
-        if self.data_path.exists():
-            self._save_candidate_data_to_existing_csv(df_new_candidate)
-        else:
-            self._create_csv_and_save_candidate_data(df_new_candidate)
+    def save_candidate(self, candidate: StudentCandidate) -> int:
+        """Guarda la data del candidato en el almacenamiento (csv por default). Devuelve su ID"""
+        return self.save_candidates([candidate])[0]
+
+    def save_candidates(self, candidates: List[StudentCandidate]) -> List[int]:
+        """Guarda varios candidatos en una única escritura. Devuelve sus IDs, en el mismo orden.
+        Las escrituras pasan por el writer del proceso, que las agrupa con las de otros requests concurrentes;
+        el score se calcula una única vez, al guardar, y queda persistido junto a los datos"""
+        records = [self.get_candidate_record(candidate) for candidate in candidates]
+        scorers = {profile.fingerprint: self._scorer for profile in self.profiles.values()}
+        new_ids = get_candidate_writer(self._store).write(records, scorers)
+        return list(new_ids)
+
+    def get_profile(self, profile: Optional[str] = None) -> ScoringProfile:
+        """Devuelve el perfil de scoring por nombre (el default si es None). Lanza ValueError si no existe"""
+        if profile is None:
+            return self.default_profile
+        if profile not in self.profiles:
+            raise ValueError(f"Unknown scoring profile '{profile}'")
+        return self.profiles[profile]
 
-    def get_all_candidates(self, with_score: bool = True) -> pd.DataFrame:
-        """Devuelve pandas dataframe de los de los candidatos"""
-        if self.data_path.exists():
-            return self._get_candidates_df_from_csv(with_score)
+    def get_all_candidates(self, with_score: bool = True, profile: Optional[str] = None) -> pd.DataFrame:
+        """Devuelve pandas dataframe de los de los candidatos (con el score del perfil indicado).
+        Las llamadas concurrentes comparten una única carga (single-flight): cada una recibe su propio dataframe
+        (se le pueden agregar o quitar columnas), pero los datos son compartidos y no deben modificarse in place"""
+        if self.storage.exists():
+            fingerprint = self.get_profile(profile).fingerprint
+            key = (self.storage.key, fingerprint if with_score else None)
+            df = _candidate_loads.do(key, lambda: self._get_candidates_df_from_storage(with_score, fingerprint))
+            return df.copy(deep=False)
         else:
-            return pd.DataFrame(columns=self.data_header)
+            df = pd.DataFrame(columns=self.data_header)
+            if with_score:
+                # Sin candidatos, igual se agrega la columna score (vacía), como cuando los hay
+                df['score'] = self._calculate_scores(df, self.get_profile(profile))
+            return df
+
+    def get_preselected_candidates(
+            self,
+            k: int = 10,
+            with_score: bool = True,
+            profile: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Devuelve pandas dataframe de los primeros k mejores candidatos según el perfil de scoring, ordenados
+        descendientemente (los empates, en el mismo orden que el `sort_values` sobre todo el dataframe). No ordena en
+        cada llamada: usa el ranking del perfil que el store calcula una vez por versión de los datos"""
+        fingerprint = self.get_profile(profile).fingerprint
+        with stage('top_k', rows=k):
+            top_df, top_scores = self._store.get_top_k(fingerprint, self._scorer, k)
+        if with_score:
+            top_df['score'] = top_scores
+        return top_df
 
-    def get_preselected_candidates(self, k: int = 10, with_score: bool = True) -> pd.DataFrame:
-        """Devuelve pandas dataframe de los primeros k mejores candidatos ordenados descendientemente"""
-        sorted_df = self._get_candidates_df_sorted_by_score(with_score)
-        return sorted_df.head(k)
+    def count_candidates(self) -> int:
+        """Cantidad de candidatos guardados, sin cargarlos (índice de offsets del csv, COUNT en SQLite)"""
+        return self.storage.count()
+
+    def get_data_version(self) -> Hashable:
+        """Identifica la versión actual de los datos: cambia con cada alta (o edición externa) del almacenamiento"""
+        return self.storage.key, self.storage.signature()
+
+    def query_candidates(
+            self,
+            name: Optional[str] = None,
+            college: Optional[str] = None,
+            degree: Optional[str] = None,
+            min_score: Optional[float] = None,
+            max_score: Optional[float] = None,
+            page: int = 1,
+            per_page: int = 10,
+            with_score: bool = True,
+            skills: Optional[List[str]] = None,
+            profile: Optional[str] = None,
+    ) -> Tuple[int, List[Dict]]:
+        """Filtra los candidatos y devuelve (total de candidatos que cumplen los filtros, candidatos de la página).
+        Los filtros de texto son case-insensitive y por substring: por ej, degree = 'science' devuelve tanto
+        Computer Science como Data Science. El filtro de skills pide que el candidato tenga todas (nombre exacto,
+        case-insensitive). Los scores (y sus filtros) son los del perfil indicado.
+        Solo se convierten a dict las filas de la página pedida"""
+        fingerprint = self.get_profile(profile).fingerprint
+        text_queries = [
+            (column, query) for column, query in (('full_name', name), ('college', college), ('degree', degree)) if query
+        ]
+        # Bajo el lock solo se toman las referencias (de una misma versión de los datos); el store no las modifica
+        with self._store.lock:
+            candidates = self._store.get_candidates()
+            scores = self._store.get_scores(fingerprint, self._scorer)
+
+        with stage('filter', rows=len(candidates)):
+            mask = np.ones(len(candidates), dtype=bool)
+            for column, query in text_queries:
+                mask &= candidates.contains(column, query)
+            if min_score is not None:
+                mask &= scores >= min_score
+            if max_score is not None:
+                mask &= scores <= max_score
+            if skills:
+                mask &= candidates.has_skills(skills)
+            matching_ids = np.flatnonzero(mask)
+
+        start = (page - 1) * per_page
+        page_ids = matching_ids[start:start + per_page]
+        with stage('materialize', rows=len(page_ids)):
+            page_df = candidates.to_frame(page_ids)
+            if with_score:
+                page_df['score'] = scores[page_ids]
+        with stage('to_dict', rows=len(page_df)):
+            records = page_df.to_dict(orient="records")
+        return len(matching_ids), records
+
+    def get_candidates_since(
+            self,
+            since_id: Optional[int] = None,
+            limit: int = 100,
+            with_score: bool = True,
+            profile: Optional[str] = None,
+    ) -> Tuple[int, List[Dict], bool]:
+        """Change feed: devuelve (cursor, candidatos con ID mayor a since_id en orden de alta, si quedan más).
+        Se devuelven a lo sumo limit; el cursor es el ID del último devuelto (o since_id si no hay nuevos) y se pasa
+        como since_id en la próxima llamada. Con since_id None se empieza desde el último candidato actual (solo
+        los que se agreguen a partir de ahora). Como los IDs son el orden de alta, alcanza con un slice de la cache"""
+        fingerprint = self.get_profile(profile).fingerprint
+        with self._store.lock:
+            candidates = self._store.get_candidates()
+            scores = self._store.get_scores(fingerprint, self._scorer) if with_score else None
+        total = len(candidates)
+        if since_id is None:
+            since_id = total - 1
+        start = max(since_id + 1, 0)
+        new_ids = np.arange(start, min(start + limit, total))
+        if not len(new_ids):
+            return since_id, [], False
+        with stage('materialize', rows=len(new_ids)):
+            new_df = candidates.to_frame(new_ids)
+            if with_score:
+                new_df['score'] = scores[new_ids]
+        with stage('to_dict', rows=len(new_df)):
+            new_df.insert(0, 'id', new_df.index)
+            # NaN no es JSON válido: los valores faltantes van como null
+            records = new_df.astype(object).where(new_df.notna(), None).to_dict(orient='records')
+        return int(new_ids[-1]), records, int(new_ids[-1]) < total - 1
+
+    def get_change_feed(self) -> ChangeFeed:
+        """Aviso de nuevas altas del proceso (para esperar nuevos candidatos sin consultar todo el tiempo)"""
+        return self._store.changes
+
+    def iter_candidates(
+            self,
+            name: Optional[str] = None,
+            college: Optional[str] = None,
+            degree: Optional[str] = None,
+            min_score: Optional[float] = None,
+            max_score: Optional[float] = None,
+            with_score: bool = True,
+            skills: Optional[List[str]] = None,
+            chunksize: int = 10_000,
+            profile: Optional[str] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Recorre todos los candidatos que cumplen los filtros (mismos que query_candidates) en bloques de
+        dataframes con una columna 'id'. Lee el almacenamiento por partes (sin pasar por la cache), así la memoria
+        usada no depende de la cantidad de candidatos. Si ninguno los cumple, devuelve un único bloque vacío (con las
+        columnas, para que la exportación tenga el header o el schema)"""
+        scoring_profile = self.get_profile(profile)
+        empty = True
+        for chunk in self.storage.iter_chunks(chunksize):
+            scores = self._calculate_scores(chunk, scoring_profile).to_numpy()
+            with stage('filter', rows=len(chunk)):
+                mask = np.ones(len(chunk), dtype=bool)
+                for column, query in (('full_name', name), ('college', college), ('degree', degree)):
+                    if query:
+                        lowercase = chunk[column].fillna('').astype(str).str.lower()
+                        mask &= lowercase.str.contains(query.lower(), regex=False).to_numpy()
+                if min_score is not None:
+                    mask &= scores >= min_score
+                if max_score is not None:
+                    mask &= scores <= max_score
+                if skills:
+                    mask &= CompactCandidates.from_frame(chunk).has_skills(skills)
+            if not mask.any():
+                continue
+            filtered = chunk[mask].copy()
+            filtered.insert(0, 'id', filtered.index)
+            if with_score:
+                filtered['score'] = scores[mask]
+            empty = False
+            yield filtered.reset_index(drop=True)
+        if empty:
+            yield pd.DataFrame(columns=['id'] + self.data_header + (['score'] if with_score else []))
 
     def clear_all_candidates(self):
         """Elimina la informacion de los candidatos"""
-        if self.data_path.exists():
-            self.data_path.unlink()
+        self._store.clear()
 
     def get_candidate_by_id(self, candidate_id: int) -> StudentCandidate | None:
         """Devuelve candidato especifico por su ID (para simplificar, su ID es el índice en el dataframe,
         es deicr, el número de línea, que coincide con el momento en que fue creado).
         Como el enunciado no requiere implementar eliminiación de candidatos, no habría problemas con esta
-        implementación, ya que siempre mantendrían su ID = numero de fila"""
-        candidates = self.get_all_candidates()
-        if candidate_id < 0 or candidate_id >= len(candidates):
+        implementación, ya que siempre mantendrían su ID = numero de fila.
+        Se lee solo la fila del candidato (índice de offsets en el csv, clave primaria en SQLite)"""
+        if candidate_id < 0:
+            return None
+        with stage('row_lookup', rows=1):
+            candidate_row = self.storage.get_row(candidate_id)
+        if candidate_row is None:
             return None
-        candidate_row = candidates.iloc[candidate_id]
         return self._row_to_candidate_model(candidate_row)
 
     # --------------------- Helper methods ---------------------
@@ -78,44 +278,48 @@ class CandidateService:
     # -------- Saving Candidate data from Dataframe --------
 
     @staticmethod
-    def get_candidate_df(candidate):
+    def get_candidate_record(candidate):
         data = candidate.model_dump()
         data['skills'] = ','.join(data['skills'])
-        df_new_candidate = pd.DataFrame([data])
-        return df_new_candidate
-
-    def _create_csv_and_save_candidate_data(self, df_new_candidate):
-        pd.DataFrame(self.data_header).to_csv(self.data_path, mode='w', header=False, index=False)
-        df_new_candidate.to_csv(self.data_path, mode='w', header=True, index=False)
+        return data
 
-    def _save_candidate_data_to_existing_csv(self, df_new_candidate):
-        df_new_candidate.to_csv(self.data_path, mode='a', header=False, index=False)
+    @staticmethod
+    def get_candidate_df(candidate):
+        df_new_candidate = pd.DataFrame([CandidateService.get_candidate_record(candidate)])
+        return df_new_candidate
 
-    # -------- Loading Candidates data from csv to Dataframe --------
+    # -------- Loading Candidates data from storage to Dataframe --------
 
-    def _get_candidates_df_from_csv(self, with_score):
-        df = pd.read_csv(self.data_path)
-        # Convierto skills separadas por coma a lista nuevamente, siempre que no sea NaN ni sea string vacio
-        df['skills'] = df['skills'].apply(lambda skills: skills.split(',') if pd.notna(skills) and skills else [])
+    def _get_candidates_df_from_storage(self, with_score, fingerprint):
+        # El parseo de los datos (y el split de skills) queda cacheado en el store del proceso
+        with self._store.lock:
+            candidates = self._store.get_candidates()
+            scores = self._store.get_scores(fingerprint, self._scorer) if with_score else None
+        df = candidates.to_frame()
         if with_score:
-            df['score'] = df.apply(lambda row: self._calculate_score(row), axis=1)
+            df['score'] = scores
         return df
 
-    def _get_candidates_df_sorted_by_score(self, with_score):
-        # df = pd.read_csv(self.data_path)
-        df = self.get_all_candidates(with_score=True)
-        df['score'] = df.apply(lambda row: self._calculate_score(row), axis=1)
-        sorted_df = df.sort_values(by=['score'], ascending=False)
-        if not with_score:
-            sorted_df = sorted_df.drop(columns=['score'])
-        return sorted_df
-
     # -------- Calculating candidates score --------
 
+    def _calculate_scores(self, df, profile: Optional[ScoringProfile] = None) -> pd.Series:
+        """Calcula el puntaje de todos los candidatos del dataframe de forma vectorizada (perfil default si no se
+        indica otro)"""
+        profile = profile or self.default_profile
+        with stage('score', rows=len(df)):
+            return score_profiles(df, [profile])[profile.fingerprint]
+
+    def _calculate_profile_scores(self, df) -> Dict[str, pd.Series]:
+        """Calcula el puntaje de todos los candidatos para todos los perfiles, en una pasada. Devuelve los scores
+        por fingerprint de perfil"""
+        with stage('score', rows=len(df)):
+            return score_profiles(df, list(self.profiles.values()))
+
     def _calculate_score(self, row):
-        """Calcula el puntaje de un candidato (row de pandas dataframe) segun las ponderaciones asignadas"""
+        """Calcula el puntaje de un candidato (row de pandas dataframe) segun las ponderaciones asignadas.
+        Versión por fila, se mantiene como referencia de _calculate_scores"""
         score = 0
-        if row['academic_average'] > 7.5:
+        if row['academic_average'] > self.academic_average_threshold:
             score += self.preselection_weights['academic_average']
         if row['college'] in self.prestige_colleges:
             score += self.preselection_weights['college']
@@ -0,0 +1,112 @@
+"""
+snapshot.py
+
+Snapshot binario, por columnas, del csv de candidatos.
+
+Provee la clase ColumnarSnapshot, que guarda junto al csv (`candidates.arrow`) las primeras filas del archivo ya
+parseadas, en formato Arrow IPC (Feather v2) sin compresión: se abre con memory_map y las columnas de
+CompactCandidates apuntan directamente al archivo, sin parsear texto ni volver a separar las skills (que se guardan
+como columna de listas). Las filas agregadas después quedan como "cola" del csv, que se parsea aparte y se integra al
+snapshot cada tanto (ver CSVStorage).
+
+Las altas se siguen escribiendo en el csv. El snapshot indica cuántas filas y cuántos bytes del csv cubre, un hash
+(blake2b) de todos esos bytes y la signature (mtime y tamaño) que tenía el csv al escribirlo. Si el csv no cambió
+desde entonces, el snapshot se usa sin más; si cambió (por ej, por altas posteriores), se usa solo si el hash de los
+bytes que cubre sigue coincidiendo, así que cualquier edición de esas filas, aunque no cambie el tamaño del archivo,
+lo invalida. Un snapshot que ya no coincide se borra (y se reescribe en la próxima compactación).
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pyarrow as pa
+
+from src.columnar import CompactCandidates
+
+FORMAT_VERSION = b'3'
+HASH_READ_SIZE = 1 << 20
+
+
+class ColumnarSnapshot:
+    def __init__(self, data_path):
+        self.data_path = Path(data_path)
+        self.snapshot_path = self.data_path.with_suffix('.arrow')
+
+    def rows(self) -> int:
+        """Filas del csv que cubre el snapshot (0 si no hay). Solo lee los metadatos"""
+        metadata = self._read_metadata()
+        return int(metadata[b'rows']) if metadata else 0
+
+    def read(self, header: List[str], csv_signature: Tuple[int, int]) -> Optional[Tuple[CompactCandidates, int, int]]:
+        """Devuelve (candidatos, filas, bytes del csv que cubren), o None si no hay snapshot o ya no coincide con
+        el csv (cuya signature actual, mtime y tamaño, es csv_signature). Si no coincide, lo borra"""
+        try:
+            reader = pa.ipc.open_file(pa.memory_map(str(self.snapshot_path)))
+        except FileNotFoundError:
+            return None
+        except pa.ArrowInvalid:
+            self.clear()
+            return None
+        metadata = reader.schema.metadata or {}
+        if metadata.get(b'version') != FORMAT_VERSION or reader.schema.names != list(header):
+            self.clear()
+            return None
+        rows, covered_size = int(metadata[b'rows']), int(metadata[b'csv_size'])
+        written_signature = (int(metadata[b'csv_mtime_ns']), int(metadata[b'csv_file_size']))
+        # Con el csv sin cambios no hace falta leerlo; si cambió, los bytes cubiertos tienen que ser los mismos
+        if written_signature != tuple(csv_signature) and (
+                covered_size > csv_signature[1] or self._hash(covered_size) != metadata[b'hash'].decode()):
+            self.clear()
+            return None
+        return CompactCandidates.from_arrow(reader.read_all(), header), rows, covered_size
+
+    def prepare(self, candidates: CompactCandidates, covered_size: int, csv_signature: Tuple[int, int]) -> Path:
+        """Escribe, en un archivo temporal, el snapshot de los candidatos (las primeras filas del csv, que ocupan
+        covered_size bytes, cuando la signature del csv era csv_signature). Es la parte lenta (escribe todas las
+        columnas y hashea los bytes cubiertos del csv), así que no toma locks: se hace efectivo con publish"""
+        table = candidates.to_arrow()
+        mtime_ns, file_size = csv_signature
+        table = table.replace_schema_metadata({
+            b'version': FORMAT_VERSION,
+            b'rows': str(len(candidates)).encode(),
+            b'csv_size': str(covered_size).encode(),
+            b'csv_mtime_ns': str(mtime_ns).encode(),
+            b'csv_file_size': str(file_size).encode(),
+            b'hash': self._hash(covered_size).encode(),
+        })
+        # Un nombre por proceso y thread: otro que esté compactando el mismo csv no pisa este archivo
+        tmp_path = self.snapshot_path.with_suffix(f'.arrow.{os.getpid()}.{threading.get_ident()}.tmp')
+        with pa.OSFile(str(tmp_path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        return tmp_path
+
+    def publish(self, tmp_path: Path) -> None:
+        """Reemplaza el snapshot por el preparado en tmp_path, de forma atómica: quien tenga mapeado el anterior lo
+        sigue leyendo sin cambios"""
+        tmp_path.replace(self.snapshot_path)
+
+    def clear(self) -> None:
+        self.snapshot_path.unlink(missing_ok=True)
+
+    # --------------------- Helper methods ---------------------
+
+    def _read_metadata(self) -> Optional[dict]:
+        try:
+            metadata = pa.ipc.open_file(pa.memory_map(str(self.snapshot_path))).schema.metadata
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        return metadata if metadata and metadata.get(b'version') == FORMAT_VERSION else None
+
+    def _hash(self, size: int) -> str:
+        """Hash de los primeros size bytes del csv"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(self.data_path, 'rb') as f:
+            while size > 0:
+                data = f.read(min(HASH_READ_SIZE, size))
+                if not data:
+                    break
+                digest.update(data)
+                size -= len(data)
+        return digest.hexdigest()
@@ -0,0 +1,595 @@
+"""
+storage.py
+
+Backends de almacenamiento de los candidatos.
+
+Define la interfaz CandidateStorage, con la que habla CandidateService (a través de CandidateStore), y dos
+implementaciones: CSVStorage (el archivo `candidates.csv` de siempre) y SQLiteStorage (base SQLite embebida, con
+índices por college, degree y score, y altas transaccionales seguras ante escrituras concurrentes).
+
+Los backends también persisten los scores precalculados por fingerprint de configuración de scoring, indicando si
+siguen en sincronía con los datos.
+
+Las escrituras se serializan entre procesos (por ej, varios workers de uvicorn) con un file lock (`write_lock`).
+
+CSVStorage puede además cargar el archivo en paralelo (`load_workers`): lo divide en shards de bytes cortados en
+fines de registro (con el índice de offsets), y cada proceso del pool parsea su shard, separa las skills y arma su
+representación compacta. Los shards se unen en orden de ID, con el mismo resultado que la carga serial.
+Y mantener un snapshot binario del csv (`use_snapshot`, ver src.snapshot): la carga lee por memory map las filas que
+cubre el snapshot y solo parsea las agregadas después (la cola), que se integran al snapshot cada tanto.
+"""
+import io
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: no hay flock, las escrituras solo se serializan dentro del proceso
+    fcntl = None
+
+from src.columnar import CompactCandidates
+from src.concurrency import get_load_pool, shutdown_load_pool
+from src.csv_index import CSVOffsetIndex
+from src.metrics import stage
+from src.snapshot import ColumnarSnapshot
+
+SCORES_DTYPE = np.dtype('<f8')
+
+
+class CandidateStorage(ABC):
+    """Interfaz de almacenamiento. Los candidatos se identifican por su posición (ID = orden de alta)"""
+
+    def __init__(self, header: List[str], lock_path):
+        self.data_header = header
+        self.lock_path = Path(lock_path)
+
+    @property
+    @abstractmethod
+    def key(self) -> Hashable:
+        """Identifica el almacenamiento subyacente (dos instancias con la misma key comparten los datos)"""
+
+    @abstractmethod
+    def signature(self) -> Optional[Hashable]:
+        """Valor que cambia cada vez que cambian los datos; None si todavía no hay datos"""
+
+    @abstractmethod
+    def load(self) -> pd.DataFrame:
+        """Devuelve todos los candidatos ordenados por ID, con las skills como lista"""
+
+    def load_compact(self) -> CompactCandidates:
+        """Devuelve todos los candidatos (lo mismo que load) en su representación compacta"""
+        df = self.load()
+        with stage('compact', rows=len(df)):
+            return CompactCandidates.from_frame(df, self.data_header)
+
+    def snapshot_due(self, rows: int) -> bool:
+        """Si conviene llamar a compact_snapshot con rows candidatos. Por defecto no (no hay snapshot)"""
+        return False
+
+    def compact_snapshot(self, candidates: CompactCandidates, signature: Hashable) -> bool:
+        """Guarda una copia de los candidatos (todos los de la versión signature de los datos) en un formato más
+        rápido de cargar. Devuelve si se guardó. Puede tardar (escribe todos los candidatos): no debe llamarse con
+        locks tomados, y toma write_lock solo para reemplazar la copia anterior. Por defecto no hace nada"""
+        return False
+
+    @abstractmethod
+    def iter_chunks(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Recorre los candidatos (los existentes al empezar) en bloques de a lo sumo chunksize filas, ordenados
+        por ID, con las skills como lista y el ID como índice. Nunca carga todos los datos en memoria"""
+
+    @abstractmethod
+    def append(self, df_new_candidates: pd.DataFrame, new_scores: Dict[str, np.ndarray]) -> range:
+        """Agrega candidatos (skills separadas por coma, como en get_candidate_df) junto con sus scores por
+        fingerprint, y devuelve los IDs asignados. Los scores solo se persisten si los ya guardados estaban en
+        sincronía con los datos. Debe llamarse dentro de write_lock"""
+
+    @abstractmethod
+    def as_loaded(self, df_new_candidates: pd.DataFrame) -> pd.DataFrame:
+        """Devuelve los candidatos tal como quedarían al volver a leerlos con load (para actualizar caches)"""
+
+    @abstractmethod
+    def get_row(self, candidate_id: int) -> Optional[pd.Series]:
+        """Devuelve un único candidato (skills como lista) sin cargar el resto, o None si no existe"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Cantidad de candidatos guardados"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Elimina todos los candidatos (y sus scores)"""
+
+    @abstractmethod
+    def load_scores(self, fingerprint: str) -> Optional[np.ndarray]:
+        """Scores persistidos para la configuración fingerprint, solo si están en sincronía con los datos"""
+
+    @abstractmethod
+    def save_scores(self, fingerprint: str, scores: np.ndarray) -> None:
+        """Persiste los scores de todos los candidatos para la configuración fingerprint"""
+
+    def exists(self) -> bool:
+        return self.signature() is not None
+
+    @contextmanager
+    def write_lock(self):
+        """Lock exclusivo entre procesos para escribir (y leer la signature resultante sin carreras)"""
+        if fcntl is None:
+            yield
+            return
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _split_skills(df: pd.DataFrame) -> pd.DataFrame:
+        # Convierto skills separadas por coma a lista nuevamente, siempre que no sea NaN ni sea string vacio
+        with stage('split_skills', rows=len(df)):
+            df['skills'] = df['skills'].apply(lambda skills: skills.split(',') if pd.notna(skills) and skills else [])
+        return df
+
+
+class CSVStorage(CandidateStorage):
+    """Candidatos en un csv; los scores en un archivo binario al lado por fingerprint (`candidates.<fingerprint>.scores`),
+    cuyo header de largo fijo indica el fingerprint y la signature (tamaño y mtime) del csv que cubre: cualquier
+    edición del csv, aunque no cambie su tamaño, los invalida. Un índice de offsets (`candidates.idx`) permite leer un
+    candidato por ID sin parsear todo el archivo"""
+
+    SCORES_HEADER_SIZE = 64
+    # Con menos filas por shard, levantar y coordinar los procesos cuesta más de lo que se gana
+    MIN_SHARD_ROWS = 50_000
+    # El snapshot se reescribe cuando la cola del csv llega a SNAPSHOT_MIN_TAIL_ROWS filas y a SNAPSHOT_TAIL_FRACTION
+    # de las que ya cubre (así el costo de reescribirlo se amortiza entre muchas altas)
+    SNAPSHOT_MIN_TAIL_ROWS = 10_000
+    SNAPSHOT_TAIL_FRACTION = 0.1
+
+    def __init__(self, data_path, header: List[str], load_workers: int = 1, use_snapshot: bool = False):
+        super().__init__(header, Path(data_path).with_suffix('.lock'))
+        self.data_path = Path(data_path)
+        self.load_workers = load_workers
+        self.use_snapshot = use_snapshot
+        self.snapshot = ColumnarSnapshot(self.data_path)
+        # Archivo de scores de una versión anterior, con un único fingerprint: solo se borra en clear
+        self.scores_path = self.data_path.with_suffix('.scores')
+        self.offset_index = CSVOffsetIndex(self.data_path)
+
+    @property
+    def key(self) -> Hashable:
+        return 'csv', self.data_path.resolve()
+
+    def signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.data_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> pd.DataFrame:
+        return self._parse_csv(self.data_path)
+
+    def load_compact(self) -> CompactCandidates:
+        loaded = self._load_from_snapshot() if self.use_snapshot else None
+        return loaded if loaded is not None else self._load_csv_compact()
+
+    def snapshot_due(self, rows: int) -> bool:
+        if not self.use_snapshot:
+            return False
+        snapshot_rows = self.snapshot.rows()
+        return rows - snapshot_rows >= max(self.SNAPSHOT_MIN_TAIL_ROWS, snapshot_rows * self.SNAPSHOT_TAIL_FRACTION)
+
+    def compact_snapshot(self, candidates: CompactCandidates, signature: Hashable) -> bool:
+        if not self.use_snapshot or signature is None:
+            return False
+        # Solo se guardan filas completas: si la última no termina en salto de línea, se espera a la próxima vez
+        covered_size = self.offset_index.prefix_end(len(candidates))
+        if covered_size is None:
+            return False
+        with stage('snapshot_write', rows=len(candidates)):
+            tmp_path = self.snapshot.prepare(candidates, covered_size, signature)
+        try:
+            # El lock, solo para el rename. Si alguien escribió desde signature, no se puede asegurar que los bytes
+            # hasheados sean los de los candidatos (por ej, una edición a mano): se descarta, y se reintenta más tarde
+            with self.write_lock():
+                if self.signature() != signature:
+                    return False
+                self.snapshot.publish(tmp_path)
+                return True
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def iter_chunks(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        # nrows evita leer una fila que se esté escribiendo justo al final del archivo
+        rows = self.count()
+        if not rows:
+            return
+        dtypes = _csv_dtypes(self.data_header)
+        with pd.read_csv(self.data_path, chunksize=chunksize, nrows=rows, dtype=dtypes) as reader:
+            for chunk in reader:
+                yield self._split_skills(chunk)
+
+    def append(self, df_new_candidates: pd.DataFrame, new_scores: Dict[str, np.ndarray]) -> range:
+        previous_signature = self.signature()
+        next_id = self.offset_index.row_count()
+        if previous_signature is not None:
+            self._save_candidate_data_to_existing_csv(df_new_candidates)
+        else:
+            self._create_csv_and_save_candidate_data(df_new_candidates)
+        for fingerprint, scores in new_scores.items():
+            self._append_scores(fingerprint, previous_signature, scores)
+        self.offset_index.sync()
+        return range(next_id, next_id + len(df_new_candidates))
+
+    def as_loaded(self, df_new_candidates: pd.DataFrame) -> pd.DataFrame:
+        return self._parse_csv(io.StringIO(df_new_candidates.to_csv(index=False)))
+
+    def get_row(self, candidate_id: int) -> Optional[pd.Series]:
+        row = self.offset_index.read_row(candidate_id)
+        if row is None:
+            return None
+        header, row_bytes = row
+        return self._parse_csv(io.BytesIO(header + row_bytes)).iloc[0]
+
+    def count(self) -> int:
+        return self.offset_index.row_count()
+
+    def clear(self) -> None:
+        self.data_path.unlink(missing_ok=True)
+        self.scores_path.unlink(missing_ok=True)
+        self.snapshot.clear()
+        for scores_path in self.data_path.parent.glob(f'{self.data_path.stem}.*.scores'):
+            scores_path.unlink(missing_ok=True)
+        self.offset_index.reset()
+
+    def load_scores(self, fingerprint: str) -> Optional[np.ndarray]:
+        signature = self.signature()
+        if signature is None or self._read_scores_header(fingerprint) != (fingerprint, signature):
+            return None
+        return np.fromfile(self._scores_path(fingerprint), dtype=SCORES_DTYPE, offset=self.SCORES_HEADER_SIZE)
+
+    def save_scores(self, fingerprint: str, scores: np.ndarray) -> None:
+        signature = self.signature()
+        if signature is None:
+            return
+        scores_path = self._scores_path(fingerprint)
+        tmp_path = scores_path.with_suffix('.scores.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(self._scores_header(fingerprint, signature))
+            f.write(np.asarray(scores, dtype=SCORES_DTYPE).tobytes())
+        tmp_path.replace(scores_path)
+
+    # --------------------- Helper methods ---------------------
+
+    def _load_csv_compact(self) -> CompactCandidates:
+        shards = min(self.load_workers, self.count() // self.MIN_SHARD_ROWS)
+        if shards <= 1:
+            return super().load_compact()
+        header, ranges = self.offset_index.shard_ranges(shards)
+        with stage('sharded_load') as timing:
+            try:
+                pool = get_load_pool(self.load_workers)
+                futures = [
+                    pool.submit(_load_csv_shard, str(self.data_path), header, start, end, self.data_header)
+                    for start, end in ranges
+                ]
+                parts = [future.result() for future in futures]
+            except BrokenProcessPool:
+                # Un worker murió (por ej, por falta de memoria): se descarta el pool y se carga en este proceso
+                shutdown_load_pool()
+                return super().load_compact()
+            candidates = CompactCandidates.concat(parts, self.data_header)
+            timing.rows = len(candidates)
+        return candidates
+
+    def _load_from_snapshot(self) -> Optional[CompactCandidates]:
+        """Candidatos del snapshot más los de la cola del csv. None si no hay snapshot vigente"""
+        signature = self.signature()
+        if signature is None:
+            return None
+        size = signature[1]
+        with stage('snapshot_read') as timing:
+            loaded = self.snapshot.read(self.data_header, signature)
+            if loaded is None:
+                return None
+            # Además del hash, el snapshot tiene que terminar justo en un fin de registro del csv
+            if self.offset_index.prefix_end(loaded[1]) != loaded[2]:
+                self.snapshot.clear()
+                return None
+            candidates, rows, covered_size = loaded
+            timing.rows = rows
+        if covered_size < size:
+            with open(self.data_path, 'rb') as f:
+                header = f.read(self.offset_index.prefix_end(0))
+                f.seek(covered_size)
+                tail = f.read(size - covered_size)
+            df_tail = self._parse_csv(io.BytesIO(header + tail))
+            if len(df_tail):
+                with stage('compact', rows=len(df_tail)):
+                    candidates.extend(df_tail)
+        return candidates
+
+    def _parse_csv(self, source) -> pd.DataFrame:
+        with stage('csv_parse') as timing:
+            df = pd.read_csv(source, dtype=_csv_dtypes(self.data_header))
+            timing.rows = len(df)
+        return self._split_skills(df)
+
+    def _create_csv_and_save_candidate_data(self, df_new_candidate):
+        pd.DataFrame(self.data_header).to_csv(self.data_path, mode='w', header=False, index=False)
+        df_new_candidate.to_csv(self.data_path, mode='w', header=True, index=False)
+
+    def _save_candidate_data_to_existing_csv(self, df_new_candidate):
+        # Si el archivo no termina en salto de línea (por ej, editado a mano), la nueva fila quedaría pegada a la última
+        with open(self.data_path, 'rb+') as f:
+            f.seek(0, 2)
+            if f.tell() > 0:
+                f.seek(-1, 2)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+        df_new_candidate.to_csv(self.data_path, mode='a', header=False, index=False)
+
+    def _scores_header(self, fingerprint: str, signature: Tuple[int, int]) -> bytes:
+        mtime_ns, csv_size = signature
+        return f'{fingerprint} {csv_size} {mtime_ns}'.encode().ljust(self.SCORES_HEADER_SIZE - 1) + b'\n'
+
+    def _scores_path(self, fingerprint: str) -> Path:
+        return self.data_path.with_name(f'{self.data_path.stem}.{fingerprint}.scores')
+
+    def _read_scores_header(self, fingerprint: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """(fingerprint, signature del csv que cubren los scores), o None si no hay archivo o es de un formato
+        anterior (solo con el tamaño del csv: se recalcula)"""
+        try:
+            with open(self._scores_path(fingerprint), 'rb') as f:
+                fingerprint, csv_size, mtime_ns = f.read(self.SCORES_HEADER_SIZE).split()
+            return fingerprint.decode(), (int(mtime_ns), int(csv_size))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _append_scores(self, fingerprint: str, previous_signature: Optional[Tuple[int, int]], scores: np.ndarray):
+        # Si el archivo de scores no estaba en sincronía con el csv, no se toca: se recalcula en la próxima lectura
+        if previous_signature is None or self._read_scores_header(fingerprint) != (fingerprint, previous_signature):
+            return
+        with open(self._scores_path(fingerprint), 'rb+') as f:
+            f.seek(0, 2)
+            f.write(np.asarray(scores, dtype=SCORES_DTYPE).tobytes())
+            f.seek(0)
+            f.write(self._scores_header(fingerprint, self.signature()))
+
+
+class SQLiteStorage(CandidateStorage):
+    """Candidatos en una base SQLite (tabla `candidates`, con ID = orden de alta empezando en 0). Cada alta se hace
+    en una transacción que también incrementa la versión de los datos (`meta`) y guarda los scores de los nuevos"""
+
+    def __init__(self, db_path, header: List[str]):
+        super().__init__(header, Path(db_path).with_suffix('.lock'))
+        self.db_path = Path(db_path)
+        self._initialized = False
+
+    @property
+    def key(self) -> Hashable:
+        return 'sqlite', self.db_path.resolve()
+
+    def signature(self) -> Optional[int]:
+        if not self.db_path.exists():
+            return None
+        with closing(self._connect()) as conn:
+            version = self._data_version(conn)
+        return version or None
+
+    def load(self) -> pd.DataFrame:
+        columns = ', '.join(self.data_header)
+        with stage('sqlite_read') as timing, closing(self._connect()) as conn:
+            df = pd.read_sql_query(f'SELECT {columns} FROM candidates ORDER BY id', conn)
+            timing.rows = len(df)
+        return self._split_skills(df)
+
+    def iter_chunks(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        if not self.db_path.exists():
+            return
+        columns = ', '.join(self.data_header)
+        # El generador puede avanzarse desde distintos threads (de a uno por vez), por ej desde el executor de la API
+        with closing(self._connect(check_same_thread=False)) as conn:
+            rows = self._count(conn)
+            query = f'SELECT id, {columns} FROM candidates WHERE id < ? ORDER BY id'
+            for chunk in pd.read_sql_query(query, conn, params=(rows,), index_col='id', chunksize=chunksize):
+                chunk.index.name = None
+                yield self._split_skills(chunk)
+
+    def append(self, df_new_candidates: pd.DataFrame, new_scores: Dict[str, np.ndarray]) -> range:
+        with self._transaction() as conn:
+            new_ids = self._insert_candidates(conn, df_new_candidates)
+            version = self._data_version(conn)
+            for fingerprint, scores in new_scores.items():
+                if self._scores_version(conn, fingerprint) == version:
+                    self._insert_scores(conn, fingerprint, new_ids, scores, version + 1)
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'data_version'", (version + 1,))
+        return new_ids
+
+    def import_candidates(self, df_candidates: pd.DataFrame, replace: bool = False) -> range:
+        """Carga los candidatos (skills separadas por coma) en una única transacción: si algo falla (una fila
+        inválida, disco lleno), la base queda exactamente como estaba. Con replace, reemplaza a los que hubiera
+        (y descarta sus scores); si no, lanza RuntimeError si la base ya tiene candidatos"""
+        with self._transaction() as conn:
+            if self._count(conn) and not replace:
+                raise RuntimeError(f'{self.db_path} already has candidates (use replace=True to overwrite)')
+            self._delete_candidates(conn)
+            new_ids = self._insert_candidates(conn, df_candidates)
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+        return new_ids
+
+    def as_loaded(self, df_new_candidates: pd.DataFrame) -> pd.DataFrame:
+        return self._split_skills(df_new_candidates[self.data_header].reset_index(drop=True))
+
+    def clear(self) -> None:
+        if not self.db_path.exists():
+            return
+        with self._transaction() as conn:
+            self._delete_candidates(conn)
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+
+    def load_scores(self, fingerprint: str) -> Optional[np.ndarray]:
+        if not self.db_path.exists():
+            return None
+        with closing(self._connect()) as conn:
+            if self._scores_version(conn, fingerprint) != self._data_version(conn):
+                return None
+            rows = conn.execute(
+                'SELECT score FROM candidate_scores WHERE fingerprint = ? ORDER BY candidate_id', (fingerprint,)
+            ).fetchall()
+        return np.array([score for (score,) in rows], dtype=SCORES_DTYPE)
+
+    def save_scores(self, fingerprint: str, scores: np.ndarray) -> None:
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM candidate_scores WHERE fingerprint = ?', (fingerprint,))
+            self._insert_scores(conn, fingerprint, range(len(scores)), scores, self._data_version(conn))
+
+    # --------------------- Helper methods ---------------------
+
+    def get_row(self, candidate_id: int) -> Optional[pd.Series]:
+        if not self.db_path.exists():
+            return None
+        columns = ', '.join(self.data_header)
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(f'SELECT {columns} FROM candidates WHERE id = ?', conn, params=(candidate_id,))
+        return self._split_skills(df).iloc[0] if len(df) else None
+
+    def count(self) -> int:
+        if not self.db_path.exists():
+            return 0
+        with closing(self._connect()) as conn:
+            return self._count(conn)
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        # Autocommit: las transacciones se manejan explícitamente con _transaction
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=check_same_thread)
+        if not self._initialized:
+            self._create_schema(conn)
+            self._initialized = True
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        with closing(self._connect()) as conn:
+            # BEGIN IMMEDIATE toma el lock de escritura: los IDs se asignan sin carreras entre procesos
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        columns = ', '.join(
+            f'{column} REAL' if column == 'academic_average' else f'{column} TEXT' for column in self.data_header
+        )
+        conn.executescript(f'''
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS candidates (id INTEGER PRIMARY KEY, {columns});
+            CREATE TABLE IF NOT EXISTS candidate_scores (
+                fingerprint TEXT NOT NULL,
+                candidate_id INTEGER NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (fingerprint, candidate_id)
+            );
+            -- Los filtros y el ranking se resuelven en memoria (CandidateStore), así que no hay índices secundarios:
+            -- solo harían más lentas las altas. Se borran los que creaban las versiones anteriores
+            DROP INDEX IF EXISTS idx_candidates_college;
+            DROP INDEX IF EXISTS idx_candidates_degree;
+            DROP INDEX IF EXISTS idx_candidate_scores_score;
+            CREATE TABLE IF NOT EXISTS scores_meta (fingerprint TEXT PRIMARY KEY, data_version INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0);
+        ''')
+
+    def _insert_candidates(self, conn: sqlite3.Connection, df_candidates: pd.DataFrame) -> range:
+        """Inserta los candidatos a continuación de los existentes y devuelve sus IDs"""
+        rows = df_candidates[self.data_header].itertuples(index=False, name=None)
+        placeholders = ', '.join('?' * (len(self.data_header) + 1))
+        next_id = self._count(conn)
+        new_ids = range(next_id, next_id + len(df_candidates))
+        conn.executemany(
+            f'INSERT INTO candidates (id, {", ".join(self.data_header)}) VALUES ({placeholders})',
+            ((candidate_id, *row) for candidate_id, row in zip(new_ids, rows))
+        )
+        return new_ids
+
+    @staticmethod
+    def _delete_candidates(conn: sqlite3.Connection):
+        conn.execute('DELETE FROM candidates')
+        conn.execute('DELETE FROM candidate_scores')
+        conn.execute('DELETE FROM scores_meta')
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection) -> int:
+        return conn.execute('SELECT COUNT(*) FROM candidates').fetchone()[0]
+
+    @staticmethod
+    def _data_version(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()[0]
+
+    @staticmethod
+    def _scores_version(conn: sqlite3.Connection, fingerprint: str) -> Optional[int]:
+        row = conn.execute('SELECT data_version FROM scores_meta WHERE fingerprint = ?', (fingerprint,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _insert_scores(conn: sqlite3.Connection, fingerprint: str, ids, scores: np.ndarray, version: int):
+        conn.executemany(
+            'INSERT OR REPLACE INTO candidate_scores (fingerprint, candidate_id, score) VALUES (?, ?, ?)',
+            ((fingerprint, candidate_id, float(score)) for candidate_id, score in zip(ids, scores))
+        )
+        conn.execute(
+            'INSERT OR REPLACE INTO scores_meta (fingerprint, data_version) VALUES (?, ?)', (fingerprint, version)
+        )
+
+
+def create_storage(
+    backend: str, data_path, db_path, header: List[str], load_workers: int = 1, use_snapshot: bool = False
+) -> CandidateStorage:
+    """Crea el backend de almacenamiento configurado ('csv' o 'sqlite'). load_workers y use_snapshot solo aplican
+    al csv"""
+    if backend == 'csv':
+        return CSVStorage(data_path, header, load_workers, use_snapshot)
+    if backend == 'sqlite':
+        return SQLiteStorage(db_path, header)
+    raise ValueError(f'Unknown storage backend: {backend}')
+
+
+def migrate_csv_to_sqlite(csv_storage: CSVStorage, sqlite_storage: SQLiteStorage, replace: bool = False) -> int:
+    """Importa los candidatos del csv a la base SQLite. El borrado de los existentes (con replace) y la carga de
+    los nuevos van en una sola transacción: si falla, la base queda como estaba. Devuelve cuántos se importaron.
+    Lanza RuntimeError si la base ya tiene candidatos y replace es False"""
+    # Se leen las skills tal cual están en el csv (separadas por coma), que es el formato que espera la base
+    if csv_storage.exists():
+        df = pd.read_csv(csv_storage.data_path, dtype=_csv_dtypes(csv_storage.data_header))
+    else:
+        df = pd.DataFrame(columns=csv_storage.data_header)
+    with sqlite_storage.write_lock():
+        return len(sqlite_storage.import_candidates(df, replace))
+
+
+def _load_csv_shard(data_path: str, header: bytes, start: int, end: int, columns: List[str]) -> CompactCandidates:
+    """Carga de un shard del csv, en un proceso del pool: las filas entre los bytes start y end, con el header
+    del archivo. Hace lo mismo que la carga serial (parseo, skills a lista y representación compacta)"""
+    with open(data_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = CandidateStorage._split_skills(pd.read_csv(io.BytesIO(header + data), dtype=_csv_dtypes(columns)))
+    return CompactCandidates.from_frame(df, columns)
+
+
+def _csv_dtypes(columns: List[str]) -> Dict[str, type]:
+    """Tipos de las columnas al parsear el csv. Se fijan en lugar de inferirlos: si no, una fila suelta (get_row,
+    as_loaded), la cola del snapshot o un shard se parsearían distinto que el archivo completo (por ej, un
+    work_experience "2020" quedaría como número)"""
+    return {column: float if column == 'academic_average' else str for column in columns}
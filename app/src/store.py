@@ -0,0 +1,231 @@
+"""
+store.py
+
+Cache en memoria (a nivel proceso) de la información de los candidatos.
+
+Provee la clase CandidateStore, que mantiene los candidatos ya parseados desde el backend de almacenamiento, en su
+representación compacta por columnas (CompactCandidates), para no tener que releer los datos en cada request.
+Solo se materializan como dataframe las filas que se devuelven. La cache se invalida si los datos
+cambian por fuera del proceso (según la signature del backend, por ej mtime y tamaño del csv) y se actualiza de forma
+incremental cuando el propio proceso agrega candidatos. Después de cada carga o alta, si el backend lo pide
+(snapshot_due), se actualiza su snapshot con los candidatos ya cargados (compact_snapshot), en un thread aparte y
+sin ningún lock del store tomado: los candidatos nunca se modifican, así que se pueden escribir mientras se siguen
+atendiendo lecturas y altas.
+
+El store también mantiene los scores precalculados: en memoria por fingerprint de la configuración de scoring, y
+persistidos por el backend. Así las lecturas no hacen trabajo de scoring, y solo se recalculan todos los scores
+(en una pasada) si cambia la configuración o los datos se editaron por fuera. Una función de scoring puede devolver
+los scores de varias configuraciones (perfiles) a la vez: se guardan todos, y en cada alta se la llama una sola vez.
+"""
+import threading
+from typing import Callable, Dict, Hashable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.columnar import CompactCandidates
+from src.concurrency import ChangeFeed
+from src.metrics import CACHED_ROWS, cache_lookup, stage
+from src.storage import CandidateStorage, SCORES_DTYPE
+
+# Recibe un dataframe (los nuevos) o CompactCandidates (todos, al recalcular) y devuelve los scores por fingerprint
+Scorer = Callable[[Union[pd.DataFrame, CompactCandidates]], Dict[str, Union[pd.Series, np.ndarray]]]
+
+
+class CandidateStore:
+    def __init__(self, storage: CandidateStorage):
+        self.storage = storage
+        self._lock = threading.RLock()
+        self._candidates: Optional[CompactCandidates] = None
+        self._signature: Optional[Hashable] = None
+        self._scores: Dict[str, np.ndarray] = {}
+        # Funciones de scoring conocidas por fingerprint, para calcular los scores de los nuevos candidatos
+        self._scorers: Dict[str, Scorer] = {}
+        self._rankings: Dict[str, np.ndarray] = {}
+        # Avisa de cada alta (o clear) hecha por este proceso, a los clientes del change feed
+        self.changes = ChangeFeed()
+        # Compactación del snapshot en curso (a lo sumo una por store)
+        self._compaction: Optional[threading.Thread] = None
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Lock del store, para tomar varias estructuras (candidatos, scores, ranking) de una misma versión de los
+        datos. Alcanza con tomar las referencias bajo el lock: el store nunca modifica una estructura ya devuelta
+        (cada alta arma nuevas), así que el filtrado y la materialización se hacen afuera"""
+        return self._lock
+
+    def get_candidates(self) -> CompactCandidates:
+        """Devuelve los candidatos cacheados (representación compacta), releyéndolos del backend solo si cambiaron.
+        Si todavía no hay datos, son una instancia vacía (que también queda cacheada, con sus scores y rankings
+        vacíos). Son compartidos: no deben modificarse"""
+        with self._lock:
+            signature = self.storage.signature()
+            hit = self._candidates is not None and signature == self._signature
+            cache_lookup('candidates', hit)
+            if not hit:
+                self._clear()
+                if signature is None:
+                    self._candidates = CompactCandidates(self.storage.data_header)
+                else:
+                    self._candidates = self.storage.load_compact()
+                    self._start_compaction(self._candidates, signature)
+                self._signature = signature
+                CACHED_ROWS.set(len(self._candidates))
+            return self._candidates
+
+    def get_frame(self) -> pd.DataFrame:
+        """Devuelve un dataframe (nuevo) con todos los candidatos, con el formato de `CandidateStorage.load`.
+        Materializa todas las filas: para devolver solo algunas, usar get_rows"""
+        return self.get_candidates().to_frame()
+
+    def get_rows(self, ids) -> pd.DataFrame:
+        """Devuelve un dataframe (nuevo) con los candidatos ids, con los IDs como índice"""
+        return self.get_candidates().to_frame(ids)
+
+    def get_scores(self, fingerprint: str, compute: Scorer) -> np.ndarray:
+        """Devuelve los scores de todos los candidatos para la configuración de scoring `fingerprint`.
+        Se usan los de memoria o los persistidos si siguen vigentes; si no, se calculan con `compute` y se persisten.
+        Si compute devuelve además los de otras configuraciones que no estaban en memoria, también se guardan"""
+        with self._lock:
+            self._scorers[fingerprint] = compute
+            candidates = self.get_candidates()
+            scores = self._scores.get(fingerprint)
+            cache_lookup('scores', scores is not None)
+            if scores is None:
+                # Los persistidos solo sirven si corresponden a los mismos datos que los candidatos cacheados
+                in_sync = self._signature is not None and self.storage.signature() == self._signature
+                scores = self.storage.load_scores(fingerprint) if in_sync else None
+                cache_lookup('persisted_scores', scores is not None and len(scores) == len(candidates))
+                if scores is None or len(scores) != len(candidates):
+                    for computed_fingerprint, computed in compute(candidates).items():
+                        if computed_fingerprint != fingerprint and computed_fingerprint in self._scores:
+                            continue
+                        computed = np.asarray(computed, dtype=SCORES_DTYPE)
+                        self._scorers[computed_fingerprint] = compute
+                        self._scores[computed_fingerprint] = computed
+                        if in_sync:
+                            self.storage.save_scores(computed_fingerprint, computed)
+                    scores = self._scores[fingerprint]
+                self._scores[fingerprint] = scores
+            return scores
+
+    def get_ranking(self, fingerprint: str, compute: Scorer) -> np.ndarray:
+        """Devuelve las posiciones (IDs) de los candidatos ordenadas por score descendente. Se calcula una vez por
+        versión de los datos, así mientras no haya altas el top-k es un slice O(k)"""
+        with self._lock:
+            scores = self.get_scores(fingerprint, compute)
+            ranking = self._rankings.get(fingerprint)
+            if ranking is None:
+                with stage('rank', rows=len(scores)):
+                    # El mismo sort que `df.sort_values(by=['score'], ascending=False)`: quicksort, que no es estable,
+                    # así los empatados quedan en el mismo orden que en el reporte de siempre. Por eso tampoco se puede
+                    # insertar un alta en el ranking existente (el orden de los empates depende de todos los scores)
+                    ranking = pd.Series(scores).sort_values(ascending=False).index.to_numpy()
+                self._rankings[fingerprint] = ranking
+            return ranking
+
+    def get_top_k(self, fingerprint: str, compute: Scorer, k: int) -> Tuple[pd.DataFrame, np.ndarray]:
+        """Devuelve las filas (dataframe nuevo) y los scores de los k mejores candidatos según el ranking"""
+        with self._lock:
+            top_ids = self.get_ranking(fingerprint, compute)[:k]
+            # Los candidatos para los que se calcularon esos scores (sin volver a consultar al backend, que pudo
+            # haber cambiado en el medio)
+            candidates, scores = self._candidates, self._scores[fingerprint]
+        # La materialización, fuera del lock (candidates y scores no cambian)
+        return candidates.to_frame(top_ids), scores[top_ids]
+
+    def append(self, df_new_candidates: pd.DataFrame, scorers: Optional[Dict[str, Scorer]] = None) -> range:
+        """Guarda nuevos candidatos en el backend y devuelve sus IDs. Sus scores se calculan una única vez, acá,
+        para cada configuración de scoring conocida (las de `scorers` y las ya usadas en el proceso).
+        Si la cache estaba al día antes de escribir, se extiende con las nuevas filas en lugar de releer
+        todos los datos; si no (por ej, otro proceso escribió en el medio), simplemente se invalida"""
+        with self._lock, self.storage.write_lock():
+            self._scorers.update(scorers or {})
+            df_parsed = self.storage.as_loaded(df_new_candidates)
+            new_scores = self._score_new(df_parsed)
+            was_fresh = self._candidates is not None and self.storage.signature() == self._signature
+            try:
+                new_ids = self.storage.append(df_new_candidates, new_scores)
+            except BaseException:
+                self._clear()
+                raise
+            # Quien espera vuelve a leer bajo el lock del store, así que ve la cache ya actualizada
+            self.changes.notify()
+            if not was_fresh or new_ids.start != len(self._candidates):
+                self._clear()
+                return new_ids
+            try:
+                # Copy-on-write: quien ya tenga los candidatos anteriores los sigue leyendo sin cambios
+                self._candidates = self._candidates.extended(df_parsed)
+            except Exception:
+                # Los datos ya quedaron guardados: basta con descartar la cache, que se relee en el próximo acceso
+                self._clear()
+                return new_ids
+            self._signature = self.storage.signature()
+            CACHED_ROWS.set(len(self._candidates))
+            self._start_compaction(self._candidates, self._signature)
+            for fingerprint, cached in self._scores.items():
+                self._scores[fingerprint] = np.concatenate([cached, new_scores[fingerprint]])
+            # Los rankings se vuelven a calcular en el próximo top-k (ver get_ranking)
+            self._rankings = {}
+            return new_ids
+
+    def clear(self) -> None:
+        """Elimina todos los candidatos del backend y descarta la cache"""
+        with self._lock, self.storage.write_lock():
+            self.storage.clear()
+            self._clear()
+            self.changes.notify()
+
+    # --------------------- Helper methods ---------------------
+
+    def _clear(self):
+        CACHED_ROWS.set(0)
+        self._candidates = None
+        self._signature = None
+        self._scores = {}
+        self._rankings = {}
+
+    def _start_compaction(self, candidates: CompactCandidates, signature: Hashable):
+        """Si corresponde, guarda el snapshot de candidates (la versión signature de los datos) en otro thread"""
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        try:
+            due = self.storage.snapshot_due(len(candidates))
+        except Exception:
+            due = False
+        if due:
+            self._compaction = threading.Thread(
+                target=self._compact, args=(candidates, signature), name='snapshot-compaction', daemon=True
+            )
+            self._compaction.start()
+
+    def _compact(self, candidates: CompactCandidates, signature: Hashable):
+        try:
+            self.storage.compact_snapshot(candidates, signature)
+        except Exception:
+            # El snapshot es solo para cargar más rápido: si falla, la próxima carga lee el csv
+            pass
+
+    def _score_new(self, df_parsed: pd.DataFrame) -> Dict[str, np.ndarray]:
+        # Cada función de scoring se llama una sola vez, aunque calcule varias configuraciones
+        new_scores = {}
+        for fingerprint, compute in self._scorers.items():
+            if fingerprint not in new_scores:
+                for computed_fingerprint, computed in compute(df_parsed).items():
+                    new_scores.setdefault(computed_fingerprint, np.asarray(computed, dtype=SCORES_DTYPE))
+        return new_scores
+
+
+# Un único store por almacenamiento, compartido por todas las instancias de CandidateService del proceso
+_stores: Dict[Hashable, CandidateStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_candidate_store(storage: CandidateStorage) -> CandidateStore:
+    """Devuelve el store del proceso asociado al almacenamiento (lo crea si no existe)"""
+    with _stores_lock:
+        store = _stores.get(storage.key)
+        if store is None:
+            store = _stores[storage.key] = CandidateStore(storage)
+        return store
@@ -2,13 +2,90 @@
 api_client.py
 
 Archivo con funciones helpers para app.py. Comunican con el servidor vía la API desarrollada en api.py
+
+Todas las llamadas usan una única sesión HTTP, compartida entre reruns y usuarios (conexiones keep-alive reutilizadas).
+Las lecturas se cachean READ_CACHE_TTL segundos; vencido ese tiempo se revalidan con If-None-Match, así si los datos
+no cambiaron el servidor responde 304, sin cuerpo y sin consultar nada. Crear un candidato invalida el cache.
 """
+import copy
+import threading
+import time
+from collections import OrderedDict
+
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 
 # Puerto default de FastAPI (si no, debería traerlo de un .env)
 API_URL = "http://localhost:8000"
 
+# A partir de este k el reporte se pide con el layout compacto (una fila por candidato)
+COMPACT_REPORT_MIN_K = 100
+# Cada cuánto se consulta el estado del job de reporte, y cuánto se espera como máximo (en segundos)
+REPORT_POLL_INTERVAL = 0.5
+REPORT_TIMEOUT = 600
+
+# Conexiones keep-alive del pool, timeout de cada request y vigencia/tamaño del cache de lecturas
+HTTP_POOL_SIZE = 10
+REQUEST_TIMEOUT = 30
+READ_CACHE_TTL = 5
+READ_CACHE_MAX_ENTRIES = 256
+
+
+class ResponseCache:
+    """Cache de respuestas JSON de GET por path y parámetros, con TTL y revalidación por ETag"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # (path, parámetros) -> (momento en que se obtuvo o revalidó, ETag, datos)
+        self._entries = OrderedDict()
+
+    def get_json(self, session: requests.Session, path: str, params=None):
+        """Devuelve los datos de GET path (una copia: se pueden modificar). Lanza RequestException si falla"""
+        key = (path, tuple(sorted((name, repr(value)) for name, value in (params or {}).items())))
+        with self._lock:
+            entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and now - entry[0] < self.ttl:
+            return copy.deepcopy(entry[2])
+
+        headers = {"If-None-Match": entry[1]} if entry is not None and entry[1] else {}
+        response = session.get(f"{API_URL}{path}", params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304 and entry is not None:
+            etag, data = entry[1], entry[2]
+        else:
+            response.raise_for_status()
+            etag, data = response.headers.get("ETag"), response.json()
+        with self._lock:
+            self._entries[key] = (now, etag, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return copy.deepcopy(data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Sesión HTTP de la app (una por proceso de Streamlit), con un pool de conexiones keep-alive"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    """Cache de lecturas de la app (uno por proceso de Streamlit)"""
+    return ResponseCache(READ_CACHE_TTL, READ_CACHE_MAX_ENTRIES)
+
+
 # Helpers (para API requests)
 def get_candidates(filters=None):
     """Fetch candidates from API"""
@@ -17,9 +94,7 @@ def get_candidates(filters=None):
 
     final_filters = {k: v for k, v in filters.items() if v is not None}
     try:
-        response = requests.get(f"{API_URL}/candidates/", params=final_filters)
-        response.raise_for_status()
-        return response.json()  # ✅ Return full JSON (dict), not just .get("candidates")
+        return get_response_cache().get_json(get_session(), "/candidates/", final_filters)  # ✅ Return full JSON (dict)
     except requests.exceptions.RequestException as e:
         st.error(f"Error when getting candidates: {str(e)}")
         return {"candidates": [], "total_pages": 1}
@@ -27,9 +102,7 @@ def get_candidates(filters=None):
 def get_candidate_by_id(candidate_id: int):
     """Obtiene candidato por ID desde API"""
     try:
-        response = requests.get(f"{API_URL}/candidates/{candidate_id}")
-        response.raise_for_status()
-        return response.json().get("candidate")
+        return get_response_cache().get_json(get_session(), f"/candidates/{candidate_id}").get("candidate")
     except requests.exceptions.RequestException as e:
         st.error(f"Error al obtener candidato por ID: {str(e)}")
         return None
@@ -37,29 +110,63 @@ def get_candidate_by_id(candidate_id: int):
 def get_top_k_candidates(k: int):
     """Obtiene top-k candidatos desde API"""
     try:
-        response = requests.get(f"{API_URL}/candidates/", params={"with_score": True})
-        response.raise_for_status()
-        all_candidates = response.json().get("candidates", [])
-        sorted_candidates = sorted(all_candidates, key=lambda c: c.get("score", 0), reverse=True)
-        return sorted_candidates[:k]
+        response = get_response_cache().get_json(get_session(), "/candidates/top", {"k": k, "with_score": True})
+        return response.get("candidates", [])
     except requests.exceptions.RequestException as e:
         st.error(f"Error when getting top-{k} candidatos: {str(e)}")
         return []
 
+def get_candidates_count() -> int:
+    """Cantidad de candidatos (endpoint liviano: no carga ni pagina candidatos)"""
+    try:
+        return get_response_cache().get_json(get_session(), "/candidates/count").get("count", 0)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error when counting candidates: {str(e)}")
+        return 0
+
 def create_candidate(candidate_data: dict):
     """Crea nuevo candidato enviando datos a API"""
     try:
-        response = requests.post(f"{API_URL}/candidates/", json=candidate_data)
+        response = get_session().post(f"{API_URL}/candidates/", json=candidate_data, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
+        # Las lecturas cacheadas ya no reflejan los datos
+        get_response_cache().clear()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error when creating candidate: {str(e)}")
         return None
 
 def generate_and_download_pdf_report(top_k: int):
-    """Crea y descarga informe de los top-k candidatos"""
+    """Crea y descarga informe de los top-k candidatos. El informe se genera como job asíncrono en el servidor
+    (así un reporte grande no deja el request colgado) y se muestra su progreso mientras tanto"""
+    layout = "compact" if top_k >= COMPACT_REPORT_MIN_K else "detailed"
+    session = get_session()
     try:
-        response = requests.get(f"{API_URL}/reports/", params={"k": top_k})
+        response = session.post(
+            f"{API_URL}/reports/jobs", params={"k": top_k, "layout": layout}, timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        job = response.json()
+
+        progress_bar = st.progress(0.0, text="Generating PDF report...")
+        deadline = time.monotonic() + REPORT_TIMEOUT
+        while job["status"] in ("queued", "running"):
+            if time.monotonic() > deadline:
+                session.delete(f"{API_URL}/reports/jobs/{job['job_id']}", timeout=REQUEST_TIMEOUT)
+                progress_bar.empty()
+                st.error("Error generating PDF report: timed out")
+                return
+            time.sleep(REPORT_POLL_INTERVAL)
+            response = session.get(f"{API_URL}/reports/jobs/{job['job_id']}", timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            job = response.json()
+            progress_bar.progress(job["progress"], text="Generating PDF report...")
+        progress_bar.empty()
+
+        if job["status"] != "done":
+            st.error(f"Error generating PDF report: {job['error'] or job['status']}")
+            return
+        response = session.get(f"{API_URL}/reports/jobs/{job['job_id']}/download", timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         pdf_bytes = response.content
 
@@ -70,4 +177,4 @@ def generate_and_download_pdf_report(top_k: int):
             mime="application/pdf"
         )
     except requests.exceptions.RequestException as e:
-        st.error(f"Error generating PDF report: {str(e)}")
\ No newline at end of file
+        st.error(f"Error generating PDF report: {str(e)}")
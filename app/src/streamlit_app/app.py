@@ -68,8 +68,11 @@ def main():
         st.markdown("---")
 
         st.subheader("🔎 Search Candidate by ID")
-        candidates = get_candidates()
-        candidate_id = st.number_input("Candidate ID", min_value=0, max_value=len(candidates)-1, step=1)
+        # Solo hace falta la cantidad de candidatos (endpoint liviano y cacheado), no una página de candidatos
+        candidates_count = get_candidates_count()
+        candidate_id = st.number_input(
+            "Candidate ID", min_value=0, max_value=max(candidates_count - 1, 0), step=1, disabled=candidates_count == 0
+        )
         if st.button("🔍 Search by ID"):
             candidate = get_candidate_by_id(candidate_id)
             if candidate:
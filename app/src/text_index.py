@@ -0,0 +1,167 @@
+"""
+text_index.py
+
+Índice invertido de trigramas para el filtro por nombre (substring, case-insensitive).
+
+Provee la clase TrigramIndex: cada trigrama del texto en minúsculas (en bytes UTF-8) apunta a la lista ordenada de
+filas que lo contienen. Una query de al menos 3 bytes solo revisa las filas que contienen todos sus trigramas, y
+luego verifica el substring sobre esas filas, así que el resultado es exactamente el del scan
+(`query.lower() in value.lower()`, los faltantes nunca). Como en UTF-8 ningún carácter empieza en medio de otro,
+buscar los bytes de la query equivale a buscar sus caracteres.
+
+Los datos solo crecen (las filas existentes nunca cambian), así que el índice se mantiene de forma incremental: son
+segmentos inmutables, cada uno con un rango de filas consecutivas, que se construyen con operaciones de numpy sobre
+el buffer de Arrow (sin recorrer los strings en Python). Las filas nuevas se indexan en la búsqueda que las encuentra
+sin indexar (hasta MIN_SEGMENT_ROWS se revisan con un scan) y los segmentos se van uniendo de a pares de tamaño
+parecido, como en un LSM, así que siempre son pocos. Nada de esto pasa bajo el lock del store: lo hace el thread de
+la búsqueda, y mientras tanto las demás usan los segmentos anteriores.
+"""
+import threading
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+NGRAM_SIZE = 3
+# Filas sin indexar que se revisan con un scan antes de armar un nuevo segmento
+MIN_SEGMENT_ROWS = 4096
+ValuesArray = Union[pa.Array, pa.ChunkedArray]
+
+
+class _Segment:
+    """Postings de las filas [start, stop): las filas con el trigrama keys[i] son rows[indptr[i]:indptr[i + 1]]"""
+
+    def __init__(self, start: int, stop: int, pairs: np.ndarray):
+        # pairs: (trigrama << 32 | fila), ordenados y sin repetidos
+        self.start, self.stop = start, stop
+        keys = (pairs >> 32).astype(np.uint32)
+        bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        self.keys = keys[np.concatenate([[0], bounds])] if len(keys) else keys
+        self.indptr = np.concatenate([[0], bounds, [len(keys)]]).astype(np.int64)
+        self.rows = (pairs & 0xFFFFFFFF).astype(np.int32)
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def postings(self, key: int) -> np.ndarray:
+        position = np.searchsorted(self.keys, key)
+        if position == len(self.keys) or self.keys[position] != key:
+            return self.rows[:0]
+        return self.rows[self.indptr[position]:self.indptr[position + 1]]
+
+    def pairs(self) -> np.ndarray:
+        keys = np.repeat(self.keys.astype(np.int64), np.diff(self.indptr))
+        return (keys << 32) | self.rows
+
+
+class TrigramIndex:
+    def __init__(self):
+        self._segments: Tuple[_Segment, ...] = ()
+        self._lock = threading.Lock()
+        # Filas de la última versión de los datos que usa el índice (ver claim), None si nadie la extendió
+        self._claimed_rows: Optional[int] = None
+
+    def __reduce__(self):
+        # Al pasar los candidatos a otro proceso (por ej, los shards de la carga) el índice se vuelve a armar allá
+        return TrigramIndex, ()
+
+    @property
+    def rows(self) -> int:
+        """Filas indexadas (las primeras)"""
+        segments = self._segments
+        return segments[-1].stop if segments else 0
+
+    def claim(self, rows: int, new_rows: int) -> bool:
+        """El índice se comparte entre las versiones de unos mismos datos que solo crecen (cada alta arma una nueva,
+        ver CompactCandidates.extended). Quien extiende la versión de rows filas a new_rows lo reclama: devuelve
+        False si esa no era la última versión (por ej, ya se había extendido con otras filas), y entonces tiene que
+        usar un índice nuevo"""
+        with self._lock:
+            if self._claimed_rows not in (None, rows):
+                return False
+            self._claimed_rows = new_rows
+            return True
+
+    def search(self, values: ValuesArray, query: str) -> np.ndarray:
+        """IDs (ordenados) de los values que contienen a query, case-insensitive. values son los de una versión de
+        los datos (de esta o de una versión anterior a las ya indexadas); si hay muchas filas sin indexar, primero
+        se indexan"""
+        query = query.lower()
+        encoded = np.frombuffer(query.encode(), dtype=np.uint8)
+        if len(encoded) < NGRAM_SIZE:
+            # Queries más cortas que un trigrama: no hay con qué podar
+            return self._scan(values, query, 0)
+        if len(values) - self.rows >= MIN_SEGMENT_ROWS:
+            self._update(values)
+        segments = self._segments
+        keys = np.unique(_trigrams(encoded.astype(np.uint32)))
+        found = []
+        for segment in segments:
+            if segment.start >= len(values):
+                break
+            postings = sorted((segment.postings(key) for key in keys.tolist()), key=len)
+            candidates = postings[0]
+            for other in postings[1:]:
+                if not len(candidates):
+                    break
+                candidates = np.intersect1d(candidates, other, assume_unique=True)
+            candidates = candidates[candidates < len(values)].astype(np.int64)
+            if len(candidates):
+                matches = pc.match_substring(pc.utf8_lower(values.take(candidates)), query)
+                found.append(candidates[pc.fill_null(matches, False).to_numpy(zero_copy_only=False)])
+        indexed = min(segments[-1].stop, len(values)) if segments else 0
+        found.append(self._scan(values, query, indexed))
+        return np.concatenate(found)
+
+    # --------------------- Helper methods ---------------------
+
+    def _update(self, values: ValuesArray):
+        # Si otra búsqueda ya está indexando, esta sigue con los segmentos actuales (y un scan del resto)
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            segments = list(self._segments)
+            start = segments[-1].stop if segments else 0
+            if len(values) - start < MIN_SEGMENT_ROWS:
+                return
+            segments.append(_build_segment(values, start))
+            # Se une el último con el anterior mientras no sea mucho más grande: los tamaños quedan decrecientes
+            # (en potencias de 2), así que hay O(log n) segmentos y cada fila se reindexa O(log n) veces
+            while len(segments) > 1 and len(segments[-2]) <= 2 * len(segments[-1]):
+                last, previous = segments.pop(), segments.pop()
+                merged = np.sort(np.concatenate([previous.pairs(), last.pairs()]))
+                segments.append(_Segment(previous.start, last.stop, merged))
+            self._segments = tuple(segments)
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _scan(values: ValuesArray, query: str, start: int) -> np.ndarray:
+        if start >= len(values):
+            return np.empty(0, dtype=np.int64)
+        matches = pc.match_substring(pc.utf8_lower(values.slice(start)), query)
+        return np.flatnonzero(pc.fill_null(matches, False).to_numpy(zero_copy_only=False)) + start
+
+
+def _trigrams(data: np.ndarray) -> np.ndarray:
+    return (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+
+
+def _build_segment(values: ValuesArray, start: int) -> _Segment:
+    lowercase = pc.utf8_lower(values.slice(start)).cast(pa.large_string())
+    if isinstance(lowercase, pa.ChunkedArray):
+        lowercase = lowercase.combine_chunks()
+    offsets = np.frombuffer(lowercase.buffers()[1], dtype=np.int64)[lowercase.offset:][:len(lowercase) + 1]
+    data_buffer = lowercase.buffers()[2]
+    data = np.frombuffer(data_buffer or b'', dtype=np.uint8).astype(np.uint32)
+    # Un trigrama por cada posición de cada string que tenga al menos 3 bytes más adelante (los nulos tienen largo 0)
+    counts = np.maximum(np.diff(offsets) - (NGRAM_SIZE - 1), 0)
+    positions = np.arange(int(counts.sum()), dtype=np.int64)
+    positions += np.repeat(offsets[:-1] - (np.cumsum(counts) - counts), counts)
+    rows = np.repeat(np.arange(start, start + len(lowercase), dtype=np.int64), counts)
+    keys = (data[positions] << 16) | (data[positions + 1] << 8) | data[positions + 2]
+    pairs = np.sort((keys.astype(np.int64) << 32) | rows)
+    if len(pairs):
+        pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])]
+    return _Segment(start, start + len(lowercase), pairs)
@@ -0,0 +1,98 @@
+"""
+writer.py
+
+Pipeline de escritura de candidatos (write-behind con group commit).
+
+Provee la clase CandidateWriter: las altas se encolan y un único thread por store las agrupa en lotes, que se
+escriben con una sola llamada a CandidateStore.append (un solo DataFrame, un solo I/O y un solo file lock por lote).
+Quien encola recibe un Future que se resuelve con los IDs asignados una vez que el lote quedó escrito, por lo que
+las altas siguen siendo durables al responder, pero bajo carga concurrente se escriben juntas.
+"""
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List
+
+import pandas as pd
+
+from src.store import CandidateStore
+
+# Cantidad máxima de candidatos por lote de escritura
+MAX_BATCH_SIZE = 1000
+
+
+class CandidateWriter:
+    def __init__(self, store: CandidateStore, max_batch_size: int = MAX_BATCH_SIZE):
+        self._store = store
+        self._max_batch_size = max_batch_size
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def submit(self, records: List[Dict], scorers: Dict[str, Callable[[pd.DataFrame], pd.Series]]) -> Future:
+        """Encola candidatos (dicts con las columnas del header, skills separadas por coma) para escribir.
+        El Future devuelto se resuelve con el range de IDs asignados, contiguos y en el mismo orden"""
+        future = Future()
+        if not records:
+            future.set_result(range(0))
+            return future
+        self._ensure_started()
+        self._queue.put((records, scorers, future))
+        return future
+
+    def write(self, records: List[Dict], scorers: Dict[str, Callable[[pd.DataFrame], pd.Series]]) -> range:
+        """Encola candidatos y espera a que queden escritos. Devuelve sus IDs"""
+        return self.submit(records, scorers).result()
+
+    # --------------------- Helper methods ---------------------
+
+    def _ensure_started(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='candidate-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            batch_size = len(batch[0][0])
+            # Se agrupa todo lo que se encoló mientras se escribía el lote anterior
+            while batch_size < self._max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+                batch_size += len(item[0])
+            self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        records = [record for item_records, _, _ in batch for record in item_records]
+        scorers = {}
+        for _, item_scorers, _ in batch:
+            scorers.update(item_scorers)
+        try:
+            df_new_candidates = pd.DataFrame.from_records(records, columns=self._store.storage.data_header)
+            new_ids = self._store.append(df_new_candidates, scorers)
+        except BaseException as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        next_id = new_ids.start
+        for item_records, _, future in batch:
+            future.set_result(range(next_id, next_id + len(item_records)))
+            next_id += len(item_records)
+
+
+# Un único writer por store, así todas las altas del proceso pasan por la misma cola
+_writers: Dict[Hashable, CandidateWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_candidate_writer(store: CandidateStore) -> CandidateWriter:
+    """Devuelve el writer del proceso asociado al store (lo crea si no existe)"""
+    with _writers_lock:
+        writer = _writers.get(store.storage.key)
+        if writer is None or writer._store is not store:
+            writer = _writers[store.storage.key] = CandidateWriter(store)
+        return writer
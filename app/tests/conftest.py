@@ -0,0 +1,62 @@
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api
+import src.store
+from src.constants import BASE_DIR, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE
+from src.services import CandidateService
+from src.storage import CSVStorage
+
+
+@pytest.fixture(autouse=True)
+def fresh_stores():
+    # Cada test empieza sin stores del proceso (simula un proceso nuevo)
+    src.store._stores.clear()
+    yield
+    src.store._stores.clear()
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    """Copia del csv de ejemplo del repo"""
+    path = tmp_path / 'candidates.csv'
+    shutil.copyfile(BASE_DIR / 'data' / 'candidates.csv', path)
+    return path
+
+
+@pytest.fixture
+def make_service():
+    def make(data_path, **kwargs):
+        src.store._stores.clear()
+        return CandidateService(data_path, HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE, **kwargs)
+    return make
+
+
+@pytest.fixture
+def api_client(make_service):
+    """Cliente de la API con un CandidateService sobre data_path (o sobre storage, si se indica)"""
+    def make(data_path, **kwargs):
+        service = make_service(data_path, **kwargs)
+        src.api.app.dependency_overrides[src.api.get_candidates_service] = lambda: service
+        return TestClient(src.api.app)
+    yield make
+    src.api.app.dependency_overrides.clear()
+
+
+def replace_in_line(path, line_number: int, old: str, new: str) -> None:
+    """Edita a mano una línea del csv (old y new del mismo largo: el tamaño del archivo no cambia)"""
+    assert len(old) == len(new)
+    lines = path.read_bytes().split(b'\n')
+    assert old.encode() in lines[line_number]
+    lines[line_number] = lines[line_number].replace(old.encode(), new.encode(), 1)
+    path.write_bytes(b'\n'.join(lines))
+
+
+def write_snapshot(csv_path) -> CSVStorage:
+    """Carga el csv y guarda su snapshot (lo que hace el store en segundo plano cuando corresponde)"""
+    storage = CSVStorage(csv_path, HEADER, use_snapshot=True)
+    signature = storage.signature()
+    assert storage.compact_snapshot(storage.load_compact(), signature)
+    return storage
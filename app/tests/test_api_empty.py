@@ -0,0 +1,67 @@
+import io
+
+import pyarrow.parquet as pq
+import pytest
+
+from src.constants import HEADER
+from src.models import StudentCandidate
+from src.storage import SQLiteStorage
+
+
+def test_list_without_candidates(tmp_path, api_client):
+    client = api_client(tmp_path / 'candidates.csv')
+
+    response = client.get('/candidates/')
+    assert response.status_code == 200
+    assert response.json() == {'total': 0, 'page': 1, 'per_page': 10, 'total_pages': 0, 'candidates': []}
+    response = client.get('/candidates/', params={'name': 'ana', 'college': 'MIT', 'skill': ['Python'], 'min_score': 0.1})
+    assert response.status_code == 200
+    assert response.json()['total'] == 0
+
+
+@pytest.fixture(params=['csv', 'sqlite'])
+def empty_client(request, tmp_path, api_client):
+    """API sin candidatos: csv inexistente, o base SQLite recién creada (sin filas)"""
+    if request.param == 'csv':
+        return api_client(tmp_path / 'candidates.csv')
+    return api_client(tmp_path / 'candidates.csv', storage=SQLiteStorage(tmp_path / 'candidates.db', HEADER))
+
+
+def test_top_and_report_without_candidates(empty_client):
+    response = empty_client.get('/candidates/top', params={'k': 5})
+    assert response.status_code == 200
+    assert response.json() == {'k': 5, 'candidates': []}
+
+    response = empty_client.get('/reports/')
+    assert response.status_code == 200
+    assert response.content.startswith(b'%PDF')
+
+
+def test_first_candidate_after_empty_top_k(tmp_path, make_service):
+    service = make_service(tmp_path / 'candidates.csv')
+    top = service.get_preselected_candidates(k=3)
+    assert top.empty and list(top.columns) == HEADER + ['score']
+
+    # El store quedó con la versión vacía cacheada: la primera alta la extiende
+    service.save_candidate(StudentCandidate(
+        full_name='First', email='first@example.com', college='Stanford University', degree='CS',
+        academic_average=9, skills=['Python'],
+    ))
+    top = service.get_preselected_candidates(k=3)
+    assert top['full_name'].tolist() == ['First']
+    assert top['score'].tolist() == [0.81]
+
+
+def test_export_without_candidates_keeps_the_schema(empty_client):
+    columns = ['id'] + HEADER + ['score']
+    response = empty_client.get('/candidates/export', params={'format': 'csv'})
+    assert response.status_code == 200
+    assert response.text == ','.join(columns) + '\n'
+
+    response = empty_client.get('/candidates/export', params={'format': 'parquet', 'with_score': False})
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 0 and table.column_names == columns[:-1]
+
+    response = empty_client.get('/candidates/export', params={'format': 'ndjson'})
+    assert response.status_code == 200 and response.content == b''
@@ -0,0 +1,30 @@
+import numpy as np
+import pyarrow as pa
+
+from src.columnar import CompactCandidates
+from src.constants import HEADER
+from src.models import StudentCandidate
+from src.scoring import score_candidates
+
+
+def test_averages_keep_full_precision(csv_path, make_service):
+    service = make_service(csv_path)
+    service.get_all_candidates()
+    candidate_id = service.save_candidate(StudentCandidate(
+        full_name='Just Above', email='above@example.com', college='-', degree='-', academic_average=7.50000001,
+    ))
+
+    df = service.get_all_candidates(with_score=True)
+    assert df.loc[candidate_id, 'academic_average'] == 7.50000001
+    # Único criterio que cumple: promedio mayor a 7.5
+    assert df.loc[candidate_id, 'score'] == 0.5
+    # Lo mismo al recalcular en un proceso nuevo, desde el csv
+    assert make_service(csv_path).get_all_candidates(with_score=True).loc[candidate_id, 'score'] == 0.5
+
+    candidates = service._store.get_candidates()
+    # Igual que el scoring sobre el dataframe y sin cambios al pasar por Arrow (snapshot)
+    config = service.preselection_weights, service.prestige_colleges, service.relevant_skills
+    frame_scores, compact_scores = score_candidates(df[HEADER], *config), score_candidates(candidates, *config)
+    assert np.array_equal(frame_scores.to_numpy(), compact_scores.to_numpy())
+    restored = CompactCandidates.from_arrow(pa.table(candidates.to_arrow()), HEADER)
+    assert restored.to_frame([candidate_id]).loc[candidate_id, 'academic_average'] == 7.50000001
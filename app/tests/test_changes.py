@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+import time
+
+import src.api
+from src.concurrency import ChangeFeed
+from src.models import StudentCandidate
+
+
+def new_candidate(name='New Candidate'):
+    return StudentCandidate(
+        full_name=name, email='new@example.com', college='Harvard University', degree='CS', academic_average=9,
+        skills=['Python'],
+    )
+
+
+def test_cursor_semantics(csv_path, api_client):
+    client = api_client(csv_path)
+    total = client.get('/candidates/', params={'per_page': 1}).json()['total']
+
+    # -1: desde el primero, de a limit, con el ID del último devuelto como cursor
+    page = client.get('/candidates/changes', params={'since_id': -1, 'limit': 10}).json()
+    assert [candidate['id'] for candidate in page['candidates']] == list(range(10))
+    assert page['next_since_id'] == 9 and page['has_more']
+    ids = [candidate['id'] for candidate in page['candidates']]
+    while page['has_more']:
+        page = client.get('/candidates/changes', params={'since_id': page['next_since_id'], 'limit': 10}).json()
+        ids += [candidate['id'] for candidate in page['candidates']]
+    assert ids == list(range(total)) and page['next_since_id'] == total - 1
+
+    # Sin since_id: nada de lo existente, y el cursor queda en el último
+    page = client.get('/candidates/changes').json()
+    assert page == {'since_id': None, 'next_since_id': total - 1, 'has_more': False, 'candidates': []}
+    # Un cursor al día no devuelve nada y se mantiene
+    page = client.get('/candidates/changes', params={'since_id': total - 1, 'with_score': False}).json()
+    assert page['candidates'] == [] and page['next_since_id'] == total - 1
+
+    src.api.app.dependency_overrides[src.api.get_candidates_service]().save_candidate(new_candidate())
+    page = client.get('/candidates/changes', params={'since_id': total - 1, 'with_score': False}).json()
+    assert page['next_since_id'] == total and not page['has_more']
+    assert page['candidates'] == [{
+        'id': total, 'full_name': 'New Candidate', 'email': 'new@example.com', 'college': 'Harvard University',
+        'degree': 'CS', 'academic_average': 9.0, 'skills': ['Python'], 'work_experience': '-',
+    }]
+
+
+def test_long_poll_wakes_up_on_save(csv_path, api_client, monkeypatch):
+    # Sin revisar periódicamente: solo el aviso del alta puede despertar al request
+    monkeypatch.setattr(src.api, 'CHANGES_POLL_INTERVAL_SECONDS', 60)
+    client = api_client(csv_path)
+    service = src.api.app.dependency_overrides[src.api.get_candidates_service]()
+    total = service.count_candidates()
+
+    waiting = threading.Event()
+    wait = ChangeFeed.wait
+
+    async def recording_wait(feed, version, timeout):
+        waiting.set()
+        return await wait(feed, version, timeout)
+    monkeypatch.setattr(ChangeFeed, 'wait', recording_wait)
+
+    responses = []
+    poll = threading.Thread(target=lambda: responses.append(
+        client.get('/candidates/changes', params={'since_id': total - 1, 'wait': 20})
+    ))
+    started = time.monotonic()
+    poll.start()
+    assert waiting.wait(10)
+    service.save_candidate(new_candidate('Wake Up'))
+    poll.join(10)
+
+    assert time.monotonic() - started < 10
+    page = responses[0].json()
+    assert [candidate['full_name'] for candidate in page['candidates']] == ['Wake Up']
+    assert page['next_since_id'] == total
+
+
+def test_long_poll_times_out_without_changes(csv_path, api_client):
+    client = api_client(csv_path)
+    started = time.monotonic()
+    page = client.get('/candidates/changes', params={'wait': 0.3}).json()
+    assert 0.3 <= time.monotonic() - started < 5
+    assert page['candidates'] == []
+
+
+class FakeRequest:
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+
+    async def is_disconnected(self):
+        return False
+
+
+async def read_events(response, count, skip_comments=False):
+    """Los primeros count eventos (bloques terminados en línea vacía) del stream, sin los comentarios (keep-alive)
+    si skip_comments"""
+    events, buffer = [], ''
+    iterator = response.body_iterator
+    try:
+        while len(events) < count:
+            buffer += await asyncio.wait_for(iterator.__anext__(), 10)
+            while '\n\n' in buffer and len(events) < count:
+                event, buffer = buffer.split('\n\n', 1)
+                if not (skip_comments and event.startswith(':')):
+                    events.append(event)
+    finally:
+        await iterator.aclose()
+    return events
+
+
+def parse_event(event):
+    fields = dict(line.split(': ', 1) for line in event.split('\n'))
+    return fields['id'], fields['event'], json.loads(fields['data'])
+
+
+def test_stream_framing(csv_path, make_service, monkeypatch):
+    monkeypatch.setattr(src.api, 'CHANGES_POLL_INTERVAL_SECONDS', 0.05)
+    monkeypatch.setattr(src.api, 'CHANGES_HEARTBEAT_SECONDS', 0.1)
+    monkeypatch.setattr(src.api, 'CHANGES_BATCH_SIZE', 2)
+    service = make_service(csv_path)
+    total = service.count_candidates()
+
+    async def stream(request, **params):
+        response = await src.api.stream_candidate_changes(
+            request, candidates_service=service, executor=src.api.get_executor(), **params
+        )
+        assert response.media_type == 'text/event-stream' and response.headers['cache-control'] == 'no-cache'
+        return response
+
+    async def scenario():
+        # Desde since_id: reintento, un evento por candidato (en varios lotes) y keep-alive sin altas
+        response = await stream(FakeRequest(), since_id=total - 4, with_score=True, profile=None)
+        events = await read_events(response, 5)
+        assert events[0] == 'retry: 50'
+        parsed = [parse_event(event) for event in events[1:4]]
+        assert [(event_id, kind) for event_id, kind, _ in parsed] == [
+            (str(candidate_id), 'candidate') for candidate_id in range(total - 3, total)
+        ]
+        assert [data['id'] for _, _, data in parsed] == list(range(total - 3, total))
+        assert 'score' in parsed[0][2]
+        assert events[4] == ': keep-alive'
+
+        # Al reconectar, Last-Event-ID tiene prioridad sobre since_id; las altas nuevas llegan al stream abierto
+        response = await stream(
+            FakeRequest({'last-event-id': str(total - 2)}), since_id=-1, with_score=False, profile=None
+        )
+        read = asyncio.ensure_future(read_events(response, 3, skip_comments=True))
+        await asyncio.sleep(0.2)
+        await asyncio.to_thread(service.save_candidate, new_candidate('Streamed'))
+        events = await read
+        assert [parse_event(event)[0] for event in events[1:]] == [str(total - 1), str(total)]
+        assert parse_event(events[2])[2]['full_name'] == 'Streamed'
+        assert 'score' not in parse_event(events[2])[2]
+
+    asyncio.run(scenario())
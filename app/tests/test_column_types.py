@@ -0,0 +1,49 @@
+from conftest import write_snapshot
+from src.columnar import CompactCandidates
+from src.concurrency import shutdown_load_pool
+from src.constants import HEADER
+from src.models import StudentCandidate
+from src.storage import CSVStorage
+
+
+def numeric_text_candidate(name: str) -> StudentCandidate:
+    # Inferidos como números, '007' quedaría como 7 y '2020' no pasaría la validación de StudentCandidate
+    return StudentCandidate(
+        full_name=name, email='x@example.com', college='1999', degree='007', academic_average=8, skills=['Python'],
+        work_experience='2020',
+    )
+
+
+def assert_text_kept(candidates: CompactCandidates, candidate_id: int) -> None:
+    candidate = candidates.to_candidate(candidate_id)
+    assert (candidate.college, candidate.degree, candidate.work_experience) == ('1999', '007', '2020')
+
+
+def test_numeric_looking_text_is_kept_as_text(csv_path, make_service):
+    service = make_service(csv_path)
+    service.get_all_candidates()
+    candidate_id = service.save_candidate(numeric_text_candidate('Numeric Text'))
+
+    # Lectura de una sola fila (índice de offsets) y cache extendida con as_loaded
+    assert service.get_candidate_by_id(candidate_id).work_experience == '2020'
+    assert_text_kept(service._store.get_candidates(), candidate_id)
+    # Proceso nuevo: carga completa del csv
+    assert_text_kept(make_service(csv_path)._store.get_candidates(), candidate_id)
+
+
+def test_snapshot_tail_and_shards_parse_like_the_full_file(csv_path, make_service, monkeypatch):
+    # El snapshot solo cubre filas completas (terminadas en salto de línea)
+    csv_path.write_bytes(csv_path.read_bytes().rstrip(b'\n') + b'\n')
+    rows = write_snapshot(csv_path).snapshot.rows()
+    # Tantas filas nuevas como las que ya había: la cola del snapshot y el segundo shard tienen solo estas
+    new_ids = make_service(csv_path).save_candidates([numeric_text_candidate(f'Tail {i}') for i in range(rows + 1)])
+
+    loaded = CSVStorage(csv_path, HEADER, use_snapshot=True).load_compact()
+    assert CSVStorage(csv_path, HEADER, use_snapshot=True).snapshot.rows() == rows
+    assert_text_kept(loaded, new_ids[-1])
+
+    monkeypatch.setattr(CSVStorage, 'MIN_SHARD_ROWS', 1)
+    try:
+        assert_text_kept(CSVStorage(csv_path, HEADER, load_workers=2).load_compact(), new_ids[-1])
+    finally:
+        shutdown_load_pool()
@@ -0,0 +1,54 @@
+import pytest
+
+import src.api
+from src.constants import HEADER
+from src.models import StudentCandidate
+from src.storage import CSVStorage, SQLiteStorage, migrate_csv_to_sqlite
+
+
+@pytest.fixture(params=['csv', 'sqlite'])
+def client(request, csv_path, tmp_path, api_client):
+    if request.param == 'csv':
+        return api_client(csv_path)
+    storage = SQLiteStorage(tmp_path / 'candidates.db', HEADER)
+    migrate_csv_to_sqlite(CSVStorage(csv_path, HEADER), storage)
+    return api_client(csv_path, storage=storage)
+
+
+def test_count_and_conditional_requests(client):
+    response = client.get('/candidates/count')
+    assert response.status_code == 200
+    assert response.json() == {'count': 23, 'last_id': 22}
+    etag = response.headers['etag']
+    assert response.headers['x-total-count'] == '23'
+
+    response = client.head('/candidates/count')
+    assert response.status_code == 200 and response.content == b''
+    assert response.headers['etag'] == etag and response.headers['x-total-count'] == '23'
+
+    # Sin cambios: 304 (sin body ni conteo) con el mismo ETag, también en HEAD
+    for method in (client.get, client.head):
+        response = method('/candidates/count', headers={'If-None-Match': etag})
+        assert response.status_code == 304 and response.content == b''
+        assert response.headers['etag'] == etag and 'x-total-count' not in response.headers
+    assert client.get('/candidates/count', headers={'If-None-Match': '"other"'}).status_code == 200
+
+    # Un alta cambia el ETag
+    src.api.app.dependency_overrides[src.api.get_candidates_service]().save_candidate(StudentCandidate(
+        full_name='New', email='new@example.com', college='MIT', degree='CS', academic_average=8,
+    ))
+    response = client.get('/candidates/count', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json() == {'count': 24, 'last_id': 23}
+    assert response.headers['etag'] != etag
+    assert client.get('/candidates/count', headers={'If-None-Match': response.headers['etag']}).status_code == 304
+
+
+def test_count_sees_external_appends(csv_path, api_client):
+    client = api_client(csv_path)
+    etag = client.get('/candidates/count').headers['etag']
+    # Otro proceso agrega una fila al csv
+    with open(csv_path, 'a') as f:
+        f.write('\nExternal,external@example.com,MIT,CS,7.5,Python,-\n')
+    response = client.get('/candidates/count', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.json()['count'] == 24
@@ -0,0 +1,119 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from src import csv_index
+from src.csv_index import CSVOffsetIndex
+
+HEADER_LINE = b'full_name,email,work_experience\n'
+ROWS = [
+    b'Ana,ana@x.com,-\n',
+    b'"Ruiz, Daniel",daniel@x.com,"Acme\nSenior dev: 2020 - 2023\n"\n',
+    b'"Joel ""JR"" Rey",joel@x.com,"""quoted""\nline"\n',
+    b'\xc3\x91and\xc3\xba,nandu@x.com,"\n"\n',
+    b'Zoe,zoe@x.com,-\n',
+]
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    path = tmp_path / 'candidates.csv'
+    path.write_bytes(HEADER_LINE + b''.join(ROWS))
+    return path
+
+
+def parse(header: bytes, row: bytes) -> dict:
+    return pd.read_csv(io.BytesIO(header + row), dtype=str, keep_default_na=False).iloc[0].to_dict()
+
+
+@pytest.mark.parametrize('scan_chunk_size', [3, 7, csv_index.SCAN_CHUNK_SIZE])
+def test_quoted_newlines_do_not_end_records(data_path, monkeypatch, scan_chunk_size):
+    # Con bloques chicos, la paridad de comillas tiene que seguir entre un bloque y el siguiente
+    monkeypatch.setattr(csv_index, 'SCAN_CHUNK_SIZE', scan_chunk_size)
+    index = CSVOffsetIndex(data_path)
+    assert index.row_count() == len(ROWS)
+    expected = pd.read_csv(data_path, dtype=str, keep_default_na=False)
+    for row_id, row in enumerate(ROWS):
+        header, read = index.read_row(row_id)
+        # Sin el salto de línea que termina el registro (los de adentro de las comillas quedan)
+        assert header == HEADER_LINE and read == row[:-1]
+        assert parse(header, read) == expected.iloc[row_id].to_dict()
+    assert index.read_row(len(ROWS)) is None and index.read_row(-1) is None
+    assert index.prefix_end(2) == len(HEADER_LINE + ROWS[0] + ROWS[1])
+
+
+def test_last_row_without_newline(data_path):
+    data_path.write_bytes(data_path.read_bytes().rstrip(b'\n'))
+    index = CSVOffsetIndex(data_path)
+    assert index.row_count() == len(ROWS)
+    assert index.read_row(len(ROWS) - 1)[1] == ROWS[-1][:-1]
+    # La fila abierta no es un prefijo completo
+    assert index.prefix_end(len(ROWS)) is None
+
+    with open(data_path, 'ab') as f:
+        f.write(b'\nNew,new@x.com,-\n')
+    assert index.row_count() == len(ROWS) + 1
+    assert index.read_row(len(ROWS) - 1)[1] == ROWS[-1][:-1]
+    assert index.read_row(len(ROWS))[1] == b'New,new@x.com,-'
+
+
+def test_appends_scan_only_new_bytes(data_path, monkeypatch):
+    CSVOffsetIndex(data_path).sync()
+    size = data_path.stat().st_size
+    with open(data_path, 'ab') as f:
+        f.write(b'New,new@x.com,"a\nb"\n')
+
+    scans = []
+    scan = CSVOffsetIndex._scan
+
+    def recording_scan(self, start, end):
+        scans.append((start, end))
+        return scan(self, start, end)
+    monkeypatch.setattr(CSVOffsetIndex, '_scan', recording_scan)
+    # Otro proceso: parte del índice persistido y solo escanea lo agregado
+    index = CSVOffsetIndex(data_path)
+    assert index.row_count() == len(ROWS) + 1
+    assert scans == [(size, data_path.stat().st_size)]
+    assert index.read_row(len(ROWS))[1] == b'New,new@x.com,"a\nb"'
+    assert CSVOffsetIndex(data_path).row_count() == len(ROWS) + 1
+    assert len(scans) == 1
+
+
+def test_rebuilds_after_truncation(data_path):
+    index = CSVOffsetIndex(data_path)
+    assert index.row_count() == len(ROWS)
+    data_path.write_bytes(HEADER_LINE + ROWS[3] + ROWS[0])
+    for current in (index, CSVOffsetIndex(data_path)):
+        assert current.row_count() == 2
+        assert current.read_row(0)[1] == ROWS[3][:-1] and current.read_row(1)[1] == ROWS[0][:-1]
+        assert current.read_row(2) is None
+
+
+def test_rebuilds_after_an_external_edit(data_path):
+    index = CSVOffsetIndex(data_path)
+    assert index.row_count() == len(ROWS)
+    # Se agrega texto a la primera fila (y filas al final): los fines de registro conocidos se corren
+    data_path.write_bytes(HEADER_LINE + b'Ana Maria,ana@x.com,-\n' + b''.join(ROWS[1:]) + ROWS[0])
+    assert index.row_count() == len(ROWS) + 1
+    assert index.read_row(0)[1] == b'Ana Maria,ana@x.com,-'
+    assert index.read_row(2)[1] == ROWS[2][:-1]
+    assert index.read_row(len(ROWS))[1] == ROWS[0][:-1]
+
+
+def test_read_row_reads_only_the_row(data_path, monkeypatch):
+    index = CSVOffsetIndex(data_path)
+    index.sync()
+    reads = []
+    pread = os.pread
+
+    def recording_pread(fd, size, offset):
+        reads.append((size, offset))
+        return pread(fd, size, offset)
+    monkeypatch.setattr(os, 'pread', recording_pread)
+    assert index.read_row(2) == (HEADER_LINE, ROWS[2][:-1])
+    start = len(HEADER_LINE + ROWS[0] + ROWS[1])
+    # El header, la fila y el chequeo de que el último fin de registro conocido sigue en su lugar
+    last_end = data_path.stat().st_size - 1
+    assert sorted(reads) == sorted([(1, last_end), (len(HEADER_LINE), 0), (len(ROWS[2]) - 1, start)])
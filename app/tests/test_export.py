@@ -0,0 +1,80 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src.export import export_candidates
+
+
+def expected_frame(service, with_score=True):
+    """Todos los candidatos como los exporta la API: columna id primero y skills como lista"""
+    df = service.get_all_candidates(with_score=with_score)
+    df.insert(0, 'id', df.index)
+    return df.reset_index(drop=True)
+
+
+def read_export(content: bytes, export_format: str) -> pd.DataFrame:
+    if export_format == 'ndjson':
+        return pd.DataFrame([json.loads(line) for line in content.decode().splitlines()])
+    if export_format == 'csv':
+        df = pd.read_csv(io.BytesIO(content), dtype={'work_experience': str}, keep_default_na=False)
+        df['skills'] = [skills.split(',') if skills else [] for skills in df['skills']]
+        return df
+    df = pq.read_table(io.BytesIO(content)).to_pandas()
+    df['skills'] = df['skills'].map(list)
+    return df
+
+
+def assert_same_candidates(exported: pd.DataFrame, expected: pd.DataFrame):
+    assert list(exported.columns) == list(expected.columns)
+    assert exported['id'].tolist() == expected['id'].tolist()
+    for column in expected.columns:
+        if column in ('academic_average', 'score'):
+            assert np.allclose(exported[column].to_numpy(float), expected[column].to_numpy(float)), column
+        else:
+            assert exported[column].tolist() == expected[column].tolist(), column
+
+
+@pytest.mark.parametrize('export_format', ['ndjson', 'csv', 'parquet'])
+@pytest.mark.parametrize('with_score', [True, False])
+def test_export_round_trip(csv_path, make_service, api_client, export_format, with_score):
+    client = api_client(csv_path)
+    response = client.get('/candidates/export', params={'format': export_format, 'with_score': with_score})
+    assert response.status_code == 200
+    assert_same_candidates(
+        read_export(response.content, export_format), expected_frame(make_service(csv_path), with_score)
+    )
+
+
+@pytest.mark.parametrize('export_format', ['ndjson', 'csv', 'parquet'])
+def test_export_applies_filters(csv_path, make_service, api_client, export_format):
+    client = api_client(csv_path)
+    filters = {'college': 'UNIVERSITY', 'min_score': 0.3, 'skill': ['Docker']}
+    response = client.get('/candidates/export', params={'format': export_format, **filters})
+    assert response.status_code == 200
+
+    expected = expected_frame(make_service(csv_path))
+    expected = expected[
+        expected['college'].str.lower().str.contains('university')
+        & (expected['score'] >= 0.3)
+        & expected['skills'].map(lambda skills: 'Docker' in skills)
+    ]
+    assert 0 < len(expected) < 23
+    assert_same_candidates(read_export(response.content, export_format), expected.reset_index(drop=True))
+    # Mismos candidatos que el listado paginado con los mismos filtros
+    listed = client.get('/candidates/', params={'per_page': 100, **filters}).json()
+    assert listed['total'] == len(expected)
+
+
+@pytest.mark.parametrize('export_format', ['csv', 'parquet'])
+def test_export_in_several_chunks(csv_path, make_service, export_format):
+    service = make_service(csv_path)
+    chunks = service.iter_candidates(chunksize=5)
+    content = b''.join(export_candidates(chunks, export_format))
+    # Un solo header (csv), un row group por bloque (Parquet)
+    assert_same_candidates(read_export(content, export_format), expected_frame(service))
+    if export_format == 'parquet':
+        assert pq.ParquetFile(io.BytesIO(content)).num_row_groups == 5
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.columnar import CompactCandidates
+from src.constants import HEADER
+from src.models import StudentCandidate
+
+
+def reference_contains(values, query):
+    return np.array([isinstance(value, str) and query.lower() in value.lower() for value in values])
+
+
+@pytest.mark.parametrize('column', ['full_name', 'college', 'degree'])
+@pytest.mark.parametrize('query', ['a', 'UNIV', 'science', 'el r', 'zzz'])
+def test_contains_matches_python_substring_semantics(column, query):
+    df = pd.DataFrame([
+        ['Daniel Ruiz', 'a@x.com', 'University of Alberta', 'Data Science', 8.1, ['Python'], '-'],
+        ['ANA GÓMEZ', 'b@x.com', None, 'Computer Science', 7.0, [], '-'],
+        [None, 'c@x.com', 'MIT', None, 6.0, ['SQL'], '-'],
+        ['Joel Rey', 'd@x.com', 'Stanford University', 'History', 9.0, [], '-'],
+    ], columns=HEADER)
+    candidates = CompactCandidates.from_frame(df)
+    assert np.array_equal(candidates.contains(column, query), reference_contains(df[column], query))
+
+
+def test_text_filters_see_new_candidates(csv_path, make_service):
+    service = make_service(csv_path)
+    total, _ = service.query_candidates(college='stanford', per_page=100)
+    service.save_candidate(StudentCandidate(
+        full_name='Zoe Unique', email='zoe@x.com', college='Stanford University', degree='Brand New Degree',
+        academic_average=8.0, skills=['Python'], work_experience='-'
+    ))
+    assert service.query_candidates(college='stanford', per_page=100)[0] == total + 1
+    total, records = service.query_candidates(name='ZOE UNI', degree='new deg')
+    assert total == 1 and records[0]['email'] == 'zoe@x.com'
@@ -0,0 +1,87 @@
+import re
+
+from src.metrics import Counter, Gauge, Histogram
+
+SAMPLE_LINE = re.compile(r'^([a-z_]+)(\{.*\})? (\S+)$')
+
+
+def parse_metrics(text):
+    """{(nombre, labels): valor} de las muestras, y {nombre: tipo} de las métricas"""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split(' ')
+            types[name] = metric_type
+        elif line and not line.startswith('#'):
+            name, labels, value = SAMPLE_LINE.match(line).groups()
+            samples[(name, labels or '')] = float(value)
+    return samples, types
+
+
+def test_render_format():
+    counter = Counter('lookups_total', 'Lookups', ['cache', 'result'])
+    counter.inc('report', 'hit')
+    counter.inc('report', 'hit', amount=2)
+    counter.inc('a"b\\c', 'miss')
+    assert counter.render() == [
+        '# HELP lookups_total Lookups',
+        '# TYPE lookups_total counter',
+        'lookups_total{cache="report",result="hit"} 3',
+        'lookups_total{cache="a\\"b\\\\c",result="miss"} 1',
+    ]
+    gauge = Gauge('rows', 'Rows')
+    gauge.set(5)
+    gauge.set(7)
+    assert gauge.render() == ['# HELP rows Rows', '# TYPE rows gauge', 'rows 7']
+
+    histogram = Histogram('duration_seconds', 'Duration', [0.1, 1], ['stage'])
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, 'load')
+    # Buckets acumulados (le incluye el límite), +Inf igual al count
+    assert histogram.render()[2:] == [
+        'duration_seconds_bucket{stage="load",le="0.1"} 2',
+        'duration_seconds_bucket{stage="load",le="1"} 3',
+        'duration_seconds_bucket{stage="load",le="+Inf"} 4',
+        'duration_seconds_sum{stage="load"} 3.65',
+        'duration_seconds_count{stage="load"} 4',
+    ]
+
+
+def test_metrics_endpoint(csv_path, api_client):
+    client = api_client(csv_path)
+    before, _ = parse_metrics(client.get('/metrics').text)
+
+    response = client.get('/candidates/', params={'name': 'ana'})
+    # Server-Timing: cada etapa del request y el total, en milisegundos
+    timings = dict(item.split(';dur=') for item in response.headers['server-timing'].split(', '))
+    assert {'csv_parse', 'score', 'filter', 'to_dict', 'total'} <= set(timings)
+    assert all(float(duration) >= 0 for duration in timings.values())
+    client.get('/candidates/', params={'name': 'ana'})
+    client.get('/candidates/1')
+    client.get('/candidates/100000')
+
+    response = client.get('/metrics')
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    after, types = parse_metrics(response.text)
+    assert types == {
+        'stage_duration_seconds': 'histogram', 'stage_rows': 'histogram', 'http_request_duration_seconds': 'histogram',
+        'cache_lookups_total': 'counter', 'candidates_cached_rows': 'gauge', 'blocking_tasks_pending': 'gauge',
+    }
+
+    def increase(name, labels):
+        return after.get((name, labels), 0) - before.get((name, labels), 0)
+
+    # Una serie por método, ruta (el template, no el path) y status
+    route = '{method="GET",route="/candidates/",status="200"}'
+    assert increase('http_request_duration_seconds_count', route) == 2
+    assert increase('http_request_duration_seconds_bucket', route[:-1] + ',le="+Inf"}') == 2
+    for status in ('200', '404'):
+        labels = f'{{method="GET",route="/candidates/{{candidate_id}}",status="{status}"}}'
+        assert increase('http_request_duration_seconds_count', labels) == 1
+    for stage in ('csv_parse', 'score', 'filter', 'materialize', 'to_dict', 'row_lookup'):
+        assert increase('stage_duration_seconds_count', f'{{stage="{stage}"}}') >= 1, stage
+    assert increase('stage_rows_sum', '{stage="score"}') == 23
+    assert increase('cache_lookups_total', '{cache="candidates",result="miss"}') == 1
+    assert increase('cache_lookups_total', '{cache="candidates",result="hit"}') >= 1
+    assert after[('candidates_cached_rows', '')] == 23
+    assert after[('blocking_tasks_pending', '')] == 0
@@ -0,0 +1,44 @@
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+import pytest
+
+from src.constants import HEADER
+from src.storage import CSVStorage, SQLiteStorage, migrate_csv_to_sqlite
+
+
+def test_migrate_replace_is_atomic(csv_path, tmp_path, monkeypatch):
+    csv_storage = CSVStorage(csv_path, HEADER)
+    sqlite_storage = SQLiteStorage(tmp_path / 'candidates.db', HEADER)
+    assert migrate_csv_to_sqlite(csv_storage, sqlite_storage) == csv_storage.count()
+    before = sqlite_storage.load()
+
+    with pytest.raises(RuntimeError):
+        migrate_csv_to_sqlite(csv_storage, sqlite_storage)
+
+    # Falla la carga de los nuevos, después de borrar los existentes: la base debe quedar como estaba
+    def failing_insert(self, conn, df_candidates):
+        raise OSError('disk full')
+    monkeypatch.setattr(SQLiteStorage, '_insert_candidates', failing_insert)
+    with pytest.raises(OSError):
+        migrate_csv_to_sqlite(csv_storage, sqlite_storage, replace=True)
+    pd.testing.assert_frame_equal(sqlite_storage.load(), before)
+
+    monkeypatch.undo()
+    assert migrate_csv_to_sqlite(csv_storage, sqlite_storage, replace=True) == len(before)
+    pd.testing.assert_frame_equal(sqlite_storage.load(), before)
+
+
+def test_sqlite_has_no_secondary_indexes(csv_path, tmp_path):
+    db_path = tmp_path / 'candidates.db'
+    migrate_csv_to_sqlite(CSVStorage(csv_path, HEADER), SQLiteStorage(db_path, HEADER))
+    # Una base de una versión anterior, con los índices que no se usaban
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute('CREATE INDEX idx_candidates_college ON candidates (college)')
+        conn.commit()
+    storage = SQLiteStorage(db_path, HEADER)
+    assert storage.count() == CSVStorage(csv_path, HEADER).count()
+    with closing(sqlite3.connect(db_path)) as conn:
+        indexes = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").fetchall()
+    assert indexes == []
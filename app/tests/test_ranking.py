@@ -0,0 +1,35 @@
+import pandas as pd
+
+# Orden del top-k: el mismo del `sort_values` original sobre todo el dataframe (score descendente con quicksort, que
+# no es estable: por ej, los empatados en 0.8 salen 5, 20, 17, 14)
+
+EXPECTED_ORDER = [2, 0, 3, 5, 20, 17, 14, 13, 6, 4, 7, 10, 11, 9, 8, 22, 12, 18, 16, 21, 1, 15, 19]
+
+
+def baseline_order(service, k):
+    df = service.get_all_candidates()
+    return list(df.sort_values(by=['score'], ascending=False).head(k).index)
+
+
+def test_top_k_keeps_the_baseline_tie_order(csv_path, make_service):
+    service = make_service(csv_path)
+    assert baseline_order(service, 23) == EXPECTED_ORDER
+    assert list(service.get_preselected_candidates(k=23).index) == EXPECTED_ORDER
+    assert list(service.get_preselected_candidates(k=5).index) == EXPECTED_ORDER[:5]
+
+
+def test_top_k_after_save_matches_a_full_sort(csv_path, make_service):
+    service = make_service(csv_path)
+    service.get_preselected_candidates(k=1)
+    # Mismo score que el candidato 5 (0.8): los empates quedan como en un sort de todos los candidatos
+    service.save_candidate(service.get_candidate_by_id(5))
+    top = list(service.get_preselected_candidates(k=9).index)
+    assert top == baseline_order(service, 9)
+    assert 23 in top
+    # Un proceso nuevo da el mismo orden
+    assert list(make_service(csv_path).get_preselected_candidates(k=9).index) == top
+
+
+def test_top_k_scores_are_sorted(csv_path, make_service):
+    top = make_service(csv_path).get_preselected_candidates(k=23)
+    pd.testing.assert_series_equal(top['score'], top['score'].sort_values(ascending=False, kind='stable'))
@@ -0,0 +1,99 @@
+import threading
+
+import src.api
+from src.models import StudentCandidate
+from src.pdf_report import PDFReportGenerator
+from src.report_cache import ReportCache, etag_matches, make_etag
+
+
+def test_lru_eviction_by_total_size():
+    cache = ReportCache(max_bytes=10)
+    renders = []
+
+    def render(content):
+        def do():
+            renders.append(content)
+            return content
+        return do
+
+    assert cache.get_or_render('a', render(b'aaaa')) == b'aaaa'
+    cache.get_or_render('b', render(b'bbbb'))
+    # Un acierto pasa la entrada al final: la menos usada es ahora b
+    assert cache.get_or_render('a', render(b'other')) == b'aaaa'
+    cache.get_or_render('c', render(b'cccc'))
+    assert renders == [b'aaaa', b'bbbb', b'cccc']
+
+    cache.get_or_render('a', render(b'other'))
+    cache.get_or_render('c', render(b'other'))
+    assert renders == [b'aaaa', b'bbbb', b'cccc']
+    assert cache.get_or_render('b', render(b'bbbb')) == b'bbbb'
+    # Más grande que todo el cache: se devuelve pero no se guarda (ni desaloja nada)
+    cache.get_or_render('big', render(b'x' * 11))
+    cache.get_or_render('big', render(b'x' * 11))
+    assert renders == [b'aaaa', b'bbbb', b'cccc', b'bbbb', b'x' * 11, b'x' * 11]
+
+
+def test_concurrent_misses_render_once():
+    cache = ReportCache(max_bytes=100)
+    started, release, renders = threading.Event(), threading.Event(), []
+
+    def render():
+        renders.append(1)
+        started.set()
+        release.wait(10)
+        return b'pdf'
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_render('k', render))) for _ in range(4)]
+    threads[0].start()
+    assert started.wait(10)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(10)
+    assert results == [b'pdf'] * 4 and renders == [1]
+
+
+def test_etag_matching():
+    etag = make_etag(('report', 1))
+    assert etag == make_etag(('report', 1)) and etag != make_etag(('report', 2))
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches(None, etag) and not etag_matches('"other"', etag)
+
+
+def test_report_endpoint_cache_and_etag(csv_path, api_client, monkeypatch):
+    client = api_client(csv_path)
+    cache = ReportCache(max_bytes=10 * 1024 * 1024)
+    src.api.app.dependency_overrides[src.api.get_reports_cache] = lambda: cache
+    renders = []
+    generate_bytes = PDFReportGenerator.generate_bytes
+
+    def counting_generate_bytes(self, candidates, layout):
+        renders.append((len(candidates), layout))
+        return generate_bytes(self, candidates, layout)
+    monkeypatch.setattr(PDFReportGenerator, 'generate_bytes', counting_generate_bytes)
+
+    first = client.get('/reports/', params={'k': 5})
+    assert first.status_code == 200 and first.content.startswith(b'%PDF')
+    etag = first.headers['etag']
+    # Mismos parámetros: sale del cache (mismo contenido), o 304 con If-None-Match
+    assert client.get('/reports/', params={'k': 5}).content == first.content
+    response = client.get('/reports/', params={'k': 5}, headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.headers['etag'] == etag and response.content == b''
+    assert renders == [(5, 'detailed')]
+
+    # Otra clave: otro k, otro layout
+    assert client.get('/reports/', params={'k': 3}).headers['etag'] != etag
+    assert client.get('/reports/', params={'k': 5, 'layout': 'compact'}).headers['etag'] != etag
+    assert renders == [(5, 'detailed'), (3, 'detailed'), (5, 'compact')]
+
+    # Un alta cambia la versión de los datos: el ETag viejo ya no coincide y se vuelve a generar
+    src.api.app.dependency_overrides[src.api.get_candidates_service]().save_candidate(StudentCandidate(
+        full_name='New Top', email='top@example.com', college='Harvard University', degree='CS',
+        academic_average=10, skills=['Python', 'SQL'],
+    ))
+    response = client.get('/reports/', params={'k': 5}, headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.headers['etag'] != etag
+    assert renders[-1] == (5, 'detailed') and len(renders) == 4
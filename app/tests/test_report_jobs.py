@@ -0,0 +1,44 @@
+import time
+
+import pandas as pd
+
+from src.report_jobs import QUEUED, RUNNING, ReportJobManager, _claim_job, _read_job, _release_claim, _write_job
+
+
+def make_pending_job(jobs_dir, job_id: str):
+    job_dir = jobs_dir / job_id
+    job_dir.mkdir(parents=True)
+    pd.DataFrame().to_pickle(job_dir / 'input.pkl')
+    _write_job(job_dir, {
+        'job_id': job_id, 'status': RUNNING, 'k': 1, 'layout': 'detailed', 'total_rows': 0, 'rows_done': 0,
+        'progress': 0.0, 'error': None, 'created_at': time.time(), 'finished_at': None,
+    })
+    return job_dir
+
+
+def test_recover_only_enqueues_unclaimed_jobs(tmp_path, monkeypatch):
+    enqueued = []
+    monkeypatch.setattr(ReportJobManager, '_enqueue', lambda self, job_id: enqueued.append(job_id))
+    owned, orphan = 'a' * 32, 'b' * 32
+    # owned: lo encoló otro proceso vivo (tiene el claim); orphan: su proceso murió (el lock se liberó)
+    owner_claim = _claim_job(make_pending_job(tmp_path, owned))
+    make_pending_job(tmp_path, orphan)
+
+    manager = ReportJobManager(tmp_path, max_workers=1, max_pending=4, retention_seconds=60)
+    try:
+        assert enqueued == [orphan]
+        assert _read_job(tmp_path / owned)['status'] == RUNNING
+        assert _read_job(tmp_path / orphan)['status'] == QUEUED
+        # Un segundo proceso que arranca ahora no encola ninguno de los dos
+        other = ReportJobManager(tmp_path, max_workers=1, max_pending=4, retention_seconds=60)
+        other.shutdown()
+        assert enqueued == [orphan]
+    finally:
+        manager.shutdown()
+
+    # Si el dueño muere, el job vuelve a quedar disponible
+    _release_claim(owner_claim)
+    _release_claim(manager._claims.pop(orphan))
+    other = ReportJobManager(tmp_path, max_workers=1, max_pending=4, retention_seconds=60)
+    other.shutdown()
+    assert enqueued == [orphan, owned, orphan]
@@ -0,0 +1,16 @@
+from conftest import replace_in_line
+
+
+def test_same_size_edit_invalidates_persisted_scores(csv_path, make_service):
+    scores = make_service(csv_path).get_all_candidates(with_score=True)['score']
+    assert scores[1] == 0.01
+    size = csv_path.stat().st_size
+
+    # Promedio 6.6 -> 9.6 del candidato 1 (fila 2 del archivo, contando el header)
+    replace_in_line(csv_path, 2, ',6.6,', ',9.6,')
+    assert csv_path.stat().st_size == size
+
+    # Proceso nuevo: no hay nada en memoria, solo los scores persistidos
+    df = make_service(csv_path).get_all_candidates(with_score=True)
+    assert df.loc[1, 'academic_average'] == 9.6
+    assert df.loc[1, 'score'] == 0.51
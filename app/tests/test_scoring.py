@@ -0,0 +1,27 @@
+import pandas as pd
+
+from src.constants import HEADER, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE
+from src.scoring import score_candidates
+
+WEIGHTS = {'academic_average': 0.5, 'college': 0.3, 'skills': 0.01}
+
+
+def test_vectorized_scores_match_per_row(csv_path, make_service):
+    service = make_service(csv_path)
+    df = service.get_all_candidates(with_score=True)
+    expected = df.apply(service._calculate_score, axis=1)
+    assert df['score'].tolist() == expected.tolist()
+
+
+def test_scores_of_no_candidates():
+    scores = score_candidates(pd.DataFrame(columns=HEADER), WEIGHTS, PRESTIGE_COLLEGES, RELEVANT_SKILLS_FOR_TRAINEE_ROLE)
+    assert scores.empty and scores.dtype == float
+
+
+def test_all_candidates_with_score_without_data(tmp_path, make_service):
+    service = make_service(tmp_path / 'candidates.csv')
+    df = service.get_all_candidates(with_score=True)
+    assert df.empty and list(df.columns) == HEADER + ['score']
+    # Como el camino ordenado del original: ordenar por score no falla
+    assert df.sort_values(by=['score'], ascending=False).empty
+    assert list(service.get_all_candidates(with_score=False).columns) == HEADER
@@ -0,0 +1,80 @@
+import threading
+
+import pandas as pd
+
+from conftest import replace_in_line, write_snapshot
+from src.constants import HEADER
+from src.snapshot import ColumnarSnapshot
+from src.storage import CSVStorage
+from src.store import CandidateStore
+
+
+def test_same_size_edit_invalidates_snapshot(csv_path):
+    # Un csv de ~1.5 MB (500 copias del de ejemplo): una edición en el medio de las filas cubiertas
+    df = pd.read_csv(csv_path, dtype=str)
+    pd.concat([df] * 500, ignore_index=True).to_csv(csv_path, index=False)
+    storage = write_snapshot(csv_path)
+    rows = storage.snapshot.rows()
+    assert rows == len(df) * 500
+    size = csv_path.stat().st_size
+
+    # Candidato 1 de la copia 16 (promedio 6.6 -> 9.6)
+    candidate_id = 1 + len(df) * 16
+    replace_in_line(csv_path, candidate_id + 1, ',6.6,', ',9.6,')
+    assert csv_path.stat().st_size == size
+
+    # También si además se agregaron filas después (el snapshot ya no coincide con la signature del csv)
+    with open(csv_path, 'a') as f:
+        f.write(df.iloc[:1].to_csv(index=False, header=False))
+    candidates = CSVStorage(csv_path, HEADER, use_snapshot=True).load_compact()
+    assert candidates.to_frame([candidate_id]).loc[candidate_id, 'academic_average'] == 9.6
+    # El snapshot viejo se descartó
+    assert not storage.snapshot.snapshot_path.exists()
+    candidates = write_snapshot(csv_path).load_compact()
+    assert candidates.to_frame([candidate_id]).loc[candidate_id, 'academic_average'] == 9.6
+
+
+def test_snapshot_with_appended_tail_is_reused(csv_path):
+    csv_path.write_bytes(csv_path.read_bytes().rstrip(b'\n') + b'\n')
+    storage = write_snapshot(csv_path)
+    expected = storage.load_compact().to_frame()
+    rows = storage.snapshot.rows()
+    with open(csv_path, 'a') as f:
+        f.write(expected.iloc[:1].assign(skills='Python').to_csv(index=False, header=False))
+
+    candidates = CSVStorage(csv_path, HEADER, use_snapshot=True).load_compact()
+    assert storage.snapshot.rows() == rows
+    assert len(candidates) == rows + 1
+    pd.testing.assert_frame_equal(candidates.to_frame(range(rows)), expected)
+
+
+def test_compaction_runs_without_holding_locks(csv_path, monkeypatch):
+    monkeypatch.setattr(CSVStorage, 'SNAPSHOT_MIN_TAIL_ROWS', 1)
+    csv_path.write_bytes(csv_path.read_bytes().rstrip(b'\n') + b'\n')
+    store = CandidateStore(CSVStorage(csv_path, HEADER, use_snapshot=True))
+    started, release = threading.Event(), threading.Event()
+    prepare = ColumnarSnapshot.prepare
+
+    def slow_prepare(self, *args):
+        started.set()
+        assert release.wait(5)
+        return prepare(self, *args)
+    monkeypatch.setattr(ColumnarSnapshot, 'prepare', slow_prepare)
+
+    candidates = store.get_candidates()
+    assert started.wait(5)
+    # Mientras se escribe el snapshot (en otro thread), se puede agregar candidatos: ni el lock del store ni el del
+    # csv están tomados
+    store.append(candidates.to_frame([0]).assign(skills='Python'))
+    assert len(store.get_candidates()) == len(candidates) + 1
+
+    # Se escribió en el medio: el snapshot preparado se descarta (los bytes hasheados podrían no ser los cargados)
+    release.set()
+    store._compaction.join(5)
+    assert not store.storage.snapshot.snapshot_path.exists()
+    assert not list(csv_path.parent.glob('*.tmp'))
+
+    # Sin escrituras en el medio, la próxima compactación (después de la próxima alta) se publica
+    store.append(candidates.to_frame([1]).assign(skills='Python'))
+    store._compaction.join(5)
+    assert store.storage.snapshot.rows() == len(candidates) + 2
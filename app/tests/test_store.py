@@ -0,0 +1,48 @@
+import threading
+
+from src.columnar import CompactCandidates
+from src.store import get_candidate_store
+
+
+def test_append_does_not_modify_candidates_already_handed_out(csv_path, make_service):
+    service = make_service(csv_path)
+    store = get_candidate_store(service.storage)
+    candidates = store.get_candidates()
+    scores = store.get_scores(service.scoring_fingerprint, service._scorer)
+    before = candidates.to_frame()
+
+    service.save_candidate(service.get_candidate_by_id(0))
+
+    # Quien tomó las referencias antes del alta (por ej, un request filtrando fuera del lock) no ve cambios
+    assert len(candidates) == len(before) == len(scores)
+    assert candidates.to_frame().equals(before)
+    assert len(store.get_candidates()) == len(before) + 1
+
+
+def test_reads_materialize_outside_the_store_lock(csv_path, make_service, monkeypatch):
+    service = make_service(csv_path)
+    store = get_candidate_store(service.storage)
+    to_frame = CompactCandidates.to_frame
+    lock_free = []
+
+    def probing_to_frame(candidates, ids=None):
+        # Desde otro thread: si quien materializa tuviera el lock del store, no se podría tomar
+        acquired = []
+
+        def probe():
+            acquired.append(store.lock.acquire(timeout=1))
+            if acquired[0]:
+                store.lock.release()
+
+        prober = threading.Thread(target=probe)
+        prober.start()
+        prober.join()
+        lock_free.append(acquired[0])
+        return to_frame(candidates, ids)
+
+    monkeypatch.setattr(CompactCandidates, 'to_frame', probing_to_frame)
+    service.query_candidates(per_page=3)
+    service.get_preselected_candidates(k=3)
+    service.get_candidates_since(since_id=0, limit=3)
+    service.get_all_candidates()
+    assert lock_free == [True] * 4
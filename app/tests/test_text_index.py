@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import text_index
+from src.columnar import CompactCandidates
+from src.constants import HEADER
+
+QUERIES = ['a', 'ñá', 'abc', 'Éz', 'xyz', 'a b', 'zzzz', 'ÁÉ b']
+
+
+def reference_contains(values, query):
+    return np.array([isinstance(value, str) and query.lower() in value.lower() for value in values], dtype=bool)
+
+
+def random_frame(rng, rows):
+    letters = list('abcdeñáÉ Zxyz')
+    names = [
+        None if rng.random() < 0.05 else ''.join(rng.choice(letters) for _ in range(rng.randint(0, 12)))
+        for _ in range(rows)
+    ]
+    return pd.DataFrame({
+        'full_name': names, 'email': '-', 'college': 'MIT', 'degree': 'History', 'academic_average': 7.0,
+        'skills': [['Python']] * rows, 'work_experience': '-',
+    }, columns=HEADER)
+
+
+@pytest.fixture(autouse=True)
+def small_segments(monkeypatch):
+    monkeypatch.setattr(text_index, 'MIN_SEGMENT_ROWS', 50)
+
+
+def assert_same_as_scan(candidates):
+    names = candidates.to_frame()['full_name']
+    for query in QUERIES:
+        assert np.array_equal(candidates.contains('full_name', query), reference_contains(names, query)), query
+
+
+def test_index_grows_with_the_lineage():
+    rng = random.Random(7)
+    versions = [CompactCandidates.from_frame(random_frame(rng, 300))]
+    for rows in [1, 120, 30, 60, 90, 200]:
+        versions.append(versions[-1].extended(random_frame(rng, rows)))
+        assert_same_as_scan(versions[-1])
+    # Todas las versiones usan el mismo índice, que se extendió de a segmentos (pocos) y sirve para las anteriores
+    index = versions[-1]._text_indexes['full_name']
+    assert all(version._text_indexes['full_name'] is index for version in versions)
+    assert index.rows == len(versions[-1]) and len(index._segments) <= 3
+    for version in versions:
+        assert_same_as_scan(version)
+
+
+def test_extending_an_old_version_uses_a_new_index():
+    rng = random.Random(11)
+    base = CompactCandidates.from_frame(random_frame(rng, 200))
+    latest = base.extended(random_frame(rng, 100))
+    assert_same_as_scan(latest)
+    branch = base.extended(random_frame(rng, 100))
+    assert branch._text_indexes['full_name'] is not latest._text_indexes['full_name']
+    assert_same_as_scan(branch)
+    assert_same_as_scan(latest)
+    assert_same_as_scan(base)
+
+
+def test_search_does_not_wait_for_an_update_in_progress():
+    rng = random.Random(3)
+    candidates = CompactCandidates.from_frame(random_frame(rng, 500))
+    index = candidates._text_indexes['full_name']
+    # Otra búsqueda está armando un segmento: esta revisa las filas sin indexar con un scan
+    with index._lock:
+        assert_same_as_scan(candidates)
+    assert index.rows == 0
+    assert_same_as_scan(candidates)
+    assert index.rows == 500
+
+
+def test_empty_candidates():
+    candidates = CompactCandidates(HEADER)
+    assert candidates.contains('full_name', 'ana').shape == (0,)
+    assert_same_as_scan(candidates.extended(random_frame(random.Random(5), 80)))
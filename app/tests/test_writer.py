@@ -0,0 +1,140 @@
+import threading
+
+import pytest
+
+from src.models import StudentCandidate
+from src.store import CandidateStore
+from src.writer import CandidateWriter
+
+
+def make_records(service, count, prefix='Bulk'):
+    return [
+        service.get_candidate_record(StudentCandidate(
+            full_name=f'{prefix} {i}', email=f'{prefix.lower()}{i}@example.com', college='MIT', degree='History',
+            academic_average=7, skills=['Python'],
+        ))
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def blocked_append(monkeypatch):
+    """Frena la primera escritura hasta que se setea el evento devuelto, y registra el tamaño de cada lote"""
+    started, release, batch_sizes = threading.Event(), threading.Event(), []
+    append = CandidateStore.append
+
+    def blocking_append(store, df_new_candidates, scorers=None):
+        batch_sizes.append(len(df_new_candidates))
+        if len(batch_sizes) == 1:
+            started.set()
+            release.wait(10)
+        return append(store, df_new_candidates, scorers)
+    monkeypatch.setattr(CandidateStore, 'append', blocking_append)
+    return started, release, batch_sizes
+
+
+def test_writes_queued_during_a_write_go_in_one_batch(csv_path, make_service, blocked_append):
+    started, release, batch_sizes = blocked_append
+    service = make_service(csv_path)
+    total = service.count_candidates()
+    writer = CandidateWriter(service._store)
+
+    first = writer.submit(make_records(service, 1, 'First'), {})
+    assert started.wait(10)
+    # Mientras se escribe el primer lote se encolan otros tres: se escriben juntos, en orden
+    queued = [writer.submit(make_records(service, count, f'Queued{count}'), {}) for count in (2, 3, 4)]
+    release.set()
+
+    assert first.result(10) == range(total, total + 1)
+    assert [future.result(10) for future in queued] == [
+        range(total + 1, total + 3), range(total + 3, total + 6), range(total + 6, total + 10)
+    ]
+    assert batch_sizes == [1, 9]
+    assert service.get_candidate_by_id(total + 3).full_name == 'Queued3 0'
+    assert service.count_candidates() == total + 10
+
+
+def test_batches_respect_max_batch_size(csv_path, make_service, blocked_append):
+    started, release, batch_sizes = blocked_append
+    service = make_service(csv_path)
+    writer = CandidateWriter(service._store, max_batch_size=5)
+
+    first = writer.submit(make_records(service, 1), {})
+    assert started.wait(10)
+    queued = [writer.submit(make_records(service, 3), {}) for _ in range(4)]
+    release.set()
+    for future in [first] + queued:
+        future.result(10)
+    # Un lote se cierra apenas llega al máximo (sin partir las altas de un mismo submit)
+    assert batch_sizes == [1, 6, 6]
+
+
+def test_errors_reach_every_caller_of_the_batch(csv_path, make_service, blocked_append, monkeypatch):
+    started, release, batch_sizes = blocked_append
+    service = make_service(csv_path)
+    total = service.count_candidates()
+    writer = CandidateWriter(service._store)
+
+    first = writer.submit(make_records(service, 1), {})
+    assert started.wait(10)
+    queued = [writer.submit(make_records(service, 2), {}) for _ in range(3)]
+
+    # La primera escritura ya está en curso: falla la del lote siguiente
+    def failing_append(store, df_new_candidates, scorers=None):
+        batch_sizes.append(len(df_new_candidates))
+        raise OSError('disk full')
+    monkeypatch.setattr(CandidateStore, 'append', failing_append)
+    release.set()
+
+    assert first.result(10) == range(total, total + 1)
+    for future in queued:
+        with pytest.raises(OSError, match='disk full'):
+            future.result(10)
+    assert batch_sizes == [1, 6]
+
+    # El thread del writer sigue vivo: las altas siguientes se escriben
+    monkeypatch.undo()
+    assert writer.write(make_records(service, 2), {}) == range(total + 1, total + 3)
+    assert service.count_candidates() == total + 3
+
+
+def test_bulk_endpoint(csv_path, api_client):
+    client = api_client(csv_path)
+    total = client.get('/candidates/', params={'per_page': 1}).json()['total']
+    candidates = [
+        {'full_name': 'Bulk One', 'email': 'one@example.com', 'college': 'MIT', 'degree': 'History',
+         'academic_average': 8, 'skills': ['Python']},
+        {'full_name': 'Bulk Two', 'email': 'two@example.com', 'college': 'MIT', 'degree': 'History',
+         'academic_average': 6},
+    ]
+    response = client.post('/candidates/bulk', json=candidates)
+    assert response.status_code == 200
+    assert response.json() == {'message': 'success', 'count': 2, 'ids': [total, total + 1]}
+
+    body = 'full_name,email,college,degree,academic_average,skills,work_experience\n' \
+           'Bulk Three,three@example.com,MIT,History,9,"Python,SQL",-\n'
+    response = client.post('/candidates/bulk', content=body, headers={'content-type': 'text/csv'})
+    assert response.json()['ids'] == [total + 2]
+    assert client.get(f'/candidates/{total + 2}').json()['candidate']['skills'] == ['Python', 'SQL']
+
+
+def test_bulk_endpoint_validates_every_candidate(csv_path, api_client):
+    client = api_client(csv_path)
+    total = client.get('/candidates/', params={'per_page': 1}).json()['total']
+    valid = {'full_name': 'Valid', 'email': 'valid@example.com', 'college': 'MIT', 'degree': 'History',
+             'academic_average': 8}
+    response = client.post('/candidates/bulk', json=[
+        valid, dict(valid, email='not-an-email'), dict(valid, academic_average=11),
+    ])
+    assert response.status_code == 422
+    # Cada error indica el candidato (índice) y el campo inválido
+    assert sorted(tuple(error['loc'][:2]) for error in response.json()['detail']) == [
+        (1, 'email'), (2, 'academic_average')
+    ]
+    # Ninguno se guarda, tampoco los válidos
+    assert client.get('/candidates/', params={'per_page': 1}).json()['total'] == total
+
+    response = client.post('/candidates/bulk', content=b'{"full_name": ', headers={'content-type': 'application/json'})
+    assert response.status_code == 400
+    response = client.post('/candidates/bulk', json=valid)
+    assert response.status_code == 400